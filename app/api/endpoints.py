@@ -1,26 +1,219 @@
-from typing import List, Optional
+import hashlib
+import re
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    Hashable,
+    List,
+    Optional,
+    Tuple,
+    TypeVar,
+    Union,
+)
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
+from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
 from app.api.schemas import (
     UserCreate,
+    UserImportResult,
     User,
     TicketCreate,
     TicketUpdate,
+    TicketBulkUpdate,
     Ticket,
+    TicketData,
     MessageCreate,
     Message,
     BaseResponse,
+    BatchResponse,
+    PageResponse,
 )
 from app.api.enums import SortOrder, TicketStatus
-from app.core.database import get_async_session
+from app.api.responses import (
+    PydanticJSONResponse,
+    StreamingJSONResponse,
+    json_envelope,
+)
+from app.core.database import get_async_session, get_session_maker
+from app.core.metrics import metrics
+from app.core.singleflight import read_coalescing
+from app.database.serializers import Fieldset
+from app.database.tools import encode_cursor
 from app.services import ticket_service, user_service
-from app.tasks.email_tasks import send_email_task
+from app.services.exceptions import ConflictError
+from app.services.ticket_cache import CachedTicket, ticket_cache
+from app.services.user_loader import UserLoader, get_user_loader
+from app.tasks.email_tasks import email_batcher
 
 
 router = APIRouter()
 
+MAX_BATCH_IDS = 500
+# Первичные ключи - integer (int4) PostgreSQL
+MAX_ID = 2**31 - 1
+
+BatchItem = TypeVar("BatchItem", User, TicketData)
+
+
+def _parse_ids(values: List[str]) -> List[int]:
+    """
+    Разбирает ID из параметра ids (?ids=1,2 или ?ids=1&ids=2) без повторов.
+    """
+    ids: List[int] = []
+    for value in values:
+        for part in value.split(","):
+            # Только ASCII цифры: isdigit() пропускает "²", на котором int()
+            # падает; длина ограничена до int(), значение - диапазоном int4
+            part = part.strip()
+            if not re.fullmatch(r"\d{1,10}", part, re.ASCII) or int(part) > MAX_ID:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Некорректный ID: {part}",
+                )
+            ids.append(int(part))
+    ids = list(dict.fromkeys(ids))
+    if len(ids) > MAX_BATCH_IDS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Можно запросить не более {MAX_BATCH_IDS} ID",
+        )
+    return ids
+
+
+def _order_by_ids(
+    ids: List[int], items: List[BatchItem]
+) -> Tuple[List[BatchItem], List[int]]:
+    """
+    Упорядочивает записи как в запросе и возвращает ненайденные ID.
+    """
+    by_id = {_field(item, "id"): item for item in items}
+    return [by_id[i] for i in ids if i in by_id], [i for i in ids if i not in by_id]
+
+
+def _field(item: Union[BaseModel, Dict[str, Any]], key: str) -> Any:
+    """
+    Возвращает поле записи ответа: схемы или словаря с выборкой полей.
+    """
+    return item.get(key) if isinstance(item, dict) else getattr(item, key)
+
+
+def _split(value: str) -> List[str]:
+    """
+    Разбирает список имен через запятую.
+    """
+    return [part.strip() for part in value.split(",") if part.strip()]
+
+
+class TicketFields:
+    """
+    Зависимость FastAPI: выборка полей обращения из параметров fields и expand.
+
+    Без обоих параметров возвращает None, то есть обращение целиком.
+    required: поля, которые эндпоинт включает в ответ всегда.
+    """
+
+    def __init__(self, *required: str) -> None:
+        self.required = required
+
+    def __call__(
+        self,
+        fields: Optional[str] = Query(
+            None,
+            description="Поля обращения через запятую: subject, description, "
+            "status, created_at, updated_at, version, creator_id, operator_id",
+        ),
+        expand: Optional[str] = Query(
+            None, description="Связи, разворачиваемые в объекты: creator, operator"
+        ),
+    ) -> Optional[Fieldset]:
+        if fields is None and expand is None:
+            return None
+        try:
+            return ticket_service.ticket_serializer.fieldset(
+                None if fields is None else _split(fields),
+                _split(expand or ""),
+                self.required,
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Проверяет If-None-Match по слабому сравнению ETag (без учета W/).
+    """
+    if if_none_match is None:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return etag.removeprefix("W/") in tags
+
+
+def _weak_etag(*parts: Any) -> str:
+    """
+    Строит слабый ETag из снимка состояния ресурса (счетчиков, дат изменения).
+    """
+    digest = hashlib.blake2b(repr(parts).encode(), digest_size=8).hexdigest()
+    return f'W/"{digest}"'
+
+
+def _not_modified(etag: str) -> Response:
+    """
+    Ответ 304 без тела с текущим ETag.
+    """
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+
+
+async def _coalesced_json(
+    route: str,
+    params: Hashable,
+    build: Callable[[], Awaitable[BaseModel]],
+    headers: Optional[Dict[str, str]] = None,
+) -> Response:
+    """
+    Строит и сериализует ответ один раз на все одинаковые одновременные
+    запросы, каждый из них получает те же байты.
+
+    build открывает свою сессию: сессия запроса, начавшего вычисление,
+    закрывается при его отмене, а результат ждут и другие запросы.
+    """
+
+    async def render() -> bytes:
+        content = await build()
+        return content.__pydantic_serializer__.to_json(content)
+
+    body = await read_coalescing.run(route, params, render)
+    return Response(body, media_type="application/json", headers=headers)
+
+
+def _if_match_version(if_match: Optional[str]) -> Optional[int]:
+    """
+    Извлекает версию обращения из заголовка If-Match ("3" или *).
+
+    If-Match сравнивает ETag строго (RFC 9110), слабый тег W/"3" не совпадает
+    ни с одной версией, поэтому ответ 412.
+    """
+    if if_match is None or if_match.strip() == "*":
+        return None
+    if if_match.strip().startswith("W/"):
+        raise HTTPException(
+            status_code=status.HTTP_412_PRECONDITION_FAILED,
+            detail="Слабый ETag в If-Match не подходит для строгого сравнения",
+        )
+    value = if_match.strip().strip('"')
+    if not value.isdigit():
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Некорректный заголовок If-Match",
+        )
+    return int(value)
+
 
 @router.post(
     "/users",
@@ -30,30 +223,86 @@ router = APIRouter()
 )
 async def create_user(
     user_data: UserCreate, session: AsyncSession = Depends(get_async_session)
-) -> BaseResponse[User]:
+) -> PydanticJSONResponse:
     """Создает нового пользователя"""
     try:
         user = await user_service.create_user(session, user_data)
-        return BaseResponse(data=user, message="Пользователь успешно создан")
+        return PydanticJSONResponse(
+            BaseResponse[User](data=user, message="Пользователь успешно создан"),
+            status_code=status.HTTP_201_CREATED,
+        )
     except ValueError as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
 
+@router.post(
+    "/users/import",
+    response_model=BaseResponse[List[UserImportResult]],
+    description="Массовый импорт пользователей",
+)
+async def import_users(
+    users_data: List[UserCreate], session: AsyncSession = Depends(get_async_session)
+) -> PydanticJSONResponse:
+    """Создает пользователей пачкой, дубликаты отмечаются в результате"""
+    results = await user_service.import_users(session, users_data)
+    return PydanticJSONResponse(
+        BaseResponse[List[UserImportResult]](
+            data=results, message="Импорт пользователей завершен"
+        )
+    )
+
+
+@router.get(
+    "/users",
+    response_model=BatchResponse[User],
+    description="Получение пользователей по списку ID",
+)
+async def get_users(
+    ids: List[str] = Query(
+        ..., description="ID пользователей: ids=1,2 или ids=1&ids=2"
+    ),
+    session: AsyncSession = Depends(get_async_session),
+) -> PydanticJSONResponse:
+    """Возвращает пользователей в порядке запроса и список ненайденных ID"""
+    user_ids = _parse_ids(ids)
+    users, missing_ids = _order_by_ids(
+        user_ids, await user_service.get_users(session, user_ids)
+    )
+    return PydanticJSONResponse(
+        BatchResponse[User](
+            data=users,
+            message="Пользователи успешно получены",
+            missing_ids=missing_ids,
+        )
+    )
+
+
 @router.get(
     "/users/{user_id}",
     response_model=BaseResponse[User],
     description="Получение пользователя по id",
 )
 async def get_user(
-    user_id: int, session: AsyncSession = Depends(get_async_session)
-) -> BaseResponse[User]:
+    user_id: int,
+    if_none_match: Optional[str] = Header(
+        None, description="ETag из предыдущего ответа, при совпадении ответ 304"
+    ),
+    session: AsyncSession = Depends(get_async_session),
+) -> Response:
     """Возвращает пользователя по его ID"""
+    # Пользователь берется из кэша, это дешевле отдельного запроса updated_at
     user = await user_service.get_user(session, user_id)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
         )
-    return BaseResponse(data=user, message="Пользователь успешно получен")
+    etag = _weak_etag(user.id, user.updated_at)
+    if _etag_matches(if_none_match, etag):
+        return _not_modified(etag)
+    return PydanticJSONResponse(
+        BaseResponse[User](data=user, message="Пользователь успешно получен"),
+        headers={"ETag": etag},
+    )
 
 
 @router.post(
@@ -63,30 +312,226 @@ async def get_user(
     description="Создание нового обращения",
 )
 async def create_ticket(
-    ticket_data: TicketCreate, session: AsyncSession = Depends(get_async_session)
-) -> BaseResponse[Ticket]:
+    ticket_data: TicketCreate,
+    session: AsyncSession = Depends(get_async_session),
+    loader: UserLoader = Depends(get_user_loader),
+) -> PydanticJSONResponse:
     """Создает новое обращение"""
     try:
-        ticket = await ticket_service.create_ticket(session, ticket_data)
-        return BaseResponse(data=ticket, message="Обращение успешно создано")
+        ticket = await ticket_service.create_ticket(session, ticket_data, loader=loader)
+        return PydanticJSONResponse(
+            BaseResponse[Ticket](data=ticket, message="Обращение успешно создано"),
+            status_code=status.HTTP_201_CREATED,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
+@router.post(
+    "/tickets/bulk",
+    response_model=BaseResponse[List[Ticket]],
+    status_code=status.HTTP_201_CREATED,
+    description="Массовое создание обращений",
+)
+async def create_tickets(
+    tickets_data: List[TicketCreate],
+    session: AsyncSession = Depends(get_async_session),
+    loader: UserLoader = Depends(get_user_loader),
+) -> PydanticJSONResponse:
+    """Создает обращения пачкой"""
+    try:
+        tickets = await ticket_service.create_tickets(
+            session, tickets_data, loader=loader
+        )
+        return PydanticJSONResponse(
+            BaseResponse[List[Ticket]](
+                data=tickets, message=f"Создано обращений: {len(tickets)}"
+            ),
+            status_code=status.HTTP_201_CREATED,
+        )
     except ValueError as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
 
 @router.get(
     "/tickets",
-    response_model=BaseResponse[List[Ticket]],
+    response_model=Union[PageResponse[Ticket], BatchResponse[Ticket]],
     description="Получение списка обращений",
 )
 async def get_tickets(
+    ids: Optional[List[str]] = Query(
+        None,
+        description="Получить обращения по списку ID: ids=1,2 или ids=1&ids=2, "
+        "остальные параметры при этом не учитываются",
+    ),
     status: Optional[TicketStatus] = None,
     sort_by: SortOrder = SortOrder.CREATED_AT_DESC,
+    limit: int = Query(50, ge=1, le=500, description="Размер страницы"),
+    cursor: Optional[str] = Query(
+        None, description="Курсор из next_cursor предыдущей страницы"
+    ),
+    stream: bool = Query(
+        False, description="Отдать весь список потоком, без пагинации"
+    ),
+    # created_at и id нужны для курсора следующей страницы
+    fieldset: Optional[Fieldset] = Depends(TicketFields("id", "created_at")),
+    if_none_match: Optional[str] = Header(
+        None, description="ETag из предыдущего ответа, при совпадении ответ 304"
+    ),
     session: AsyncSession = Depends(get_async_session),
-) -> BaseResponse[List[Ticket]]:
+    session_maker: async_sessionmaker[AsyncSession] = Depends(get_session_maker),
+) -> Response:
     """Получение списка обращений, с фильтрацией по статусу и сортировкой"""
+    ticket_ids = _parse_ids(ids) if ids is not None else None
+    # Снимок берется до чтения строк: запись между ними даст устаревший ETag
+    # и лишний полный ответ, но не потерянное изменение
+    etag = _weak_etag(*await ticket_service.get_tickets_state(session, ticket_ids))
+    # Соединение снимка возвращается в пул до чтения строк в своей сессии:
+    # иначе каждый запрос держит два соединения, и всплеск запросов
+    # исчерпывает пул снимками, ожидающими второго соединения
+    await session.close()
+    if _etag_matches(if_none_match, etag):
+        return _not_modified(etag)
+    headers = {"ETag": etag}
+
+    if ticket_ids is not None:
+        batch_ids = ticket_ids
+
+        async def load_batch() -> BaseModel:
+            async with session_maker() as read_session:
+                tickets, missing_ids = _order_by_ids(
+                    batch_ids,
+                    await ticket_service.get_tickets_by_ids(
+                        read_session, batch_ids, UserLoader(read_session), fieldset
+                    ),
+                )
+            return BatchResponse[TicketData](
+                data=tickets,
+                message="Обращения успешно получены",
+                missing_ids=missing_ids,
+            )
+
+        # ETag в ключе: запрос, пришедший после записи, не получит тело,
+        # прочитанное до нее, под новым ETag
+        return await _coalesced_json(
+            "tickets", (etag, tuple(batch_ids), fieldset), load_batch, headers
+        )
+
+    if stream:
+
+        async def chunks() -> AsyncIterator[List[TicketData]]:
+            # Сессия зависимости закрывается до отправки тела ответа
+            async with session_maker() as stream_session:
+                async for chunk in ticket_service.stream_tickets(
+                    stream_session, status, sort_by, fieldset=fieldset
+                ):
+                    yield chunk
 
-    tickets = await ticket_service.get_tickets(session, status, sort_by)
-    return BaseResponse(data=tickets, message="Список обращений успешно получен")
+        return StreamingJSONResponse(
+            chunks(), "Список обращений успешно получен", headers=headers
+        )
+
+    async def load_page() -> BaseModel:
+        async with session_maker() as read_session:
+            tickets = await ticket_service.get_tickets(
+                read_session,
+                status,
+                sort_by,
+                limit=limit,
+                cursor=cursor,
+                loader=UserLoader(read_session),
+                fieldset=fieldset,
+            )
+        next_cursor = None
+        if len(tickets) == limit:
+            last = tickets[-1]
+            next_cursor = encode_cursor(_field(last, "created_at"), _field(last, "id"))
+        return PageResponse[TicketData](
+            data=tickets,
+            message="Список обращений успешно получен",
+            next_cursor=next_cursor,
+        )
+
+    try:
+        return await _coalesced_json(
+            "tickets",
+            (etag, status, sort_by, limit, cursor, fieldset),
+            load_page,
+            headers,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+# Объявлен до /tickets/{ticket_id}, иначе "search" разбирается как ID
+@router.get(
+    "/tickets/search",
+    response_model=PageResponse[Ticket],
+    description="Полнотекстовый поиск обращений",
+)
+async def search_tickets(
+    q: str = Query(
+        ...,
+        min_length=1,
+        description="Слова для поиска в теме, описании и сообщениях обращения",
+    ),
+    status: Optional[TicketStatus] = None,
+    limit: int = Query(50, ge=1, le=500, description="Размер страницы"),
+    cursor: Optional[str] = Query(
+        None, description="Курсор из next_cursor предыдущей страницы"
+    ),
+    fieldset: Optional[Fieldset] = Depends(TicketFields("id")),
+    session_maker: async_sessionmaker[AsyncSession] = Depends(get_session_maker),
+) -> Response:
+    """Поиск обращений с ранжированием по релевантности"""
+
+    async def load_page() -> BaseModel:
+        async with session_maker() as read_session:
+            page = await ticket_service.search_tickets(
+                read_session,
+                q,
+                status,
+                limit=limit,
+                cursor=cursor,
+                loader=UserLoader(read_session),
+                fieldset=fieldset,
+            )
+        return PageResponse[TicketData](
+            data=page.tickets,
+            message="Результаты поиска успешно получены",
+            next_cursor=page.next_cursor,
+        )
+
+    try:
+        return await _coalesced_json(
+            "search", (q, status, limit, cursor, fieldset), load_page
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.patch(
+    "/tickets",
+    response_model=BaseResponse[List[int]],
+    description="Массовое обновление обращений",
+)
+async def bulk_update_tickets(
+    bulk_data: TicketBulkUpdate, session: AsyncSession = Depends(get_async_session)
+) -> PydanticJSONResponse:
+    """Обновляет обращения по списку ID или фильтру, возвращает ID обновленных"""
+    try:
+        ids = await ticket_service.bulk_update_tickets(
+            session,
+            bulk_data.update,
+            ids=bulk_data.ids,
+            status=bulk_data.status,
+            operator_id=bulk_data.operator_id,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    return PydanticJSONResponse(
+        BaseResponse[List[int]](data=ids, message=f"Обновлено обращений: {len(ids)}")
+    )
 
 
 @router.get(
@@ -95,15 +540,64 @@ async def get_tickets(
     description="Получение обращения по ID",
 )
 async def get_ticket(
-    ticket_id: int, session: AsyncSession = Depends(get_async_session)
-) -> BaseResponse[Ticket]:
+    ticket_id: int,
+    fieldset: Optional[Fieldset] = Depends(TicketFields("id")),
+    if_none_match: Optional[str] = Header(
+        None, description="ETag из предыдущего ответа, при совпадении ответ 304"
+    ),
+    session: AsyncSession = Depends(get_async_session),
+    loader: UserLoader = Depends(get_user_loader),
+    session_maker: async_sessionmaker[AsyncSession] = Depends(get_session_maker),
+) -> Response:
     """Получение обращения по ID"""
-    ticket = await ticket_service.get_ticket(session, ticket_id)
+    if fieldset is None:
+        cached, stamp = await ticket_cache.get(ticket_id)
+
+        async def load_cached() -> Optional[CachedTicket]:
+            async with session_maker() as read_session:
+                return await ticket_service.load_ticket_cached(
+                    read_session, ticket_id, stamp
+                )
+
+        if cached is None and stamp:
+            # Промах кэша при всплеске запросов одного обращения читает базу
+            # один раз. Штамп в ключе: запись меняет штамп, поэтому запрос,
+            # пришедший после нее, не получит строку, прочитанную до нее
+            cached = await read_coalescing.run(
+                "ticket", (ticket_id, stamp), load_cached
+            )
+        elif cached is None:
+            # Без бэкенда кэша штампа записи нет, объединять чтения небезопасно
+            cached = await load_cached()
+        if cached is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail="Ticket not found"
+            )
+        etag = f'"{cached.version}"'
+        if _etag_matches(if_none_match, etag):
+            return _not_modified(etag)
+        return Response(
+            json_envelope(cached.body, "Обращение успешно получено"),
+            media_type="application/json",
+            headers={"ETag": etag},
+        )
+
+    ticket = await ticket_service.get_ticket(session, ticket_id, loader, fieldset)
     if not ticket:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Ticket not found"
         )
-    return BaseResponse(data=ticket, message="Обращение успешно получено")
+    version = _field(ticket, "version")
+    headers = None
+    if version is not None:
+        etag = f'"{version}"'
+        if _etag_matches(if_none_match, etag):
+            return _not_modified(etag)
+        headers = {"ETag": etag}
+    return PydanticJSONResponse(
+        BaseResponse[TicketData](data=ticket, message="Обращение успешно получено"),
+        headers=headers,
+    )
 
 
 @router.patch(
@@ -114,12 +608,27 @@ async def get_ticket(
 async def update_ticket(
     ticket_id: int,
     ticket_data: TicketUpdate,
+    if_match: Optional[str] = Header(
+        None, description="Ожидаемая версия обращения из ETag"
+    ),
     session: AsyncSession = Depends(get_async_session),
-) -> BaseResponse[Ticket]:
+    loader: UserLoader = Depends(get_user_loader),
+) -> PydanticJSONResponse:
     """Обновление обращения"""
     try:
-        ticket = await ticket_service.update_ticket(session, ticket_id, ticket_data)
-        return BaseResponse(data=ticket, message="Обращение успешно обновлено")
+        ticket = await ticket_service.update_ticket(
+            session,
+            ticket_id,
+            ticket_data,
+            loader,
+            expected_version=_if_match_version(if_match),
+        )
+        return PydanticJSONResponse(
+            BaseResponse[Ticket](data=ticket, message="Обращение успешно обновлено"),
+            headers={"ETag": f'"{ticket.version}"'},
+        )
+    except ConflictError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
     except ValueError as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
@@ -134,16 +643,25 @@ async def create_message(
     ticket_id: int,
     message_data: MessageCreate,
     session: AsyncSession = Depends(get_async_session),
-) -> BaseResponse[Message]:
+    loader: UserLoader = Depends(get_user_loader),
+) -> PydanticJSONResponse:
     """Создание сообщения в обращении"""
     try:
-        message = await ticket_service.create_message(session, ticket_id, message_data)
-        ticket = await ticket_service.get_ticket(session, ticket_id)
-        if ticket and ticket.creator:
-            send_email_task.delay(
-                ticket.creator.email, f"Re: {ticket.subject}", message_data.text
+        created = await ticket_service.create_message(
+            session, ticket_id, message_data, loader=loader
+        )
+        if created.creator_email:
+            email_batcher.add(
+                created.creator_email,
+                f"Re: {created.ticket_subject}",
+                message_data.text,
             )
-        return BaseResponse(data=message, message="Сообщение успешно создано")
+        return PydanticJSONResponse(
+            BaseResponse[Message](
+                data=created.message, message="Сообщение успешно создано"
+            ),
+            status_code=status.HTTP_201_CREATED,
+        )
     except ValueError as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
@@ -154,8 +672,68 @@ async def create_message(
     description="Получение сообщений по обращению",
 )
 async def get_messages(
-    ticket_id: int, session: AsyncSession = Depends(get_async_session)
-) -> BaseResponse[List[Message]]:
+    ticket_id: int,
+    after_id: Optional[int] = Query(
+        None, description="ID последнего полученного сообщения, вернуть только новее"
+    ),
+    limit: Optional[int] = Query(
+        None, ge=1, le=500, description="Максимальное число сообщений"
+    ),
+    stream: bool = Query(False, description="Отдать список потоком"),
+    if_none_match: Optional[str] = Header(
+        None, description="ETag из предыдущего ответа, при совпадении ответ 304"
+    ),
+    session: AsyncSession = Depends(get_async_session),
+    session_maker: async_sessionmaker[AsyncSession] = Depends(get_session_maker),
+) -> Response:
     """Получение сообщений по обращению"""
-    messages = await ticket_service.get_messages(session, ticket_id)
-    return BaseResponse(data=messages, message="Список сообщений успешно получен")
+    etag = _weak_etag(*await ticket_service.get_messages_state(session, ticket_id))
+    # Как в get_tickets: чтение идет в своей сессии, соединение снимка не нужно
+    await session.close()
+    if _etag_matches(if_none_match, etag):
+        return _not_modified(etag)
+    headers = {"ETag": etag}
+
+    if stream:
+
+        async def chunks() -> AsyncIterator[List[Message]]:
+            async with session_maker() as stream_session:
+                async for chunk in ticket_service.stream_messages(
+                    stream_session, ticket_id, after_id=after_id
+                ):
+                    yield chunk
+
+        return StreamingJSONResponse(
+            chunks(), "Список сообщений успешно получен", headers=headers
+        )
+
+    async def load_messages() -> BaseModel:
+        async with session_maker() as read_session:
+            messages = await ticket_service.get_messages(
+                read_session,
+                ticket_id,
+                UserLoader(read_session),
+                after_id=after_id,
+                limit=limit,
+            )
+        return BaseResponse[List[Message]](
+            data=messages, message="Список сообщений успешно получен"
+        )
+
+    return await _coalesced_json(
+        "messages", (etag, ticket_id, after_id, limit), load_messages, headers
+    )
+
+
+@router.get(
+    "/metrics",
+    response_model=BaseResponse[Dict[str, int]],
+    description="Счетчики процесса: попадания в кэши и т.п.",
+)
+async def get_metrics() -> PydanticJSONResponse:
+    """Возвращает счетчики текущего процесса"""
+    return PydanticJSONResponse(
+        BaseResponse[Dict[str, int]](
+            data=metrics.snapshot(), message="Метрики успешно получены"
+        )
+    )
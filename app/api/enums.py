@@ -10,3 +10,9 @@ class TicketStatus(str, Enum):
 class SortOrder(str, Enum):
     CREATED_AT_ASC = "created_at_asc"
     CREATED_AT_DESC = "created_at_desc"
+
+
+class UserImportStatus(str, Enum):
+    CREATED = "created"
+    DUPLICATE = "duplicate"
+    INVALID = "invalid"
@@ -0,0 +1,64 @@
+from typing import Any, AsyncIterator, Mapping, Optional, Sequence
+
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import BaseModel
+from pydantic_core import to_json
+
+
+class PydanticJSONResponse(JSONResponse):
+    """
+    JSON-ответ из уже провалидированной модели Pydantic.
+
+    Модель сериализуется в байты один раз ядром pydantic-core. FastAPI не
+    выполняет для такого ответа повторную валидацию по response_model и
+    jsonable_encoder, при этом response_model эндпоинта по-прежнему
+    описывает схему в OpenAPI.
+    """
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, BaseModel):
+            return content.__pydantic_serializer__.to_json(content)
+        return super().render(content)
+
+
+def json_envelope(data: bytes, message: str) -> bytes:
+    """
+    Формирует конверт {"data": ..., "message": ...} из готового JSON данных.
+    """
+    return b'{"data":' + data + b',"message":' + to_json(message) + b"}"
+
+
+async def stream_json_list(
+    chunks: AsyncIterator[Sequence[Any]], message: str
+) -> AsyncIterator[bytes]:
+    """
+    Формирует конверт {"data": [...], "message": ...} по частям.
+
+    Открывающая часть отправляется до выполнения запроса, поэтому время до
+    первого байта не зависит от размера списка.
+    """
+    yield b'{"data":['
+    first = True
+    async for chunk in chunks:
+        if not chunk:
+            continue
+        body = to_json(list(chunk))[1:-1]
+        yield body if first else b"," + body
+        first = False
+    yield b'],"message":' + to_json(message) + b"}"
+
+
+class StreamingJSONResponse(StreamingResponse):
+    """
+    Потоковый JSON-ответ со списком, см. stream_json_list.
+    """
+
+    media_type = "application/json"
+
+    def __init__(
+        self,
+        chunks: AsyncIterator[Sequence[Any]],
+        message: str,
+        headers: Optional[Mapping[str, str]] = None,
+    ) -> None:
+        super().__init__(stream_json_list(chunks, message), headers=headers)
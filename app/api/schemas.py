@@ -1,7 +1,9 @@
 from datetime import datetime
-from typing import Optional, Generic, TypeVar
+from typing import Any, Dict, List, Optional, Generic, TypeVar, Union
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
+
+from app.api.enums import TicketStatus, UserImportStatus
 
 T = TypeVar("T")
 
@@ -15,6 +17,26 @@ class BaseResponse(BaseModel, Generic[T]):
     message: Optional[str] = Field(None, description="Сообщение об ошибке, или успехе")
 
 
+class PageResponse(BaseResponse[List[T]], Generic[T]):
+    """
+    Модель ответа API со страницей списка и курсором следующей страницы.
+    """
+
+    next_cursor: Optional[str] = Field(
+        None, description="Курсор следующей страницы, null если страница последняя"
+    )
+
+
+class BatchResponse(BaseResponse[List[T]], Generic[T]):
+    """
+    Модель ответа API на запрос записей по списку ID.
+    """
+
+    missing_ids: List[int] = Field(
+        default_factory=list, description="Запрошенные ID, которые не найдены"
+    )
+
+
 class UserCreate(BaseModel):
     """
     Модель для создания пользователя.
@@ -30,6 +52,8 @@ class User(BaseModel):
     Модель пользователя для ответа API.
     """
 
+    model_config = ConfigDict(from_attributes=True)
+
     id: int = Field(..., description="ID пользователя")
     email: str = Field(..., description="Email пользователя")
     username: str = Field(..., description="Логин пользователя")
@@ -38,6 +62,19 @@ class User(BaseModel):
     updated_at: datetime = Field(..., description="Дата обновления")
 
 
+class UserImportResult(BaseModel):
+    """
+    Результат импорта одной записи пользователя.
+    """
+
+    index: int = Field(..., description="Позиция записи в запросе")
+    email: str = Field(..., description="Email пользователя")
+    username: str = Field(..., description="Логин пользователя")
+    status: UserImportStatus = Field(..., description="Результат импорта записи")
+    user: Optional[User] = Field(None, description="Созданный пользователь")
+    detail: Optional[str] = Field(None, description="Причина отказа")
+
+
 class TicketCreate(BaseModel):
     """
     Модель для создания обращения.
@@ -56,6 +93,25 @@ class TicketUpdate(BaseModel):
     operator_id: Optional[int] = Field(
         None, description="ID оператора, взявшего обращение"
     )
+    version: Optional[int] = Field(
+        None,
+        description="Ожидаемая версия обращения, альтернатива заголовку If-Match",
+    )
+
+
+class TicketBulkUpdate(BaseModel):
+    """
+    Модель для массового обновления обращений по списку ID или фильтру.
+    """
+
+    ids: Optional[List[int]] = Field(None, description="ID обновляемых обращений")
+    status: Optional[TicketStatus] = Field(
+        None, description="Фильтр по текущему статусу обращения"
+    )
+    operator_id: Optional[int] = Field(
+        None, description="Фильтр по текущему оператору обращения"
+    )
+    update: TicketUpdate = Field(..., description="Новые значения полей обращений")
 
 
 class Ticket(BaseModel):
@@ -63,16 +119,23 @@ class Ticket(BaseModel):
     Модель обращения для ответа API.
     """
 
+    model_config = ConfigDict(from_attributes=True)
+
     id: int = Field(..., description="ID обращения")
     subject: str = Field(..., description="Тема обращения")
     description: str = Field(..., description="Описание обращения")
     status: str = Field(..., description="Статус обращения")
     created_at: datetime = Field(..., description="Дата создания")
     updated_at: datetime = Field(..., description="Дата обновления")
+    version: int = Field(..., description="Версия обращения")
     creator: User = Field(..., description="Пользователь, создавший обращение")
     operator: Optional[User] = Field(None, description="Оператор, взявший обращение")
 
 
+# Обращение целиком или словарь с выборкой его полей (параметры fields/expand)
+TicketData = Union[Ticket, Dict[str, Any]]
+
+
 class MessageCreate(BaseModel):
     """
     Модель для создания сообщения.
@@ -86,6 +149,8 @@ class Message(BaseModel):
     Модель сообщения для ответа API.
     """
 
+    model_config = ConfigDict(from_attributes=True)
+
     id: int = Field(..., description="ID сообщения")
     text: str = Field(..., description="Текст сообщения")
     created_at: datetime = Field(..., description="Дата создания")
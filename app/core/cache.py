@@ -0,0 +1,142 @@
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Mapping, Optional, Protocol, Sequence, Tuple
+
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from app.core.config import Settings
+from app.core.metrics import metrics
+
+settings = Settings()
+
+
+class CacheBackend(Protocol):
+    """
+    Хранилище кэша: байтовые значения по строковым ключам с TTL.
+    """
+
+    async def get_many(self, keys: Sequence[str]) -> Dict[str, bytes]: ...
+
+    async def set_many(self, items: Mapping[str, bytes], ttl: float) -> None: ...
+
+    async def delete_many(self, keys: Sequence[str]) -> None: ...
+
+    async def clear(self) -> None: ...
+
+
+class MemoryCache:
+    """
+    Кэш в памяти процесса с TTL и вытеснением давно не использованных записей.
+
+    Значения хранятся в байтах, как и в Redis, поэтому вызывающий код не
+    может изменить закэшированный объект.
+    """
+
+    def __init__(
+        self, max_size: int, clock: Callable[[], float] = time.monotonic
+    ) -> None:
+        self.max_size = max_size
+        self._clock = clock
+        self._data: OrderedDict[str, Tuple[float, bytes]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    async def get_many(self, keys: Sequence[str]) -> Dict[str, bytes]:
+        now = self._clock()
+        found = {}
+        for key in keys:
+            entry = self._data.get(key)
+            if entry is None:
+                continue
+            expires_at, value = entry
+            if expires_at <= now:
+                del self._data[key]
+                continue
+            self._data.move_to_end(key)
+            found[key] = value
+        return found
+
+    async def set_many(self, items: Mapping[str, bytes], ttl: float) -> None:
+        expires_at = self._clock() + ttl
+        for key, value in items.items():
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+        while len(self._data) > self.max_size:
+            self._data.popitem(last=False)
+
+    async def delete_many(self, keys: Sequence[str]) -> None:
+        for key in keys:
+            self._data.pop(key, None)
+
+    async def clear(self) -> None:
+        self._data.clear()
+
+
+class RedisCache:
+    """
+    Кэш в Redis, общий для всех процессов приложения.
+
+    Ошибки Redis не прерывают запрос: чтение считается промахом, запись
+    пропускается, ошибка учитывается в счетчике cache.redis_errors.
+    """
+
+    def __init__(self, client: "Redis", prefix: str) -> None:
+        self.client = client
+        self.prefix = prefix
+
+    async def get_many(self, keys: Sequence[str]) -> Dict[str, bytes]:
+        if not keys:
+            return {}
+        try:
+            values = await self.client.mget([self.prefix + key for key in keys])
+        except RedisError:
+            metrics.inc("cache.redis_errors")
+            return {}
+        return {key: value for key, value in zip(keys, values) if value is not None}
+
+    async def set_many(self, items: Mapping[str, bytes], ttl: float) -> None:
+        if not items:
+            return
+        try:
+            async with self.client.pipeline(transaction=False) as pipe:
+                for key, value in items.items():
+                    pipe.set(self.prefix + key, value, px=int(ttl * 1000))
+                await pipe.execute()
+        except RedisError:
+            metrics.inc("cache.redis_errors")
+
+    async def delete_many(self, keys: Sequence[str]) -> None:
+        if not keys:
+            return
+        try:
+            await self.client.delete(*(self.prefix + key for key in keys))
+        except RedisError:
+            metrics.inc("cache.redis_errors")
+
+    async def clear(self) -> None:
+        try:
+            keys = [key async for key in self.client.scan_iter(self.prefix + "*")]
+            if keys:
+                await self.client.delete(*keys)
+        except RedisError:
+            metrics.inc("cache.redis_errors")
+
+
+def create_cache(backend: str, namespace: str, max_size: int) -> Optional[CacheBackend]:
+    """
+    Создает бэкенд кэша по имени из настроек: memory, redis или none.
+    """
+    if backend == "none":
+        return None
+    if backend == "memory":
+        return MemoryCache(max_size)
+    if backend == "redis":
+        client = Redis(
+            host=settings.redis_host,
+            port=settings.redis_port,
+            db=settings.redis_cache_db,
+        )
+        return RedisCache(client, prefix=f"service_desk:{namespace}:")
+    raise ValueError(f"Неизвестный бэкенд кэша: {backend}")
@@ -37,3 +37,65 @@ class Settings(BaseSettings):
     POSTGRES_USER: str = Field(description="Postgres user")
     POSTGRES_PASSWORD: str = Field(description="Postgres password")
     POSTGRES_DB: str = Field(description="Postgres db name")
+    bcrypt_rounds: int = Field(12, description="Стоимость bcrypt (log2 числа раундов)")
+    password_hash_workers: int = Field(
+        4, description="Размер пула для хэширования паролей, 0 - без пула"
+    )
+    password_hash_executor: str = Field(
+        "thread", description="Тип пула хэширования паролей: thread или process"
+    )
+    redis_cache_db: int = Field(1, description="Номер базы Redis для кэша")
+    user_cache_backend: str = Field(
+        "memory", description="Бэкенд кэша пользователей: memory, redis или none"
+    )
+    user_cache_ttl: float = Field(300, description="Время жизни записи кэша, с")
+    user_cache_negative_ttl: float = Field(
+        30, description="Время жизни записи об отсутствующем пользователе, с"
+    )
+    user_cache_max_size: int = Field(
+        10000, description="Размер кэша пользователей в памяти процесса"
+    )
+    ticket_cache_backend: str = Field(
+        "memory", description="Бэкенд кэша обращений: memory, redis или none"
+    )
+    ticket_cache_ttl: float = Field(60, description="Время жизни записи кэша, с")
+    ticket_cache_max_size: int = Field(
+        10000, description="Размер кэша обращений в памяти процесса"
+    )
+    coalesce_reads: bool = Field(
+        True, description="Объединять одинаковые одновременные запросы чтения"
+    )
+    smtp_pool_size: int = Field(
+        2, description="Свободных SMTP соединений в пуле процесса, 0 - без пула"
+    )
+    smtp_pool_max_messages: int = Field(
+        100, description="Писем через одно SMTP соединение до его закрытия"
+    )
+    smtp_pool_max_age: float = Field(
+        300, description="Время жизни SMTP соединения в пуле, с"
+    )
+    smtp_pool_check_after: float = Field(
+        5, description="Простой SMTP соединения, после которого оно проверяется NOOP, с"
+    )
+    email_batch_window: float = Field(
+        0.5, description="Время накопления писем в пачку, с; 0 - без накопления"
+    )
+    email_batch_max_size: int = Field(100, description="Максимум писем в пачке")
+    email_retry_delay: float = Field(
+        60, description="Задержка повтора письма, не отправленного в пачке, с"
+    )
+    email_max_retries: int = Field(
+        5, description="Повторов письма с временной ошибкой отправки"
+    )
+    email_retry_backoff_max: int = Field(
+        3600, description="Максимальная задержка между повторами письма, с"
+    )
+    smtp_async_concurrency: int = Field(
+        4, description="Одновременных SMTP соединений отправки на asyncio"
+    )
+    smtp_async_timeout: float = Field(
+        30, description="Таймаут подключения и ответа SMTP на asyncio, с"
+    )
+    imap_fetch_chunk_size: int = Field(
+        500, description="Писем в одной команде IMAP FETCH"
+    )
@@ -22,6 +22,14 @@ async def get_async_session() -> AsyncGenerator[AsyncSession, None]:
         yield session
 
 
+def get_session_maker() -> async_sessionmaker[AsyncSession]:
+    """
+    Фабрика сессий для кода, который живет дольше зависимостей запроса
+    (например, потоковых ответов).
+    """
+    return async_session_maker
+
+
 async def create_db_and_tables() -> None:
     from app.database.models import Base
 
@@ -0,0 +1,35 @@
+from collections import Counter
+from typing import Dict
+
+
+class Metrics:
+    """
+    Счетчики процесса для эндпоинта /api/metrics.
+
+    Значения считаются в пределах одного процесса: при нескольких воркерах
+    у каждого воркера свои счетчики.
+    """
+
+    def __init__(self) -> None:
+        self._counters: Counter[str] = Counter()
+
+    def inc(self, name: str, value: int = 1) -> None:
+        """
+        Увеличивает счетчик.
+        """
+        self._counters[name] += value
+
+    def snapshot(self) -> Dict[str, int]:
+        """
+        Возвращает текущие значения счетчиков.
+        """
+        return dict(sorted(self._counters.items()))
+
+    def reset(self) -> None:
+        """
+        Обнуляет все счетчики.
+        """
+        self._counters.clear()
+
+
+metrics = Metrics()
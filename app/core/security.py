@@ -0,0 +1,134 @@
+import asyncio
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import lru_cache
+from typing import List, Optional, Sequence, Tuple
+
+from passlib.context import CryptContext
+
+from app.core.config import Settings
+
+settings = Settings()
+
+
+@lru_cache
+def get_crypt_context(rounds: int) -> CryptContext:
+    """
+    Контекст хэширования bcrypt с заданной стоимостью.
+
+    Хэши с другой стоимостью считаются устаревшими и перехэшируются при проверке.
+    """
+    return CryptContext(
+        schemes=["bcrypt"],
+        deprecated="auto",
+        bcrypt__default_rounds=rounds,
+        bcrypt__min_rounds=rounds,
+        bcrypt__max_rounds=rounds,
+    )
+
+
+def hash_password(password: str, rounds: int) -> str:
+    """
+    Хэширует пароль. Выполняется в пуле, поэтому функция модульная и picklable.
+    """
+    hashed: str = get_crypt_context(rounds).hash(password)
+    return hashed
+
+
+def verify_password(
+    password: str, hashed_password: str, rounds: int
+) -> Tuple[bool, Optional[str]]:
+    """
+    Проверяет пароль и возвращает новый хэш, если изменилась стоимость bcrypt.
+    """
+    result: Tuple[bool, Optional[str]] = get_crypt_context(rounds).verify_and_update(
+        password, hashed_password
+    )
+    return result
+
+
+class PasswordHasher:
+    """
+    Хэширование паролей вне цикла событий.
+
+    bcrypt занимает десятки миллисекунд на хэш, поэтому вычисления выполняются
+    в ограниченном пуле потоков или процессов. При workers=0 хэширование
+    выполняется прямо в цикле событий (только для отладки и сравнения).
+    """
+
+    def __init__(self, rounds: int, workers: int, executor: str = "thread") -> None:
+        if executor not in ("thread", "process"):
+            raise ValueError(f"Неизвестный тип пула хэширования: {executor}")
+        self.rounds = rounds
+        self.workers = workers
+        self.executor_type = executor
+        self._executor: Optional[Executor] = None
+
+    @property
+    def executor(self) -> Optional[Executor]:
+        if self.workers <= 0:
+            return None
+        if self._executor is None:
+            if self.executor_type == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers, thread_name_prefix="password-hasher"
+                )
+        return self._executor
+
+    async def hash(self, password: str) -> str:
+        """
+        Хэширует пароль в пуле.
+        """
+        executor = self.executor
+        if executor is None:
+            return hash_password(password, self.rounds)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            executor, hash_password, password, self.rounds
+        )
+
+    async def hash_many(self, passwords: Sequence[str]) -> List[str]:
+        """
+        Хэширует пароли параллельно, насколько позволяет размер пула.
+
+        В пул одновременно передается не больше workers паролей: очередь пула
+        общая, и хэши регистраций и проверки входа встают в нее между хэшами
+        массовой операции, а не после всех ее паролей.
+        """
+        semaphore = asyncio.Semaphore(max(self.workers, 1))
+
+        async def hash_one(password: str) -> str:
+            async with semaphore:
+                return await self.hash(password)
+
+        return list(await asyncio.gather(*(hash_one(p) for p in passwords)))
+
+    async def verify(
+        self, password: str, hashed_password: str
+    ) -> Tuple[bool, Optional[str]]:
+        """
+        Проверяет пароль в пуле, возвращает (результат, новый хэш или None).
+        """
+        executor = self.executor
+        if executor is None:
+            return verify_password(password, hashed_password, self.rounds)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            executor, verify_password, password, hashed_password, self.rounds
+        )
+
+    def shutdown(self) -> None:
+        """
+        Останавливает пул.
+        """
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+
+password_hasher = PasswordHasher(
+    rounds=settings.bcrypt_rounds,
+    workers=settings.password_hash_workers,
+    executor=settings.password_hash_executor,
+)
@@ -0,0 +1,63 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple, TypeVar
+
+from app.core.config import Settings
+from app.core.metrics import metrics
+
+settings = Settings()
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """
+    Объединение одинаковых одновременных вычислений.
+
+    Первый вызов с ключом запускает вычисление отдельной задачей, остальные
+    вызовы с тем же ключом до ее завершения ждут тот же результат или ту же
+    ошибку. Отмена одного из ожидающих не отменяет вычисление для остальных.
+    Результат не хранится после завершения задачи, это не кэш.
+    """
+
+    def __init__(self, name: str, enabled: bool = True) -> None:
+        self.name = name
+        self.enabled = enabled
+        self._inflight: Dict[Tuple[str, Hashable], "asyncio.Future[Any]"] = {}
+
+    def __len__(self) -> int:
+        return len(self._inflight)
+
+    async def run(
+        self, route: str, params: Hashable, compute: Callable[[], Awaitable[T]]
+    ) -> T:
+        """
+        Выполняет compute или присоединяется к уже идущему вычислению.
+
+        Ключ состоит из маршрута и нормализованных параметров запроса.
+        """
+        if not self.enabled:
+            return await compute()
+        key = (route, params)
+        future = self._inflight.get(key)
+        if future is None:
+            metrics.inc(f"{self.name}.executed")
+            future = asyncio.ensure_future(compute())
+            self._inflight[key] = future
+            future.add_done_callback(lambda done: self._finish(key, done))
+        else:
+            metrics.inc(f"{self.name}.coalesced")
+            metrics.inc(f"{self.name}.coalesced.{route}")
+        result: T = await asyncio.shield(future)
+        return result
+
+    def _finish(self, key: Tuple[str, Hashable], future: "asyncio.Future[Any]") -> None:
+        """
+        Убирает завершенное вычисление; ошибку забирает, даже если все
+        ожидавшие были отменены, чтобы она не попала в лог как потерянная.
+        """
+        self._inflight.pop(key, None)
+        if not future.cancelled():
+            future.exception()
+
+
+read_coalescing = SingleFlight("read_coalescing", enabled=settings.coalesce_reads)
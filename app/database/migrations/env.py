@@ -1,6 +1,7 @@
 import os
 import sys
 from logging.config import fileConfig
+from typing import Any, Optional
 
 from sqlalchemy import engine_from_config, pool
 from alembic import context
@@ -22,6 +23,15 @@ if config.config_file_name is not None:
 target_metadata = Base.metadata
 
 
+def include_object(
+    obj: Any, name: Optional[str], type_: str, reflected: bool, compare_to: Any
+) -> bool:
+    """Исключает из автогенерации поисковые колонки и индексы, которых нет в моделях."""
+    if reflected and compare_to is None and name and "search_vector" in name:
+        return False
+    return True
+
+
 def run_migrations_offline() -> None:
     """Запуск миграций в 'offline' режиме."""
     url = settings.database_url
@@ -30,6 +40,7 @@ def run_migrations_offline() -> None:
         target_metadata=target_metadata,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
+        include_object=include_object,
     )
 
     with context.begin_transaction():
@@ -51,7 +62,11 @@ def run_migrations_online() -> None:
     )
 
     with connectable.connect() as connection:
-        context.configure(connection=connection, target_metadata=target_metadata)
+        context.configure(
+            connection=connection,
+            target_metadata=target_metadata,
+            include_object=include_object,
+        )
 
         with context.begin_transaction():
             context.run_migrations()
@@ -0,0 +1,26 @@
+"""add ticket version
+
+Revision ID: 7c1f3a9d2b64
+Revises: 252ee98085da
+Create Date: 2026-10-17 03:10:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c1f3a9d2b64'
+down_revision: Union[str, None] = '252ee98085da'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('tickets', sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+
+
+def downgrade() -> None:
+    op.drop_column('tickets', 'version')
@@ -0,0 +1,54 @@
+"""add search vectors
+
+Revision ID: a3e5d8c1f042
+Revises: 7c1f3a9d2b64
+Create Date: 2026-10-17 03:40:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3e5d8c1f042'
+down_revision: Union[str, None] = '7c1f3a9d2b64'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Генерируемые колонки пересчитываются PostgreSQL при каждой записи строки;
+    # добавление колонки перезаписывает таблицу
+    op.execute(
+        """
+        ALTER TABLE tickets ADD COLUMN IF NOT EXISTS search_vector tsvector
+        GENERATED ALWAYS AS (
+            setweight(to_tsvector('russian', coalesce(subject, '')), 'A')
+            || setweight(to_tsvector('russian', coalesce(description, '')), 'B')
+        ) STORED
+        """
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_tickets_search_vector "
+        "ON tickets USING gin (search_vector)"
+    )
+    op.execute(
+        """
+        ALTER TABLE messages ADD COLUMN IF NOT EXISTS search_vector tsvector
+        GENERATED ALWAYS AS (
+            setweight(to_tsvector('russian', coalesce(text, '')), 'C')
+        ) STORED
+        """
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_messages_search_vector "
+        "ON messages USING gin (search_vector)"
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_messages_search_vector', table_name='messages')
+    op.drop_column('messages', 'search_vector')
+    op.drop_index('ix_tickets_search_vector', table_name='tickets')
+    op.drop_column('tickets', 'search_vector')
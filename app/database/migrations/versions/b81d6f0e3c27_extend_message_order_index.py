@@ -0,0 +1,31 @@
+"""extend message order index
+
+Revision ID: b81d6f0e3c27
+Revises: e4b7c2a91d35
+Create Date: 2026-10-17 04:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b81d6f0e3c27'
+down_revision: Union[str, None] = 'e4b7c2a91d35'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # id в индексе дает полный порядок (created_at, id) без досортировки
+    # при одинаковом created_at и поиск позиции курсора after_id
+    with op.get_context().autocommit_block():
+        op.create_index('ix_messages_ticket_id_created_at_id', 'messages', ['ticket_id', 'created_at', 'id'], unique=False, postgresql_concurrently=True, if_not_exists=True)
+        op.drop_index('ix_messages_ticket_id_created_at', table_name='messages', postgresql_concurrently=True, if_exists=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index('ix_messages_ticket_id_created_at', 'messages', ['ticket_id', 'created_at'], unique=False, postgresql_concurrently=True, if_not_exists=True)
+        op.drop_index('ix_messages_ticket_id_created_at_id', table_name='messages', postgresql_concurrently=True, if_exists=True)
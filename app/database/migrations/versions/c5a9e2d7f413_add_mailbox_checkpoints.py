@@ -0,0 +1,34 @@
+"""add mailbox checkpoints
+
+Revision ID: c5a9e2d7f413
+Revises: b81d6f0e3c27
+Create Date: 2026-10-17 05:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c5a9e2d7f413'
+down_revision: Union[str, None] = 'b81d6f0e3c27'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('mailbox_checkpoints',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('mailbox', sa.String(), nullable=False),
+    sa.Column('uidvalidity', sa.BigInteger(), nullable=False),
+    sa.Column('last_uid', sa.BigInteger(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('mailbox')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('mailbox_checkpoints')
@@ -0,0 +1,37 @@
+"""index tickets updated_at
+
+Revision ID: d3f8a1c6b920
+Revises: c5a9e2d7f413
+Create Date: 2026-10-17 06:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd3f8a1c6b920'
+down_revision: Union[str, None] = 'c5a9e2d7f413'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+ACTIVE_STATUSES = sa.text("status IN ('open', 'in_progress')")
+
+
+def upgrade() -> None:
+    # Снимок ETag списков теперь max(updated_at) по всей таблице, а не
+    # count и max по активным статусам; частичный индекс по активным
+    # статусам переходит на порядок очереди (created_at, id)
+    with op.get_context().autocommit_block():
+        op.create_index('ix_tickets_updated_at', 'tickets', ['updated_at'], unique=False, postgresql_concurrently=True, if_not_exists=True)
+        op.create_index('ix_tickets_active_created_at_id', 'tickets', ['created_at', 'id'], unique=False, postgresql_where=ACTIVE_STATUSES, postgresql_concurrently=True, if_not_exists=True)
+        op.drop_index('ix_tickets_active_status_updated_at', table_name='tickets', postgresql_concurrently=True, if_exists=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index('ix_tickets_active_status_updated_at', 'tickets', ['status', 'updated_at'], unique=False, postgresql_where=ACTIVE_STATUSES, postgresql_concurrently=True, if_not_exists=True)
+        op.drop_index('ix_tickets_active_created_at_id', table_name='tickets', postgresql_concurrently=True, if_exists=True)
+        op.drop_index('ix_tickets_updated_at', table_name='tickets', postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,42 @@
+"""add ticket query indexes
+
+Revision ID: e4b7c2a91d35
+Revises: a3e5d8c1f042
+Create Date: 2026-10-17 03:50:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4b7c2a91d35'
+down_revision: Union[str, None] = 'a3e5d8c1f042'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+ACTIVE_STATUSES = sa.text("status IN ('open', 'in_progress')")
+
+
+def upgrade() -> None:
+    # CREATE INDEX CONCURRENTLY не блокирует запись в таблицы, но не может
+    # выполняться внутри транзакции
+    with op.get_context().autocommit_block():
+        op.create_index('ix_tickets_status_created_at_id', 'tickets', ['status', 'created_at', 'id'], unique=False, postgresql_concurrently=True, if_not_exists=True)
+        op.create_index('ix_tickets_created_at_id', 'tickets', ['created_at', 'id'], unique=False, postgresql_concurrently=True, if_not_exists=True)
+        op.create_index('ix_tickets_active_status_updated_at', 'tickets', ['status', 'updated_at'], unique=False, postgresql_where=ACTIVE_STATUSES, postgresql_concurrently=True, if_not_exists=True)
+        op.create_index(op.f('ix_tickets_creator_id'), 'tickets', ['creator_id'], unique=False, postgresql_concurrently=True, if_not_exists=True)
+        op.create_index(op.f('ix_tickets_operator_id'), 'tickets', ['operator_id'], unique=False, postgresql_concurrently=True, if_not_exists=True)
+        op.create_index('ix_messages_ticket_id_created_at', 'messages', ['ticket_id', 'created_at'], unique=False, postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_messages_ticket_id_created_at', table_name='messages', postgresql_concurrently=True)
+        op.drop_index(op.f('ix_tickets_operator_id'), table_name='tickets', postgresql_concurrently=True)
+        op.drop_index(op.f('ix_tickets_creator_id'), table_name='tickets', postgresql_concurrently=True)
+        op.drop_index('ix_tickets_active_status_updated_at', table_name='tickets', postgresql_concurrently=True)
+        op.drop_index('ix_tickets_created_at_id', table_name='tickets', postgresql_concurrently=True)
+        op.drop_index('ix_tickets_status_created_at_id', table_name='tickets', postgresql_concurrently=True)
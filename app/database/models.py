@@ -1,9 +1,21 @@
 from datetime import datetime
 from typing import Optional
 
-from sqlalchemy import Integer, String, DateTime, Text, ForeignKey, Boolean
+from sqlalchemy import (
+    BigInteger,
+    Integer,
+    String,
+    DateTime,
+    Text,
+    ForeignKey,
+    Boolean,
+    Index,
+    text,
+)
 from sqlalchemy.orm import DeclarativeBase, relationship, Mapped, mapped_column
 
+from app.database.search import install_search_ddl
+
 
 class Base(DeclarativeBase):
     pass
@@ -42,6 +54,22 @@ class Ticket(Base):
     """
 
     __tablename__ = "tickets"
+    __table_args__ = (
+        # Фильтр по статусу с курсором (created_at, id) и список без фильтра
+        Index("ix_tickets_status_created_at_id", "status", "created_at", "id"),
+        Index("ix_tickets_created_at_id", "created_at", "id"),
+        # max(updated_at) для ETag списков читается с конца индекса
+        Index("ix_tickets_updated_at", "updated_at"),
+        # Очередь активных обращений (open и in_progress) по (created_at, id);
+        # закрытые обращения, основная часть таблицы, в индекс не входят
+        Index(
+            "ix_tickets_active_created_at_id",
+            "created_at",
+            "id",
+            postgresql_where=text("status IN ('open', 'in_progress')"),
+            sqlite_where=text("status IN ('open', 'in_progress')"),
+        ),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     subject: Mapped[str] = mapped_column(String, nullable=False)
@@ -53,12 +81,15 @@ class Ticket(Base):
     updated_at: Mapped[datetime] = mapped_column(
         DateTime, default=datetime.utcnow, onupdate=datetime.utcnow
     )
-    creator_id: Mapped[int] = mapped_column(Integer, ForeignKey("users.id"))
+    version: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=1, server_default="1"
+    )  # Версия для оптимистичной блокировки, растет при каждом обновлении
+    creator_id: Mapped[int] = mapped_column(Integer, ForeignKey("users.id"), index=True)
     creator: Mapped["User"] = relationship(
         "User", back_populates="tickets", foreign_keys=[creator_id]
     )
     operator_id: Mapped[Optional[int]] = mapped_column(
-        Integer, ForeignKey("users.id"), nullable=True
+        Integer, ForeignKey("users.id"), nullable=True, index=True
     )
     operator: Mapped[Optional["User"]] = relationship(
         "User", back_populates="operator_tickets", foreign_keys=[operator_id]
@@ -72,6 +103,10 @@ class Message(Base):
     """
 
     __tablename__ = "messages"
+    __table_args__ = (
+        # Порядок сообщений обращения и курсор after_id по (created_at, id)
+        Index("ix_messages_ticket_id_created_at_id", "ticket_id", "created_at", "id"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     text: Mapped[str] = mapped_column(Text, nullable=False)
@@ -80,3 +115,25 @@ class Message(Base):
     ticket: Mapped["Ticket"] = relationship("Ticket", back_populates="messages")
     author_id: Mapped[int] = mapped_column(Integer, ForeignKey("users.id"))
     author: Mapped["User"] = relationship("User", foreign_keys=[author_id])
+
+
+class MailboxCheckpoint(Base):
+    """
+    Позиция синхронизации почтового ящика IMAP.
+
+    UID писем растут внутри ящика, пока не меняется UIDVALIDITY; письма
+    с UID не больше last_uid уже обработаны.
+    """
+
+    __tablename__ = "mailbox_checkpoints"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    mailbox: Mapped[str] = mapped_column(String, unique=True, nullable=False)
+    uidvalidity: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    last_uid: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime, default=datetime.utcnow, onupdate=datetime.utcnow
+    )
+
+
+install_search_ddl(Base.metadata.tables["tickets"], Base.metadata.tables["messages"])
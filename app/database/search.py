@@ -0,0 +1,192 @@
+import re
+from typing import List
+
+from sqlalchemy import (
+    DDL,
+    ColumnElement,
+    CompoundSelect,
+    Integer,
+    Table,
+    column,
+    event,
+    func,
+    literal_column,
+    select,
+    table,
+    union_all,
+)
+from sqlalchemy.dialects.postgresql import TSVECTOR
+
+# Конфигурация PostgreSQL: русская морфология, латиница через english_stem
+SEARCH_CONFIG = "russian"
+
+# Колонки search_vector генерируются PostgreSQL и не входят в модели,
+# поэтому ORM их не загружает и не сравнивает при автогенерации миграций
+POSTGRES_DDL = {
+    "tickets": [
+        f"""
+        ALTER TABLE tickets ADD COLUMN IF NOT EXISTS search_vector tsvector
+        GENERATED ALWAYS AS (
+            setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(subject, '')), 'A')
+            || setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(description, '')), 'B')
+        ) STORED
+        """,
+        "CREATE INDEX IF NOT EXISTS ix_tickets_search_vector "
+        "ON tickets USING gin (search_vector)",
+    ],
+    "messages": [
+        f"""
+        ALTER TABLE messages ADD COLUMN IF NOT EXISTS search_vector tsvector
+        GENERATED ALWAYS AS (
+            setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(text, '')), 'C')
+        ) STORED
+        """,
+        "CREATE INDEX IF NOT EXISTS ix_messages_search_vector "
+        "ON messages USING gin (search_vector)",
+    ],
+}
+
+# Индексы FTS5 с внешним содержимым: текст хранится только в основной
+# таблице, триггеры поддерживают индекс при изменении строк
+SQLITE_DDL = {
+    "tickets": [
+        "CREATE VIRTUAL TABLE IF NOT EXISTS tickets_fts USING fts5("
+        "subject, description, content='tickets', content_rowid='id')",
+        """
+        CREATE TRIGGER IF NOT EXISTS tickets_fts_ai AFTER INSERT ON tickets BEGIN
+            INSERT INTO tickets_fts(rowid, subject, description)
+            VALUES (new.id, new.subject, new.description);
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS tickets_fts_ad AFTER DELETE ON tickets BEGIN
+            INSERT INTO tickets_fts(tickets_fts, rowid, subject, description)
+            VALUES ('delete', old.id, old.subject, old.description);
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS tickets_fts_au
+        AFTER UPDATE OF subject, description ON tickets BEGIN
+            INSERT INTO tickets_fts(tickets_fts, rowid, subject, description)
+            VALUES ('delete', old.id, old.subject, old.description);
+            INSERT INTO tickets_fts(rowid, subject, description)
+            VALUES (new.id, new.subject, new.description);
+        END
+        """,
+    ],
+    "messages": [
+        "CREATE VIRTUAL TABLE IF NOT EXISTS messages_fts USING fts5("
+        "text, content='messages', content_rowid='id')",
+        """
+        CREATE TRIGGER IF NOT EXISTS messages_fts_ai AFTER INSERT ON messages BEGIN
+            INSERT INTO messages_fts(rowid, text) VALUES (new.id, new.text);
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS messages_fts_ad AFTER DELETE ON messages BEGIN
+            INSERT INTO messages_fts(messages_fts, rowid, text)
+            VALUES ('delete', old.id, old.text);
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS messages_fts_au
+        AFTER UPDATE OF text ON messages BEGIN
+            INSERT INTO messages_fts(messages_fts, rowid, text)
+            VALUES ('delete', old.id, old.text);
+            INSERT INTO messages_fts(rowid, text) VALUES (new.id, new.text);
+        END
+        """,
+    ],
+}
+
+_tickets = table("tickets", column("id", Integer), column("search_vector", TSVECTOR))
+_messages = table(
+    "messages",
+    column("id", Integer),
+    column("ticket_id", Integer),
+    column("search_vector", TSVECTOR),
+)
+_tickets_fts = table("tickets_fts", column("rowid", Integer))
+_messages_fts = table("messages_fts", column("rowid", Integer))
+
+
+def _ddl(statement: str, dialect: str) -> DDL:
+    """
+    DDL, выполняемый только для указанного диалекта.
+    """
+    return DDL(statement).execute_if(dialect=dialect)  # type: ignore[no-untyped-call]
+
+
+def install_search_ddl(tickets: Table, messages: Table) -> None:
+    """
+    Добавляет поисковые индексы к созданию таблиц через metadata.create_all.
+
+    Для PostgreSQL то же делает миграция, команды идемпотентны.
+    """
+    for target in (tickets, messages):
+        for statement in POSTGRES_DDL[target.name]:
+            event.listen(target, "after_create", _ddl(statement, "postgresql"))
+        for statement in SQLITE_DDL[target.name]:
+            event.listen(target, "after_create", _ddl(statement, "sqlite"))
+        # Триггеры удаляются вместе с таблицей, виртуальная таблица - нет
+        drop_fts = f"DROP TABLE IF EXISTS {target.name}_fts"
+        event.listen(target, "before_drop", _ddl(drop_fts, "sqlite"))
+
+
+def search_terms(query: str) -> List[str]:
+    """
+    Разбивает поисковую строку на слова.
+    """
+    return re.findall(r"\w+", query)
+
+
+def _fts5_query(terms: List[str]) -> str:
+    """
+    Запрос FTS5, где все слова обязательны, а операторы FTS5 экранированы.
+    """
+    return " ".join(f'"{term}"' for term in terms)
+
+
+def search_hits(dialect: str, query: str) -> CompoundSelect:
+    """
+    Строит запрос совпадений (ticket_id, rank) по обращениям и сообщениям.
+
+    Обращение может встретиться несколько раз: по своему тексту и по каждому
+    совпавшему сообщению. Больший rank означает лучшее совпадение.
+    """
+    terms = search_terms(query)
+    if not terms:
+        raise ValueError("Пустой поисковый запрос")
+
+    if dialect == "postgresql":
+        tsquery = func.plainto_tsquery(SEARCH_CONFIG, " ".join(terms))
+        ticket_vector = _tickets.c.search_vector
+        message_vector = _messages.c.search_vector
+        return union_all(
+            select(
+                _tickets.c.id.label("ticket_id"),
+                func.ts_rank(ticket_vector, tsquery).label("rank"),
+            ).where(ticket_vector.op("@@")(tsquery)),
+            select(_messages.c.ticket_id, func.ts_rank(message_vector, tsquery)).where(
+                message_vector.op("@@")(tsquery)
+            ),
+        )
+
+    if dialect == "sqlite":
+        match = _fts5_query(terms)
+        tickets_fts: ColumnElement[str] = literal_column("tickets_fts")
+        messages_fts: ColumnElement[str] = literal_column("messages_fts")
+        # bm25 тем меньше, чем лучше совпадение
+        return union_all(
+            select(
+                _tickets_fts.c.rowid.label("ticket_id"),
+                (-func.bm25(tickets_fts)).label("rank"),
+            ).where(tickets_fts.op("MATCH")(match)),
+            select(_messages.c.ticket_id, -func.bm25(messages_fts))
+            .select_from(
+                _messages_fts.join(_messages, _messages.c.id == _messages_fts.c.rowid)
+            )
+            .where(messages_fts.op("MATCH")(match)),
+        )
+
+    raise ValueError(f"Полнотекстовый поиск не поддерживается для диалекта {dialect}")
@@ -0,0 +1,160 @@
+from operator import attrgetter, itemgetter
+from typing import (
+    Any,
+    Dict,
+    Generic,
+    Iterable,
+    List,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+    Type,
+    TypeVar,
+)
+
+from pydantic import BaseModel, TypeAdapter
+from sqlalchemy import inspect
+from sqlalchemy.orm import DeclarativeBase
+
+SchemaT = TypeVar("SchemaT", bound=BaseModel)
+
+
+class Fieldset(NamedTuple):
+    """
+    Выборка полей ответа: колонки и связи, разворачиваемые в объекты.
+    """
+
+    columns: Tuple[str, ...]
+    relationships: Tuple[Tuple[str, str], ...]
+
+    @property
+    def load_columns(self) -> Tuple[str, ...]:
+        """
+        Колонки, читаемые из базы: выбранные и внешние ключи развернутых связей.
+        """
+        fk_keys = tuple(fk_key for _, fk_key in self.relationships)
+        return tuple(dict.fromkeys(self.columns + fk_keys))
+
+
+class ModelSerializer(Generic[SchemaT]):
+    """
+    Сериализатор модели SQLAlchemy в схему Pydantic.
+
+    План сериализации (колонки и связи, нужные схеме) вычисляется один раз
+    при создании, поэтому на каждый объект приходится только чтение атрибутов
+    и один вызов валидатора pydantic-core.
+    """
+
+    def __init__(self, model: Type[DeclarativeBase], schema: Type[SchemaT]) -> None:
+        mapper = inspect(model)
+        fields = schema.model_fields
+        self.schema = schema
+        self.columns = tuple(
+            attr.key for attr in mapper.column_attrs if attr.key in fields
+        )
+        # Связь заполняется по значению внешнего ключа: creator -> creator_id
+        self.relationships = tuple(
+            (rel.key, mapper.get_property_by_column(next(iter(rel.local_columns))).key)
+            for rel in mapper.relationships
+            if rel.key in fields
+        )
+        self._selectable = self.columns + tuple(
+            fk_key for _, fk_key in self.relationships
+        )
+        self._get_loaded = itemgetter(*self.columns)
+        self._get_columns = attrgetter(*self.columns)
+        self._list_adapter = TypeAdapter(List[schema])  # type: ignore[valid-type]
+
+    def _to_dict(
+        self, obj: DeclarativeBase, related: Optional[Mapping[Any, Any]]
+    ) -> dict[str, Any]:
+        try:
+            # Загруженные значения лежат в __dict__ и читаются без дескрипторов
+            values = self._get_loaded(obj.__dict__)
+        except KeyError:
+            values = self._get_columns(obj)
+        if len(self.columns) == 1:
+            values = (values,)
+        obj_dict = dict(zip(self.columns, values))
+        for key, fk_key in self.relationships:
+            fk_value = getattr(obj, fk_key)
+            obj_dict[key] = related.get(fk_value) if related is not None else None
+        return obj_dict
+
+    def serialize(
+        self, obj: DeclarativeBase, related: Optional[Mapping[Any, Any]] = None
+    ) -> SchemaT:
+        """
+        Строит схему из объекта модели.
+
+        related: уже загруженные связанные схемы по значению внешнего ключа.
+        """
+        if not self.relationships:
+            return self.schema.model_validate(obj, from_attributes=True)
+        return self.schema.model_validate(self._to_dict(obj, related))
+
+    def serialize_many(
+        self,
+        objs: Sequence[DeclarativeBase],
+        related: Optional[Mapping[Any, Any]] = None,
+    ) -> List[SchemaT]:
+        """
+        Строит список схем одним вызовом закэшированного TypeAdapter.
+        """
+        if not self.relationships:
+            return self._list_adapter.validate_python(objs, from_attributes=True)
+        return self._list_adapter.validate_python(
+            [self._to_dict(obj, related) for obj in objs]
+        )
+
+    def fieldset(
+        self,
+        fields: Optional[Iterable[str]] = None,
+        expand: Iterable[str] = (),
+        required: Iterable[str] = ("id",),
+    ) -> Fieldset:
+        """
+        Строит выборку полей по именам из запроса.
+
+        fields: колонки схемы или внешние ключи связей, по умолчанию все колонки
+        схемы; required добавляются всегда. expand: связи, которые нужно
+        развернуть в объекты. Неизвестные имена вызывают ValueError.
+        """
+        columns = (
+            self.columns
+            if fields is None
+            else tuple(dict.fromkeys([*required, *fields]))
+        )
+        expand = tuple(dict.fromkeys(expand))
+        relationships = dict(self.relationships)
+        unknown = [key for key in columns if key not in self._selectable]
+        unknown += [key for key in expand if key not in relationships]
+        if unknown:
+            raise ValueError(f"Неизвестные поля: {', '.join(unknown)}")
+        return Fieldset(columns, tuple((key, relationships[key]) for key in expand))
+
+    def serialize_fields(
+        self,
+        objs: Sequence[DeclarativeBase],
+        fieldset: Fieldset,
+        related: Optional[Mapping[Any, Any]] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Строит словари только с выбранными полями, без валидации схемой.
+
+        Читаются только колонки выборки, поэтому объекты можно загружать
+        с load_only по Fieldset.load_columns.
+        """
+        related = related or {}
+        return [
+            {
+                **{key: getattr(obj, key) for key in fieldset.columns},
+                **{
+                    key: related.get(getattr(obj, fk_key))
+                    for key, fk_key in fieldset.relationships
+                },
+            }
+            for obj in objs
+        ]
@@ -1,4 +1,9 @@
-from typing import Any
+import base64
+import binascii
+from datetime import datetime
+from typing import Any, Tuple, Type
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import DeclarativeBase
 
 Base = DeclarativeBase
@@ -21,3 +26,59 @@ def map_db_model_to_dict(obj: Base) -> dict[str, Any]:
             ]
 
     return obj_dict
+
+
+def encode_cursor(created_at: datetime, obj_id: int) -> str:
+    """
+    Кодирует позицию записи (created_at, id) в непрозрачный курсор.
+    """
+    raw = f"{created_at.isoformat()}|{obj_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """
+    Декодирует курсор, полученный из encode_cursor, в пару (created_at, id).
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        raw = base64.urlsafe_b64decode(padded.encode()).decode()
+        created_at, obj_id = raw.rsplit("|", 1)
+        return datetime.fromisoformat(created_at), int(obj_id)
+    except (ValueError, binascii.Error, UnicodeDecodeError):
+        raise ValueError("Некорректный курсор")
+
+
+def encode_rank_cursor(rank: float, obj_id: int) -> str:
+    """
+    Кодирует позицию записи в ранжированной выдаче (rank, id) в курсор.
+    """
+    raw = f"{rank!r}|{obj_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_rank_cursor(cursor: str) -> Tuple[float, int]:
+    """
+    Декодирует курсор, полученный из encode_rank_cursor, в пару (rank, id).
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        raw = base64.urlsafe_b64decode(padded.encode()).decode()
+        rank, obj_id = raw.rsplit("|", 1)
+        return float(rank), int(obj_id)
+    except (ValueError, binascii.Error, UnicodeDecodeError):
+        raise ValueError("Некорректный курсор")
+
+
+def dialect_insert(
+    session: AsyncSession, model: Type[Base]
+) -> postgresql.Insert | sqlite.Insert:
+    """
+    Возвращает INSERT диалекта сессии с поддержкой ON CONFLICT.
+    """
+    dialect = session.get_bind().dialect.name
+    if dialect == "postgresql":
+        return postgresql.insert(model)
+    if dialect == "sqlite":
+        return sqlite.insert(model)
+    raise ValueError(f"ON CONFLICT не поддерживается для диалекта {dialect}")
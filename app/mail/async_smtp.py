@@ -0,0 +1,320 @@
+import asyncio
+import base64
+import re
+import ssl
+import time
+from email.message import Message
+from email.utils import getaddresses
+from typing import Awaitable, Callable, Dict, List, Optional, Sequence, Set, Tuple
+from smtplib import (
+    SMTPAuthenticationError,
+    SMTPConnectError,
+    SMTPDataError,
+    SMTPRecipientsRefused,
+    SMTPResponseException,
+    SMTPSenderRefused,
+    SMTPServerDisconnected,
+)
+
+from app.mail.errors import keeps_connection
+
+
+def _message_data(msg: Message) -> bytes:
+    """
+    Тело письма для DATA: строки через CRLF, точки в начале строк удвоены.
+    """
+    data = msg.as_bytes(policy=msg.policy.clone(linesep="\r\n"))
+    data = re.sub(rb"(?m)^\.", b"..", data)
+    if not data.endswith(b"\r\n"):
+        data += b"\r\n"
+    return data + b".\r\n"
+
+
+class AsyncSMTPConnection:
+    """
+    Авторизованное SMTP соединение на asyncio.
+
+    Команды транзакции MAIL, RCPT и DATA отправляются одним пакетом, если
+    сервер объявил PIPELINING, иначе по одной. Ошибки те же, что у smtplib,
+    ожидание каждого ответа ограничено timeout секундами.
+    """
+
+    def __init__(
+        self,
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter,
+        timeout: float,
+    ) -> None:
+        self._reader = reader
+        self._writer = writer
+        self.timeout = timeout
+        self.extensions: Set[str] = set()
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+        self.sent = 0
+
+    @classmethod
+    async def open(
+        cls,
+        host: str,
+        port: int,
+        user: str,
+        password: str,
+        timeout: float,
+        tls: bool = True,
+    ) -> "AsyncSMTPConnection":
+        """
+        Подключается (по умолчанию через TLS, как SMTP_SSL) и авторизуется.
+        """
+        context = ssl.create_default_context() if tls else None
+        reader, writer = await asyncio.wait_for(
+            asyncio.open_connection(host, port, ssl=context), timeout
+        )
+        conn = cls(reader, writer, timeout)
+        try:
+            code, text = await conn._reply()
+            if code != 220:
+                raise SMTPConnectError(code, text)
+            await conn._ehlo()
+            credentials = base64.b64encode(f"\0{user}\0{password}".encode()).decode()
+            code, text = await conn._command(f"AUTH PLAIN {credentials}")
+            if code != 235:
+                raise SMTPAuthenticationError(code, text)
+        except BaseException:
+            conn.close()
+            raise
+        return conn
+
+    async def send(self, msg: Message) -> Dict[str, Tuple[int, bytes]]:
+        """
+        Отправляет письмо одной транзакцией.
+
+        Как smtplib, возвращает отказы по части получателей; если отказали
+        все, поднимает SMTPRecipientsRefused.
+        """
+        sender = getaddresses([str(msg["From"])])[0][1]
+        recipients = [
+            address
+            for _, address in getaddresses(
+                [str(value) for value in msg.get_all("To", [])]
+            )
+        ]
+        commands = [f"MAIL FROM:<{sender}>"]
+        commands += [f"RCPT TO:<{recipient}>" for recipient in recipients]
+        commands.append("DATA")
+        if "PIPELINING" in self.extensions:
+            self._write(*commands)
+            replies = [await self._reply() for _ in commands]
+        else:
+            replies = []
+            for command in commands:
+                replies.append(await self._command(command))
+                if replies[-1][0] >= 400 and command.startswith("MAIL"):
+                    break
+
+        code, text = replies[0]
+        if code != 250:
+            await self._reset(replies)
+            raise SMTPSenderRefused(code, text, sender)
+        refused = {
+            recipient: reply
+            for recipient, reply in zip(recipients, replies[1:])
+            if reply[0] not in (250, 251)
+        }
+        if len(refused) == len(recipients):
+            await self._reset(replies)
+            raise SMTPRecipientsRefused(refused)
+        code, text = replies[-1]
+        if code != 354:
+            await self._reset(replies)
+            raise SMTPDataError(code, text)
+
+        self._writer.write(_message_data(msg))
+        code, text = await self._reply()
+        if code != 250:
+            raise SMTPDataError(code, text)
+        return refused
+
+    async def noop(self) -> int:
+        code, _ = await self._command("NOOP")
+        return code
+
+    async def quit(self) -> None:
+        try:
+            await self._command("QUIT")
+        finally:
+            self.close()
+
+    def close(self) -> None:
+        self._writer.close()
+
+    async def _ehlo(self) -> None:
+        code, text = await self._command("EHLO service-desk")
+        if code != 250:
+            raise SMTPResponseException(code, text)
+        self.extensions = {
+            line.split()[0].upper() for line in text.decode().splitlines()[1:] if line
+        }
+
+    async def _reset(self, replies: List[Tuple[int, bytes]]) -> None:
+        """
+        Сбрасывает неудавшуюся транзакцию; если сервер ответил 421,
+        соединение им уже закрывается.
+        """
+        if any(code == 421 for code, _ in replies):
+            return
+        if replies[-1][0] == 354:
+            # Сервер принял DATA без получателей: пустое письмо он отклонит
+            self._write(".")
+            await self._reply()
+        await self._command("RSET")
+
+    def _write(self, *commands: str) -> None:
+        self._writer.write("".join(f"{command}\r\n" for command in commands).encode())
+
+    async def _command(self, command: str) -> Tuple[int, bytes]:
+        self._write(command)
+        return await self._reply()
+
+    async def _reply(self) -> Tuple[int, bytes]:
+        """
+        Читает ответ сервера, в том числе многострочный.
+        """
+        lines = []
+        while True:
+            try:
+                line = await asyncio.wait_for(self._reader.readline(), self.timeout)
+            except ConnectionError as error:
+                raise SMTPServerDisconnected(str(error)) from error
+            if not line:
+                raise SMTPServerDisconnected("Соединение закрыто сервером")
+            lines.append(line[4:].rstrip(b"\r\n"))
+            if line[3:4] != b"-":
+                break
+        try:
+            code = int(line[:3])
+        except ValueError:
+            raise SMTPServerDisconnected("Некорректный ответ сервера") from None
+        return code, b"\n".join(lines)
+
+
+class AsyncSMTPSender:
+    """
+    Отправка писем из цикла событий через небольшой набор соединений.
+
+    Одновременно выполняется не больше concurrency транзакций, каждая
+    в своем соединении; освободившиеся соединения используются следующими
+    письмами. Лимиты соединения и проверка NOOP те же, что у SMTPPool.
+    """
+
+    def __init__(
+        self,
+        connect: Callable[[], Awaitable[AsyncSMTPConnection]],
+        concurrency: int,
+        max_messages: int,
+        max_age: float,
+        check_after: float,
+    ) -> None:
+        self._connect = connect
+        self.concurrency = concurrency
+        self.max_messages = max_messages
+        self.max_age = max_age
+        self.check_after = check_after
+        self._idle: List[AsyncSMTPConnection] = []
+        self._slots = asyncio.Semaphore(concurrency)
+
+    def __len__(self) -> int:
+        return len(self._idle)
+
+    async def send(self, msg: Message) -> None:
+        """
+        Отправляет письмо, ожидая свободного места в пределах concurrency.
+
+        Если взятое из пула соединение оказалось закрытым сервером, письмо
+        один раз повторяется через новое соединение.
+        """
+        async with self._slots:
+            conn = await self._acquire()
+            try:
+                await conn.send(msg)
+            except SMTPServerDisconnected:
+                conn.close()
+                if not conn.sent:
+                    raise
+                conn = await self._connect()
+                try:
+                    await conn.send(msg)
+                except BaseException as error:
+                    await self._release(conn, error)
+                    raise
+            except BaseException as error:
+                await self._release(conn, error)
+                raise
+            conn.sent += 1
+            await self._release(conn)
+
+    async def send_many(self, messages: Sequence[Message]) -> List[Optional[Exception]]:
+        """
+        Отправляет письма одновременно; возвращает ошибку для каждого письма,
+        None - письмо отправлено.
+        """
+        results = await asyncio.gather(
+            *(self.send(msg) for msg in messages), return_exceptions=True
+        )
+        errors: List[Optional[Exception]] = []
+        for result in results:
+            if isinstance(result, Exception):
+                errors.append(result)
+            elif isinstance(result, BaseException):
+                raise result
+            else:
+                errors.append(None)
+        return errors
+
+    async def close(self) -> None:
+        """
+        Закрывает свободные соединения.
+        """
+        idle, self._idle = self._idle, []
+        for conn in idle:
+            await self._discard(conn)
+
+    async def _acquire(self) -> AsyncSMTPConnection:
+        while self._idle:
+            conn = self._idle.pop()
+            now = time.monotonic()
+            if self._expired(conn, now):
+                await self._discard(conn)
+            elif now - conn.last_used >= self.check_after and not await self._alive(
+                conn
+            ):
+                conn.close()
+            else:
+                return conn
+        return await self._connect()
+
+    async def _release(
+        self, conn: AsyncSMTPConnection, error: Optional[BaseException] = None
+    ) -> None:
+        conn.last_used = time.monotonic()
+        if error is not None and not keeps_connection(error):
+            conn.close()
+        elif self._expired(conn, conn.last_used) or len(self._idle) >= self.concurrency:
+            await self._discard(conn)
+        else:
+            self._idle.append(conn)
+
+    async def _discard(self, conn: AsyncSMTPConnection) -> None:
+        try:
+            await conn.quit()
+        except (SMTPServerDisconnected, SMTPResponseException, OSError):
+            pass
+
+    def _expired(self, conn: AsyncSMTPConnection, now: float) -> bool:
+        return conn.sent >= self.max_messages or now - conn.created_at >= self.max_age
+
+    async def _alive(self, conn: AsyncSMTPConnection) -> bool:
+        try:
+            return await conn.noop() == 250
+        except (SMTPServerDisconnected, OSError):
+            return False
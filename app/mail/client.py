@@ -1,13 +1,304 @@
 import smtplib
 import imaplib
 import email
+import os
+import re
+import threading
+import time
+from email.message import Message
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
-from typing import List, Tuple
+from typing import Any, Callable, List, NamedTuple, Optional, Sequence, Tuple, Union
 from app.core.config import Settings
+from app.mail.async_smtp import AsyncSMTPConnection, AsyncSMTPSender
+from app.mail.errors import keeps_connection
 
 settings = Settings()
 
+_UID = re.compile(rb"UID (\d+)")
+
+
+class IncomingEmail(NamedTuple):
+    """
+    Полученное письмо и его UID в папке.
+    """
+
+    uid: str
+    from_email: str
+    subject: str
+    body: str
+
+
+class MailboxSync(NamedTuple):
+    """
+    Результат опроса ящика: UIDVALIDITY, UID, до которого ящик просмотрен,
+    и новые письма по возрастанию UID.
+    """
+
+    uidvalidity: Optional[int]
+    last_uid: int
+    emails: List[IncomingEmail]
+
+
+def message_set(uids: Sequence[Union[str, bytes]]) -> str:
+    """
+    Набор сообщений IMAP с диапазонами подряд идущих номеров: 1:3,7,9:10.
+    """
+    numbers = sorted({int(uid) for uid in uids})
+    ranges = []
+    start = previous = numbers[0]
+    for number in numbers[1:] + [0]:
+        if number == previous + 1:
+            previous = number
+            continue
+        ranges.append(str(start) if start == previous else f"{start}:{previous}")
+        start = previous = number
+    return ",".join(ranges)
+
+
+def _fetched_messages(data: List[Any]) -> List[Tuple[str, bytes]]:
+    """
+    Пары (UID, письмо) из ответа UID FETCH.
+
+    imaplib возвращает письмо кортежем (заголовок ответа, литерал); UID
+    сервер может прислать и после литерала, в следующем элементе ответа.
+    """
+    messages = []
+    for index, item in enumerate(data):
+        if not isinstance(item, tuple):
+            continue
+        match = _UID.search(item[0])
+        if match is None and index + 1 < len(data):
+            following = data[index + 1]
+            if isinstance(following, bytes):
+                match = _UID.search(following)
+        if match is None:
+            raise ValueError("Неожиданный ответ FETCH без UID")
+        messages.append((match.group(1).decode(), item[1]))
+    return messages
+
+
+def _text_payload(part: Message) -> str:
+    payload = part.get_payload(decode=True)
+    if not isinstance(payload, bytes):
+        return ""
+    return payload.decode(part.get_content_charset() or "utf-8", errors="replace")
+
+
+def _parse_email(uid: str, raw_email: bytes) -> IncomingEmail:
+    email_message = email.message_from_bytes(raw_email)
+
+    from_email = str(email.utils.parseaddr(email_message.get("from", ""))[1])
+    subject = str(email_message.get("subject"))
+    body = ""
+
+    if email_message.is_multipart():
+        for part in email_message.walk():
+            if part.get_content_type() == "text/plain":
+                body = _text_payload(part)
+                break
+
+    else:
+        body = _text_payload(email_message)
+
+    return IncomingEmail(uid, from_email, subject, body)
+
+
+class PooledConnection:
+    """
+    Авторизованное SMTP соединение пула и его учет.
+    """
+
+    def __init__(self, server: smtplib.SMTP) -> None:
+        self.server = server
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+        self.sent = 0
+
+
+class SMTPPool:
+    """
+    Пул авторизованных SMTP соединений процесса.
+
+    Соединение после отправки возвращается в пул и используется следующими
+    письмами без нового TLS рукопожатия и login. Перед выдачей соединение,
+    простоявшее дольше check_after секунд, проверяется командой NOOP;
+    соединения старше max_age секунд или отправившие max_messages писем
+    закрываются. В пуле остается не больше size свободных соединений,
+    size = 0 отключает пул: каждое письмо идет через новое соединение.
+    После fork (воркеры Celery) унаследованные соединения не используются.
+    """
+
+    def __init__(
+        self,
+        connect: Callable[[], smtplib.SMTP],
+        size: int,
+        max_messages: int,
+        max_age: float,
+        check_after: float,
+    ) -> None:
+        self._connect = connect
+        self.size = size
+        self.max_messages = max_messages
+        self.max_age = max_age
+        self.check_after = check_after
+        self._idle: List[PooledConnection] = []
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+
+    def __len__(self) -> int:
+        return len(self._idle)
+
+    def send(self, msg: Message) -> None:
+        """
+        Отправляет письмо через соединение пула.
+
+        Если взятое из пула соединение оказалось закрытым сервером, письмо
+        один раз повторяется через новое соединение.
+        """
+        self.release(self._send_on(self.acquire(), msg))
+
+    def send_many(self, messages: Sequence[Message]) -> List[Optional[Exception]]:
+        """
+        Отправляет письма подряд через одно соединение пула.
+
+        Возвращает ошибку для каждого письма, None - письмо отправлено. Ошибка
+        письма не прерывает отправку остальных; соединение, нарушенное ошибкой
+        или исчерпавшее лимиты, заменяется новым посреди пачки. Если новое
+        соединение открыть не удалось, эта ошибка возвращается для всех
+        оставшихся писем.
+        """
+        errors: List[Optional[Exception]] = []
+        conn: Optional[PooledConnection] = None
+        for index, msg in enumerate(messages):
+            if conn is None:
+                try:
+                    conn = self.acquire()
+                except Exception as error:
+                    errors.extend([error] * (len(messages) - index))
+                    break
+            try:
+                conn = self._send_on(conn, msg)
+            except Exception as error:
+                conn = None
+                errors.append(error)
+                continue
+            errors.append(None)
+            if self._expired(conn, time.monotonic()):
+                self.release(conn)
+                conn = None
+        if conn is not None:
+            self.release(conn)
+        return errors
+
+    def _send_on(self, conn: PooledConnection, msg: Message) -> PooledConnection:
+        """
+        Отправляет письмо через conn и возвращает соединение, которым оно ушло.
+
+        При ошибке соединение уже возвращено в пул или закрыто.
+        """
+        try:
+            conn.server.send_message(msg)
+        except smtplib.SMTPServerDisconnected:
+            self.discard(conn)
+            if not conn.sent:
+                raise
+            conn = self.open()
+            try:
+                conn.server.send_message(msg)
+            except BaseException as error:
+                self.release(conn, error)
+                raise
+        except BaseException as error:
+            self.release(conn, error)
+            raise
+        conn.sent += 1
+        return conn
+
+    def acquire(self) -> PooledConnection:
+        """
+        Выдает рабочее соединение из пула или открывает новое.
+        """
+        self._check_fork()
+        while True:
+            with self._lock:
+                if not self._idle:
+                    break
+                conn = self._idle.pop()
+            now = time.monotonic()
+            if self._expired(conn, now):
+                self.discard(conn)
+            elif now - conn.last_used >= self.check_after and not self._alive(conn):
+                self.discard(conn)
+            else:
+                return conn
+        return self.open()
+
+    def open(self) -> PooledConnection:
+        """
+        Открывает новое авторизованное соединение.
+        """
+        return PooledConnection(self._connect())
+
+    def release(
+        self, conn: PooledConnection, error: Optional[BaseException] = None
+    ) -> None:
+        """
+        Возвращает соединение в пул или закрывает его.
+
+        Соединение закрывается после ошибки, которая могла его нарушить,
+        по достижении лимитов и если свободных соединений уже size.
+        """
+        conn.last_used = time.monotonic()
+        if error is not None and not keeps_connection(error):
+            self.discard(conn)
+            return
+        if self._pid == os.getpid() and not self._expired(conn, conn.last_used):
+            with self._lock:
+                if len(self._idle) < self.size:
+                    self._idle.append(conn)
+                    return
+        self.discard(conn)
+
+    def discard(self, conn: PooledConnection) -> None:
+        """
+        Закрывает соединение, не возвращая его в пул.
+        """
+        try:
+            conn.server.quit()
+        except (smtplib.SMTPException, OSError):
+            conn.server.close()
+
+    def close(self) -> None:
+        """
+        Закрывает все свободные соединения пула.
+        """
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            self.discard(conn)
+
+    def _expired(self, conn: PooledConnection, now: float) -> bool:
+        return conn.sent >= self.max_messages or now - conn.created_at >= self.max_age
+
+    def _alive(self, conn: PooledConnection) -> bool:
+        try:
+            code, _ = conn.server.noop()
+        except (smtplib.SMTPException, OSError):
+            return False
+        return code == 250
+
+    def _check_fork(self) -> None:
+        """
+        В дочернем процессе забывает соединения родителя: их сокеты общие,
+        и QUIT из потомка закрыл бы сессию родителя.
+        """
+        pid = os.getpid()
+        if self._pid != pid:
+            self._idle = []
+            self._lock = threading.Lock()
+            self._pid = pid
+
 
 class EmailClient:
     """
@@ -27,63 +318,188 @@ class EmailClient:
         self.imap_port = settings.email_imap_port
         self.imap_user = settings.email_imap_user
         self.imap_password = settings.email_imap_password
+        self.mailbox = f"imap://{self.imap_user}@{self.imap_host}/INBOX"
+        self.smtp_pool = SMTPPool(
+            self._connect,
+            size=settings.smtp_pool_size,
+            max_messages=settings.smtp_pool_max_messages,
+            max_age=settings.smtp_pool_max_age,
+            check_after=settings.smtp_pool_check_after,
+        )
+        self.async_sender = AsyncSMTPSender(
+            self._connect_async,
+            concurrency=settings.smtp_async_concurrency,
+            max_messages=settings.smtp_pool_max_messages,
+            max_age=settings.smtp_pool_max_age,
+            check_after=settings.smtp_pool_check_after,
+        )
+
+    def _connect(self) -> smtplib.SMTP:
+        """
+        Открывает SMTP соединение и авторизуется.
+        """
+        server = smtplib.SMTP_SSL(self.smtp_host, self.smtp_port, timeout=30)
+        try:
+            server.login(self.smtp_user, self.smtp_password)
+        except BaseException:
+            server.close()
+            raise
+        return server
+
+    async def _connect_async(self) -> AsyncSMTPConnection:
+        """
+        Открывает SMTP соединение на asyncio и авторизуется.
+        """
+        return await AsyncSMTPConnection.open(
+            self.smtp_host,
+            self.smtp_port,
+            self.smtp_user,
+            self.smtp_password,
+            timeout=settings.smtp_async_timeout,
+        )
 
-    def send_email(self, to_email: str, subject: str, message: str) -> None:
+    def build_message(self, to_email: str, subject: str, message: str) -> Message:
         msg = MIMEMultipart()
         msg["From"] = self.smtp_from_email
         msg["To"] = to_email
         msg["Subject"] = subject
         msg.attach(MIMEText(message, "plain"))
+        return msg
 
+    def send_email(
+        self, to_email: str, subject: str, message: str, raise_errors: bool = False
+    ) -> None:
+        """
+        Отправка письма через пул SMTP. Ошибка выводится в лог, а с
+        raise_errors поднимается, чтобы вызывающий код мог повторить отправку.
+        """
         try:
-            print("Подключение к SMTP серверу...")
-            with smtplib.SMTP_SSL(self.smtp_host, self.smtp_port, timeout=30) as server:
-                print("Успешное подключение. Авторизация...")
-                server.login(self.smtp_user, self.smtp_password)
-                print("Авторизация успешна. Отправка письма...")
-                server.send_message(msg)
-                print("Письмо отправлено.")
+            self.smtp_pool.send(self.build_message(to_email, subject, message))
         except Exception as e:
+            if raise_errors:
+                raise
             print(f"Ошибка при отправке mail: {e}")
 
-    def fetch_emails(self) -> List[Tuple[str, str, str]]:
-        messages: List[Tuple[str, str, str]] = []
+    def send_emails(
+        self, emails: Sequence[Tuple[str, str, str]]
+    ) -> List[Optional[Exception]]:
+        """
+        Отправляет письма (получатель, тема, текст) через одно SMTP соединение.
+
+        Возвращает ошибку отправки для каждого письма, None - письмо отправлено.
+        """
+        return self.smtp_pool.send_many(
+            [
+                self.build_message(to_email, subject, message)
+                for to_email, subject, message in emails
+            ]
+        )
+
+    async def send_email_async(self, to_email: str, subject: str, message: str) -> None:
+        """
+        Отправка письма из цикла событий, без блокировки других задач.
+        """
         try:
-            with imaplib.IMAP4_SSL(self.imap_host, self.imap_port, timeout=10) as mail:
-                mail.login(self.imap_user, self.imap_password)
-                mail.select("inbox")
+            await self.async_sender.send(self.build_message(to_email, subject, message))
+        except Exception as e:
+            print(f"Ошибка при отправке mail: {e}")
 
-                _, data = mail.search(None, "UNSEEN")
-                for num in data[0].split():
-                    _, data = mail.fetch(num, "(RFC822)")
-                    if isinstance(data, tuple) and isinstance(data[0], bytes):
-                        raw_email = data[0][1]
-                    else:
-                        raise ValueError("Неожиданный тип данных при получении mail")
+    async def send_emails_async(
+        self, emails: Sequence[Tuple[str, str, str]]
+    ) -> List[Optional[Exception]]:
+        """
+        Отправляет письма одновременно, не больше smtp_async_concurrency
+        соединений; возвращает ошибку для каждого письма, None - отправлено.
+        """
+        return await self.async_sender.send_many(
+            [
+                self.build_message(to_email, subject, message)
+                for to_email, subject, message in emails
+            ]
+        )
 
-                    email_message = email.message_from_bytes(raw_email)
+    def close(self) -> None:
+        """
+        Закрывает соединения пула SMTP.
+        """
+        self.smtp_pool.close()
 
-                    from_email = str(
-                        email.utils.parseaddr(email_message.get("from"))[1]
-                    )
-                    subject = str(email_message.get("subject"))
-                    body = ""
+    async def close_async(self) -> None:
+        """
+        Закрывает соединения отправки на asyncio.
+        """
+        await self.async_sender.close()
 
-                    if email_message.is_multipart():
-                        for part in email_message.walk():
-                            if part.get_content_type() == "text/plain":
-                                body = part.get_payload(decode=True).decode()
-                                break
+    def fetch_emails(
+        self, uidvalidity: Optional[int] = None, last_uid: int = 0
+    ) -> MailboxSync:
+        """
+        Получает новые письма ящика, не помечая их прочитанными.
 
-                    else:
-                        body = email_message.get_payload(decode=True).decode()
+        Если uidvalidity совпадает с UIDVALIDITY ящика, запрашиваются только
+        письма с UID больше last_uid, а когда UIDNEXT показывает, что новых
+        писем нет, опрос обходится без SEARCH и FETCH. Без позиции или после
+        смены UIDVALIDITY (старые UID недействительны) берутся непрочитанные
+        письма. Письма запрашиваются командами UID FETCH (BODY.PEEK[]) по
+        imap_fetch_chunk_size писем, пометку \\Seen после сохранения ставит
+        mark_seen. Письмо, которое не удалось разобрать, пропускается.
 
-                    messages.append((from_email, subject, body))
+        Новая позиция возвращается только после полного просмотра ящика: при
+        ошибке IMAP возвращается переданная позиция без писем, иначе позиция
+        с новым UIDVALIDITY и нулевым UID привела бы к загрузке всего ящика.
+        """
+        messages: List[IncomingEmail] = []
+        try:
+            with imaplib.IMAP4_SSL(self.imap_host, self.imap_port, timeout=10) as mail:
+                mail.login(self.imap_user, self.imap_password)
+                mail.select("inbox")
+                _, validity = mail.response("UIDVALIDITY")
+                _, uidnext_data = mail.response("UIDNEXT")
+                uidnext = int(uidnext_data[0]) if uidnext_data[0] else None
+
+                current = int(validity[0])
+                if current != uidvalidity:
+                    scanned = 0
+                    criteria = ["UNSEEN"]
+                elif uidnext is not None and uidnext <= last_uid + 1:
+                    return MailboxSync(uidvalidity, last_uid, messages)
+                else:
+                    scanned = last_uid
+                    criteria = ["UID", f"{last_uid + 1}:*"]
 
-                for num in data[0].split():
-                    mail.store(num, "+FLAGS", r"\Seen")
+                _, data = mail.uid("SEARCH", *criteria)
+                # Диапазон n:* включает последнее письмо, даже если его UID < n
+                uids = sorted(
+                    (uid for uid in data[0].split() if int(uid) > scanned), key=int
+                )
+                for start in range(0, len(uids), settings.imap_fetch_chunk_size):
+                    chunk = uids[start : start + settings.imap_fetch_chunk_size]
+                    _, data = mail.uid("FETCH", message_set(chunk), "(BODY.PEEK[])")
+                    for uid, raw_email in _fetched_messages(data):
+                        try:
+                            messages.append(_parse_email(uid, raw_email))
+                        except Exception as e:
+                            print(f"Ошибка при разборе письма {uid}: {e}")
+                    scanned = int(chunk[-1])
+                if uidnext is not None:
+                    scanned = max(scanned, uidnext - 1)
 
         except Exception as e:
             print(f"Ошибка при получении mail: {e}")
+            return MailboxSync(uidvalidity, last_uid, [])
+
+        return MailboxSync(current, scanned, messages)
 
-        return messages
+    def mark_seen(self, uids: Sequence[str]) -> None:
+        """
+        Помечает письма прочитанными одной командой UID STORE.
+        """
+        if not uids:
+            return
+        try:
+            with imaplib.IMAP4_SSL(self.imap_host, self.imap_port, timeout=10) as mail:
+                mail.login(self.imap_user, self.imap_password)
+                mail.select("inbox")
+                mail.uid("STORE", message_set(uids), "+FLAGS.SILENT", r"(\Seen)")
+        except Exception as e:
+            print(f"Ошибка при пометке mail прочитанными: {e}")
@@ -0,0 +1,26 @@
+import smtplib
+
+
+def keeps_connection(error: BaseException) -> bool:
+    """
+    Ошибка относится к письму, а соединение осталось рабочим.
+
+    Клиент после отказа в отправителе, получателях или данных сам сбрасывает
+    транзакцию (RSET); код 421 означает, что сервер закрывает соединение.
+    """
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return True
+    if isinstance(error, (smtplib.SMTPSenderRefused, smtplib.SMTPDataError)):
+        return error.smtp_code != 421
+    return False
+
+
+def is_permanent_error(error: BaseException) -> bool:
+    """
+    Ошибка отправки, повтор которой не поможет: ответ сервера 5xx.
+    """
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return all(code >= 500 for code, _ in error.recipients.values())
+    if isinstance(error, smtplib.SMTPResponseException):
+        return error.smtp_code >= 500
+    return False
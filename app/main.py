@@ -1,6 +1,7 @@
 from fastapi import FastAPI
 from app.api.endpoints import router as api_router
 from app.core.database import create_db_and_tables
+from app.tasks.email_tasks import email_batcher
 from app.core.config import Settings
 import uvicorn
 
@@ -17,5 +18,10 @@ async def startup_event() -> None:
     await create_db_and_tables()
 
 
+@app.on_event("shutdown")
+async def shutdown_event() -> None:
+    email_batcher.flush()
+
+
 if __name__ == "__main__":
     uvicorn.run(app, host="localhost", port=8000)
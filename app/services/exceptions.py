@@ -0,0 +1,4 @@
+class ConflictError(ValueError):
+    """
+    Ошибка конкурентного изменения: запись изменена другим запросом.
+    """
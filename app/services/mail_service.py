@@ -0,0 +1,38 @@
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database.models import MailboxCheckpoint
+from app.database.tools import dialect_insert
+
+
+async def get_mailbox_checkpoint(
+    session: AsyncSession, mailbox: str
+) -> Optional[MailboxCheckpoint]:
+    """
+    Возвращает позицию синхронизации почтового ящика.
+    """
+    checkpoint: Optional[MailboxCheckpoint] = await session.scalar(
+        select(MailboxCheckpoint).where(MailboxCheckpoint.mailbox == mailbox)
+    )
+    return checkpoint
+
+
+async def save_mailbox_checkpoint(
+    session: AsyncSession, mailbox: str, uidvalidity: int, last_uid: int
+) -> None:
+    """
+    Сохраняет позицию синхронизации одним INSERT ... ON CONFLICT DO UPDATE.
+    """
+    values = {
+        "uidvalidity": uidvalidity,
+        "last_uid": last_uid,
+        "updated_at": datetime.utcnow(),
+    }
+    stmt = dialect_insert(session, MailboxCheckpoint).values(mailbox=mailbox, **values)
+    await session.execute(
+        stmt.on_conflict_do_update(index_elements=["mailbox"], set_=values)
+    )
+    await session.commit()
@@ -0,0 +1,93 @@
+from typing import Iterable, NamedTuple, Optional, Tuple
+from uuid import uuid4
+
+from app.core.cache import CacheBackend, create_cache
+from app.core.config import Settings
+from app.core.metrics import metrics
+
+settings = Settings()
+
+
+class CachedTicket(NamedTuple):
+    """
+    Закэшированное обращение: версия для ETag и JSON схемы Ticket.
+    """
+
+    version: int
+    body: bytes
+
+
+class TicketCache:
+    """
+    Кэш сериализованных обращений по ID.
+
+    Каждая запись помечается штампом обращения, прочитанным до запроса к
+    базе. Запись в обращение меняет штамп, поэтому записи со старым штампом,
+    в том числе сохраненные запоздавшим читателем, больше не отдаются.
+    Штамп и запись читаются одним обращением к бэкенду.
+    """
+
+    def __init__(
+        self, backend: Optional[CacheBackend], ttl: float, name: str = "ticket_cache"
+    ) -> None:
+        self.backend = backend
+        self.ttl = ttl
+        self.name = name
+
+    async def get(self, ticket_id: int) -> Tuple[Optional[CachedTicket], bytes]:
+        """
+        Возвращает актуальную запись или None и штамп для сохранения новой.
+        """
+        if self.backend is None:
+            return None, b""
+        stamp_key, entry_key = f"stamp:{ticket_id}", f"ticket:{ticket_id}"
+        values = await self.backend.get_many([stamp_key, entry_key])
+        stamp = values.get(stamp_key)
+        if stamp is None:
+            stamp = uuid4().hex.encode()
+            await self.backend.set_many({stamp_key: stamp}, self.ttl * 2)
+        else:
+            entry_stamp, version, body = values.get(entry_key, b"::").split(b":", 2)
+            if entry_stamp == stamp:
+                metrics.inc(f"{self.name}.hits")
+                return CachedTicket(int(version), body), stamp
+        metrics.inc(f"{self.name}.misses")
+        return None, stamp
+
+    async def set(self, ticket_id: int, stamp: bytes, ticket: CachedTicket) -> None:
+        """
+        Сохраняет запись с штампом, полученным из get до чтения базы.
+        """
+        if self.backend is None:
+            return
+        entry = b":".join([stamp, str(ticket.version).encode(), ticket.body])
+        await self.backend.set_many({f"ticket:{ticket_id}": entry}, self.ttl)
+
+    async def invalidate(self, ticket_ids: Iterable[int]) -> None:
+        """
+        Меняет штампы обращений после записи в базу.
+        """
+        stamps = {
+            f"stamp:{ticket_id}": uuid4().hex.encode() for ticket_id in ticket_ids
+        }
+        if self.backend is None or not stamps:
+            return
+        await self.backend.set_many(stamps, self.ttl * 2)
+        metrics.inc(f"{self.name}.invalidations", len(stamps))
+
+    async def clear(self) -> None:
+        """
+        Очищает кэш.
+        """
+        if self.backend is not None:
+            await self.backend.clear()
+
+
+ticket_cache = TicketCache(
+    create_cache(
+        settings.ticket_cache_backend,
+        "tickets",
+        max_size=settings.ticket_cache_max_size,
+    ),
+    ttl=settings.ticket_cache_ttl,
+)
@@ -1,8 +1,22 @@
-from typing import List, Optional
+from datetime import datetime
+from typing import Any, AsyncIterator, List, NamedTuple, Optional, Sequence, Tuple
 
-from sqlalchemy import select, desc, asc
+from sqlalchemy import (
+    ColumnElement,
+    Select,
+    Update,
+    and_,
+    insert,
+    literal,
+    select,
+    update,
+    desc,
+    asc,
+    func,
+    tuple_,
+)
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import aliased, load_only, noload
 
 
 from app.api.schemas import (
@@ -11,18 +25,106 @@ from app.api.schemas import (
     MessageCreate,
     Message as MessageSchema,
     Ticket as TicketSchema,
+    TicketData,
 )
 from app.api.enums import SortOrder, TicketStatus
-from app.database.models import Ticket, Message
+from app.database.models import Ticket, Message, User
 from app.core.config import Settings
-from app.services import user_service
-from app.database.tools import map_db_model_to_dict
+from app.services.exceptions import ConflictError
+from app.services.ticket_cache import CachedTicket, ticket_cache
+from app.services.user_loader import UserLoader
+from app.database.serializers import Fieldset, ModelSerializer
+from app.database.search import search_hits
+from app.database.tools import decode_cursor, decode_rank_cursor, encode_rank_cursor
 
 settings = Settings()
 
 
+class TicketSearchPage(NamedTuple):
+    """
+    Страница результатов поиска и курсор следующей страницы.
+    """
+
+    tickets: List[TicketData]
+    next_cursor: Optional[str]
+
+
+class CreatedMessage(NamedTuple):
+    """
+    Созданное сообщение и данные обращения для уведомления его создателя.
+    """
+
+    message: MessageSchema
+    ticket_subject: str
+    creator_email: Optional[str]
+
+
+ticket_serializer = ModelSerializer(Ticket, TicketSchema)
+message_serializer = ModelSerializer(Message, MessageSchema)
+
+
+async def _tickets_to_schemas(
+    loader: UserLoader, tickets: Sequence[Ticket]
+) -> List[TicketSchema]:
+    """
+    Преобразует обращения в схемы, загружая создателей и операторов одним запросом.
+    """
+    users = await loader.load_many(
+        [ticket.creator_id for ticket in tickets]
+        + [ticket.operator_id for ticket in tickets]
+    )
+    return ticket_serializer.serialize_many(tickets, users)
+
+
+def _select_tickets(fieldset: Optional[Fieldset] = None) -> Select[Tuple[Ticket]]:
+    """
+    Строит SELECT обращений, читающий только колонки выборки полей.
+    """
+    stmt = select(Ticket)
+    if fieldset is not None:
+        # Пользователи берутся из загрузчика, связи ORM не загружаются никогда
+        stmt = stmt.options(
+            load_only(*(getattr(Ticket, key) for key in fieldset.load_columns)),
+            noload("*"),
+        )
+    return stmt
+
+
+async def _tickets_to_data(
+    loader: UserLoader, tickets: Sequence[Ticket], fieldset: Optional[Fieldset]
+) -> List[TicketData]:
+    """
+    Преобразует обращения в схемы или, при выборке полей, в словари.
+
+    Пользователи загружаются только для развернутых связей.
+    """
+    if fieldset is None:
+        return list(await _tickets_to_schemas(loader, tickets))
+    users = {}
+    if fieldset.relationships:
+        users = await loader.load_many(
+            getattr(ticket, fk_key)
+            for ticket in tickets
+            for _, fk_key in fieldset.relationships
+        )
+    return list(ticket_serializer.serialize_fields(tickets, fieldset, users))
+
+
+async def _messages_to_schemas(
+    loader: UserLoader, messages: Sequence[Message]
+) -> List[MessageSchema]:
+    """
+    Преобразует сообщения в схемы, загружая авторов одним запросом.
+    """
+    users = await loader.load_many([message.author_id for message in messages])
+    return message_serializer.serialize_many(messages, users)
+
+
 async def create_ticket(
-    session: AsyncSession, ticket_data: TicketCreate, creator_id: int = 1
+    session: AsyncSession,
+    ticket_data: TicketCreate,
+    creator_id: int = 1,
+    loader: Optional[UserLoader] = None,
 ) -> TicketSchema:
     """
     Создает новое обращение.
@@ -30,114 +132,371 @@ async def create_ticket(
     if not ticket_data.subject or not ticket_data.description:
         raise ValueError("Некорректные данные")
 
-    user = await user_service.get_user(session, creator_id)
+    loader = loader or UserLoader(session)
+    user = await loader.load(creator_id)
     if not user:
         raise ValueError(f"Пользователь c ID {creator_id} не найден")
     ticket = Ticket(**ticket_data.model_dump(), creator_id=creator_id)
     session.add(ticket)
     await session.commit()
     await session.refresh(ticket)
-    ticket_dict = map_db_model_to_dict(ticket)
-    ticket_dict["creator"] = user
-    return TicketSchema.model_validate(ticket_dict)
+    return ticket_serializer.serialize(ticket, {creator_id: user})
 
 
-async def get_tickets(
+async def create_tickets(
     session: AsyncSession,
-    status: Optional[TicketStatus] = None,
-    sort_by: SortOrder = SortOrder.CREATED_AT_DESC,
+    tickets_data: Sequence[TicketCreate],
+    creator_id: int = 1,
+    chunk_size: int = 1000,
+    loader: Optional[UserLoader] = None,
 ) -> List[TicketSchema]:
     """
-    Получает список обращений с возможностью фильтрации по статусу и сортировки.
+    Массово создает обращения одного создателя.
+
+    Создатель проверяется один раз, обращения вставляются многострочным
+    INSERT ... RETURNING, каждая часть фиксируется отдельной транзакцией.
     """
-    stmt = select(Ticket).options(
-        selectinload(Ticket.creator), selectinload(Ticket.operator)
-    )
+    for index, ticket_data in enumerate(tickets_data):
+        if not ticket_data.subject or not ticket_data.description:
+            raise ValueError(f"Некорректные данные в записи {index}")
+
+    loader = loader or UserLoader(session)
+    user = await loader.load(creator_id)
+    if not user:
+        raise ValueError(f"Пользователь c ID {creator_id} не найден")
+
+    tickets: List[TicketSchema] = []
+    for start in range(0, len(tickets_data), chunk_size):
+        rows = [
+            {**ticket_data.model_dump(), "creator_id": creator_id}
+            for ticket_data in tickets_data[start : start + chunk_size]
+        ]
+        stmt = insert(Ticket).values(rows).returning(Ticket)
+        created = sorted((await session.scalars(stmt)).all(), key=lambda t: t.id)
+        await session.commit()
+        tickets.extend(ticket_serializer.serialize_many(created, {creator_id: user}))
+    return tickets
+
+
+def _tickets_statement(
+    status: Optional[TicketStatus],
+    sort_by: SortOrder,
+    cursor: Optional[str] = None,
+    fieldset: Optional[Fieldset] = None,
+) -> Select[Tuple[Ticket]]:
+    """
+    Строит запрос списка обращений с фильтром по статусу и сортировкой.
+    """
+    stmt = _select_tickets(fieldset)
     if status:
         stmt = stmt.where(Ticket.status == status.value)
 
+    keyset = tuple_(Ticket.created_at, Ticket.id)
     if sort_by == SortOrder.CREATED_AT_ASC:
-        stmt = stmt.order_by(desc(Ticket.created_at))
-    elif sort_by == SortOrder.CREATED_AT_DESC:
-        stmt = stmt.order_by(asc(Ticket.created_at))
+        stmt = stmt.order_by(asc(Ticket.created_at), asc(Ticket.id))
+    else:
+        stmt = stmt.order_by(desc(Ticket.created_at), desc(Ticket.id))
+
+    if cursor:
+        created_at, ticket_id = decode_cursor(cursor)
+        if sort_by == SortOrder.CREATED_AT_ASC:
+            stmt = stmt.where(keyset > (created_at, ticket_id))
+        else:
+            stmt = stmt.where(keyset < (created_at, ticket_id))
+    return stmt
+
+
+def _tickets_state_statement(
+    ticket_ids: Optional[Sequence[int]] = None,
+) -> Select[Any]:
+    """
+    Запрос снимка состояния обращений для get_tickets_state.
+    """
+    if ticket_ids is not None:
+        return select(func.count(Ticket.id), func.max(Ticket.updated_at)).where(
+            Ticket.id.in_(ticket_ids)
+        )
+    # Каждый max отдельным подзапросом: и SQLite, и PostgreSQL читают его
+    # одним шагом по индексу, а не просмотром таблицы
+    return select(
+        select(func.max(Ticket.id)).scalar_subquery(),
+        select(func.max(Ticket.updated_at)).scalar_subquery(),
+    )
+
+
+async def get_tickets_state(
+    session: AsyncSession, ticket_ids: Optional[Sequence[int]] = None
+) -> Tuple[Optional[int], Optional[datetime]]:
+    """
+    Возвращает снимок состояния обращений, основу слабого ETag списка.
+
+    Для списка ID это число найденных обращений и их последнее updated_at.
+    Для списков с фильтром и без это последний ID и последнее updated_at всех
+    обращений: создание и любое обновление обращения меняют снимок, а его
+    стоимость не зависит от размера таблицы (два чтения по индексам).
+    Снимок меняется и при записи в обращения вне фильтра, это лишний полный
+    ответ, но не пропущенное изменение.
+    """
+    state, updated_at = (
+        await session.execute(_tickets_state_statement(ticket_ids))
+    ).one()
+    return state, updated_at
+
+
+async def get_tickets(
+    session: AsyncSession,
+    status: Optional[TicketStatus] = None,
+    sort_by: SortOrder = SortOrder.CREATED_AT_DESC,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    loader: Optional[UserLoader] = None,
+    fieldset: Optional[Fieldset] = None,
+) -> List[TicketData]:
+    """
+    Получает список обращений с возможностью фильтрации по статусу и сортировки.
+
+    Пагинация курсорная по паре (created_at, id): cursor указывает на последнее
+    обращение предыдущей страницы, поэтому стоимость любой страницы одинакова.
+    С выборкой полей fieldset возвращаются словари только с этими полями.
+    """
+    stmt = _tickets_statement(status, sort_by, cursor, fieldset)
+    if limit is not None:
+        stmt = stmt.limit(limit)
 
     result = await session.execute(stmt)
     tickets = result.scalars().all()
+    return await _tickets_to_data(loader or UserLoader(session), tickets, fieldset)
+
 
-    result_tickets = []
-    for ticket in tickets:
-        ticket_dict = map_db_model_to_dict(ticket)
-        if ticket.creator:
-            ticket_dict["creator"] = await user_service.get_user(
-                session, ticket.creator_id
-            )
-        if ticket.operator:
-            ticket_dict["operator"] = await user_service.get_user(
-                session, ticket.operator_id
-            )
-        result_tickets.append(TicketSchema.model_validate(ticket_dict))
-    return result_tickets
+async def stream_tickets(
+    session: AsyncSession,
+    status: Optional[TicketStatus] = None,
+    sort_by: SortOrder = SortOrder.CREATED_AT_DESC,
+    chunk_size: int = 500,
+    loader: Optional[UserLoader] = None,
+    fieldset: Optional[Fieldset] = None,
+) -> AsyncIterator[List[TicketData]]:
+    """
+    Отдает список обращений частями, читая строки через серверный курсор.
+    """
+    loader = loader or UserLoader(session)
+    stmt = _tickets_statement(status, sort_by, fieldset=fieldset)
+    result = await session.stream_scalars(stmt.execution_options(yield_per=chunk_size))
+    async for tickets in result.partitions(chunk_size):
+        yield await _tickets_to_data(loader, tickets, fieldset)
 
 
-async def get_ticket(session: AsyncSession, ticket_id: int) -> Optional[TicketSchema]:
+async def get_tickets_by_ids(
+    session: AsyncSession,
+    ticket_ids: Sequence[int],
+    loader: Optional[UserLoader] = None,
+    fieldset: Optional[Fieldset] = None,
+) -> List[TicketData]:
     """
-    Получает обращение по ID.
+    Получает обращения по списку ID одним запросом, порядок не гарантируется.
+    """
+    if not ticket_ids:
+        return []
+    stmt = _select_tickets(fieldset).where(Ticket.id.in_(ticket_ids))
+    result = await session.execute(stmt)
+    tickets = result.scalars().all()
+    return await _tickets_to_data(loader or UserLoader(session), tickets, fieldset)
+
+
+async def search_tickets(
+    session: AsyncSession,
+    query: str,
+    status: Optional[TicketStatus] = None,
+    limit: int = 50,
+    cursor: Optional[str] = None,
+    loader: Optional[UserLoader] = None,
+    fieldset: Optional[Fieldset] = None,
+) -> TicketSearchPage:
+    """
+    Полнотекстовый поиск обращений по теме, описанию и тексту сообщений.
+
+    Обращения упорядочены по релевантности лучшего совпадения: своего текста
+    или одного из сообщений. Пагинация курсорная по паре (rank, id).
     """
+    hits = search_hits(session.get_bind().dialect.name, query).subquery()
+    ranked = (
+        select(hits.c.ticket_id, func.max(hits.c.rank).label("rank"))
+        .group_by(hits.c.ticket_id)
+        .subquery()
+    )
     stmt = (
-        select(Ticket)
-        .where(Ticket.id == ticket_id)
-        .options(selectinload(Ticket.creator), selectinload(Ticket.operator))
+        _select_tickets(fieldset)
+        .add_columns(ranked.c.rank)
+        .join(ranked, ranked.c.ticket_id == Ticket.id)
+        .order_by(desc(ranked.c.rank), desc(Ticket.id))
+        .limit(limit)
+    )
+    if status:
+        stmt = stmt.where(Ticket.status == status.value)
+    if cursor:
+        stmt = stmt.where(tuple_(ranked.c.rank, Ticket.id) < decode_rank_cursor(cursor))
+
+    rows = (await session.execute(stmt)).all()
+    tickets = await _tickets_to_data(
+        loader or UserLoader(session), [row[0] for row in rows], fieldset
     )
+    next_cursor = None
+    if len(rows) == limit:
+        last_ticket, last_rank = rows[-1]
+        next_cursor = encode_rank_cursor(last_rank, last_ticket.id)
+    return TicketSearchPage(tickets, next_cursor)
+
+
+async def get_ticket(
+    session: AsyncSession,
+    ticket_id: int,
+    loader: Optional[UserLoader] = None,
+    fieldset: Optional[Fieldset] = None,
+) -> Optional[TicketData]:
+    """
+    Получает обращение по ID.
+    """
+    stmt = _select_tickets(fieldset).where(Ticket.id == ticket_id)
     result = await session.execute(stmt)
     ticket = result.scalar_one_or_none()
     if ticket:
-        ticket_dict = map_db_model_to_dict(ticket)
-        if ticket.creator:
-            ticket_dict["creator"] = await user_service.get_user(
-                session, ticket.creator_id
-            )
-        if ticket.operator:
-            ticket_dict["operator"] = await user_service.get_user(
-                session, ticket.operator_id
-            )
-        return TicketSchema.model_validate(ticket_dict)
+        loader = loader or UserLoader(session)
+        tickets = await _tickets_to_data(loader, [ticket], fieldset)
+        return tickets[0]
     return None
 
 
+async def load_ticket_cached(
+    session: AsyncSession,
+    ticket_id: int,
+    stamp: bytes,
+    loader: Optional[UserLoader] = None,
+) -> Optional[CachedTicket]:
+    """
+    Читает обращение из базы и сохраняет его в кэш с штампом stamp,
+    полученным из ticket_cache.get до чтения.
+    """
+    ticket = await get_ticket(session, ticket_id, loader)
+    if not isinstance(ticket, TicketSchema):
+        return None
+    cached = CachedTicket(
+        ticket.version, ticket.__pydantic_serializer__.to_json(ticket)
+    )
+    await ticket_cache.set(ticket_id, stamp, cached)
+    return cached
+
+
 async def update_ticket(
-    session: AsyncSession, ticket_id: int, ticket_data: TicketUpdate
-) -> Optional[TicketSchema]:
+    session: AsyncSession,
+    ticket_id: int,
+    ticket_data: TicketUpdate,
+    loader: Optional[UserLoader] = None,
+    expected_version: Optional[int] = None,
+) -> TicketSchema:
     """
     Обновляет обращение по ID.
+
+    Обновление выполняется одним условным UPDATE ... RETURNING. Если передана
+    ожидаемая версия (аргументом или полем version), обращение обновляется
+    только при совпадении версии, иначе выбрасывается ConflictError.
     """
-    stmt = (
-        select(Ticket)
-        .where(Ticket.id == ticket_id)
-        .options(selectinload(Ticket.creator), selectinload(Ticket.operator))
-    )
-    result = await session.execute(
-        stmt
-    )
+    values = ticket_data.model_dump(exclude_unset=True)
+    version = values.pop("version", None)
+    if expected_version is None:
+        expected_version = version
+
+    stmt = update(Ticket).where(Ticket.id == ticket_id)
+    if expected_version is not None:
+        stmt = stmt.where(Ticket.version == expected_version)
+    stmt = stmt.values(
+        **values, version=Ticket.version + 1, updated_at=datetime.utcnow()
+    ).returning(Ticket)
+    result = await session.execute(stmt)
     ticket = result.scalar_one_or_none()
 
     if not ticket:
-        raise ValueError(f"Тикет с id {ticket_id} не найден")
+        # Второй запрос только на пути ошибки: отличаем отсутствие от конфликта
+        exists = await session.execute(select(Ticket.id).where(Ticket.id == ticket_id))
+        if exists.scalar_one_or_none() is None:
+            raise ValueError(f"Тикет с id {ticket_id} не найден")
+        raise ConflictError(
+            f"Тикет с id {ticket_id} изменен другим запросом, "
+            f"ожидаемая версия {expected_version} устарела"
+        )
+    await session.commit()
+    await ticket_cache.invalidate([ticket_id])
 
-    for key, value in ticket_data.model_dump(exclude_unset=True).items():
-        setattr(ticket, key, value)
+    tickets = await _tickets_to_schemas(loader or UserLoader(session), [ticket])
+    return tickets[0]
 
-    await session.commit()
-    await session.refresh(ticket)
 
-    ticket_dict = map_db_model_to_dict(ticket)
-    if ticket.creator:
-        ticket_dict["creator"] = await user_service.get_user(session, ticket.creator_id)
-    if ticket.operator:
-        ticket_dict["operator"] = await user_service.get_user(
-            session, ticket.operator_id
+async def bulk_update_tickets(
+    session: AsyncSession,
+    ticket_data: TicketUpdate,
+    ids: Optional[Sequence[int]] = None,
+    status: Optional[TicketStatus] = None,
+    operator_id: Optional[int] = None,
+    chunk_size: int = 1000,
+) -> List[int]:
+    """
+    Массово обновляет обращения по списку ID или фильтру.
+
+    На каждую часть выполняется один UPDATE ... RETURNING id с фиксацией
+    транзакции. Обращения по фильтру выбираются частями по возрастанию id,
+    поэтому обновление поля из фильтра не мешает перебору. Возвращает ID
+    обновленных обращений.
+    """
+    values = ticket_data.model_dump(exclude_unset=True)
+    if values.pop("version", None) is not None:
+        raise ValueError("Версия не поддерживается при массовом обновлении")
+    if not values:
+        raise ValueError("Нет полей для обновления")
+    if ids is None and status is None and operator_id is None:
+        raise ValueError("Не заданы ID или фильтр обращений")
+
+    conditions = []
+    if status:
+        conditions.append(Ticket.status == status.value)
+    if operator_id is not None:
+        conditions.append(Ticket.operator_id == operator_id)
+
+    def update_chunk(*where: ColumnElement[bool]) -> Update:
+        return (
+            update(Ticket)
+            .where(*where)
+            .values(**values, version=Ticket.version + 1, updated_at=datetime.utcnow())
+            .returning(Ticket.id)
+            .execution_options(synchronize_session=False)
         )
 
-    return TicketSchema.model_validate(ticket_dict)
+    updated: List[int] = []
+    if ids is not None:
+        unique_ids = list(dict.fromkeys(ids))
+        for start in range(0, len(unique_ids), chunk_size):
+            chunk = unique_ids[start : start + chunk_size]
+            stmt = update_chunk(Ticket.id.in_(chunk), *conditions)
+            chunk_updated = sorted((await session.scalars(stmt)).all())
+            await session.commit()
+            await ticket_cache.invalidate(chunk_updated)
+            updated.extend(chunk_updated)
+        return updated
+
+    last_id = 0
+    while True:
+        chunk_ids = (
+            select(Ticket.id)
+            .where(Ticket.id > last_id, *conditions)
+            .order_by(Ticket.id)
+            .limit(chunk_size)
+        )
+        stmt = update_chunk(Ticket.id.in_(chunk_ids.scalar_subquery()))
+        chunk_updated = sorted((await session.scalars(stmt)).all())
+        await session.commit()
+        await ticket_cache.invalidate(chunk_updated)
+        updated.extend(chunk_updated)
+        if len(chunk_updated) < chunk_size:
+            return updated
+        last_id = chunk_updated[-1]
 
 
 async def create_message(
@@ -145,55 +504,128 @@ async def create_message(
     ticket_id: int,
     message_data: MessageCreate,
     author_id: int = 1,
-) -> MessageSchema:
+    loader: Optional[UserLoader] = None,
+) -> CreatedMessage:
     """
     Создает сообщение в обращении.
+
+    Проверка существования обращения, вставка сообщения и получение темы
+    обращения с email его создателя выполняются одним INSERT ... SELECT ...
+    RETURNING, автор берется из загрузчика пользователей.
     """
-    ticket = await get_ticket(session, ticket_id)
-    if not ticket:
-        raise ValueError(f"Тикет с {ticket_id} не найден")
+    loader = loader or UserLoader(session)
+    author = await loader.load(author_id)
+    if not author:
+        raise ValueError(f"Пользователь c ID {author_id} не найден")
 
-    message = Message(
-        **message_data.model_dump(), ticket_id=ticket_id, author_id=author_id
+    # Вложенные подзапросы вместо JOIN: SQLite выводит колонки RETURNING
+    # без имени таблицы, и в JOIN имя id стало бы неоднозначным
+    creator_id = select(Ticket.creator_id).where(Ticket.id == ticket_id)
+    creator_email = select(User.email).where(User.id == creator_id.scalar_subquery())
+    ticket_subject = select(Ticket.subject).where(Ticket.id == ticket_id)
+    stmt = (
+        insert(Message)
+        .from_select(
+            ["text", "ticket_id", "author_id", "created_at"],
+            select(
+                literal(message_data.text),
+                Ticket.id,
+                literal(author_id),
+                literal(datetime.utcnow()),
+            ).where(Ticket.id == ticket_id),
+        )
+        .returning(
+            Message.id,
+            Message.created_at,
+            ticket_subject.scalar_subquery().label("ticket_subject"),
+            creator_email.scalar_subquery().label("creator_email"),
+        )
     )
-    session.add(message)
+    row = (await session.execute(stmt)).one_or_none()
+    if row is None:
+        raise ValueError(f"Тикет с {ticket_id} не найден")
     await session.commit()
-    await session.refresh(message)
 
-    stmt = (
-        select(Message)
-        .where(Message.id == message.id)
-        .options(selectinload(Message.author))
+    message = MessageSchema(
+        id=row.id, text=message_data.text, created_at=row.created_at, author=author
     )
-    result = await session.execute(stmt)
-    message_db = result.scalar_one()
+    return CreatedMessage(message, row.ticket_subject, row.creator_email)
 
-    message_dict = map_db_model_to_dict(message_db)
-    if message_db.author:
-        message_dict["author"] = await user_service.get_user(
-            session, message_db.author_id
-        )
 
-    return MessageSchema.model_validate(message_dict)
+async def get_messages_state(
+    session: AsyncSession, ticket_id: int
+) -> Tuple[int, Optional[int]]:
+    """
+    Возвращает число сообщений обращения и ID последнего из них.
+
+    Сообщения не изменяются после создания, поэтому этой пары достаточно
+    для слабого ETag списка сообщений.
+    """
+    stmt = select(func.count(Message.id), func.max(Message.id)).where(
+        Message.ticket_id == ticket_id
+    )
+    count, last_id = (await session.execute(stmt)).one()
+    return count, last_id
 
 
-async def get_messages(session: AsyncSession, ticket_id: int) -> List[MessageSchema]:
+def _messages_statement(
+    ticket_id: int, after_id: Optional[int] = None
+) -> Select[Tuple[Message]]:
     """
-    Получает список сообщений по ID обращения.
+    Строит запрос сообщений обращения в порядке (created_at, id).
+
+    С after_id возвращаются только сообщения после указанного сообщения этого
+    обращения; его позиция берется из той же таблицы соединением по ID, так
+    что порядок не зависит от того, монотонны ли ID по времени.
     """
     stmt = (
         select(Message)
         .where(Message.ticket_id == ticket_id)
-        .options(selectinload(Message.author))
+        .order_by(asc(Message.created_at), asc(Message.id))
     )
+    if after_id is not None:
+        after = aliased(Message)
+        stmt = stmt.join(
+            after, and_(after.id == after_id, after.ticket_id == ticket_id)
+        ).where(
+            tuple_(Message.created_at, Message.id) > tuple_(after.created_at, after.id)
+        )
+    return stmt
+
+
+async def get_messages(
+    session: AsyncSession,
+    ticket_id: int,
+    loader: Optional[UserLoader] = None,
+    after_id: Optional[int] = None,
+    limit: Optional[int] = None,
+) -> List[MessageSchema]:
+    """
+    Получает список сообщений по ID обращения в порядке создания.
+
+    after_id - ID последнего уже полученного сообщения: возвращаются только
+    более новые. Если такого сообщения в обращении нет, список пуст.
+    """
+    stmt = _messages_statement(ticket_id, after_id)
+    if limit is not None:
+        stmt = stmt.limit(limit)
     result = await session.execute(stmt)
     messages = result.scalars().all()
-    result_messages = []
-    for message in messages:
-        message_dict = map_db_model_to_dict(message)
-        if message.author:
-            message_dict["author"] = await user_service.get_user(
-                session, message.author_id
-            )
-        result_messages.append(MessageSchema.model_validate(message_dict))
-    return result_messages
+    return await _messages_to_schemas(loader or UserLoader(session), messages)
+
+
+async def stream_messages(
+    session: AsyncSession,
+    ticket_id: int,
+    chunk_size: int = 500,
+    loader: Optional[UserLoader] = None,
+    after_id: Optional[int] = None,
+) -> AsyncIterator[List[MessageSchema]]:
+    """
+    Отдает сообщения обращения частями, читая строки через серверный курсор.
+    """
+    loader = loader or UserLoader(session)
+    stmt = _messages_statement(ticket_id, after_id)
+    result = await session.stream_scalars(stmt.execution_options(yield_per=chunk_size))
+    async for messages in result.partitions(chunk_size):
+        yield await _messages_to_schemas(loader, messages)
@@ -0,0 +1,107 @@
+from typing import Dict, Iterable, Optional, Sequence
+
+from app.api.schemas import User as UserSchema
+from app.core.cache import CacheBackend, create_cache
+from app.core.config import Settings
+from app.core.metrics import metrics
+
+settings = Settings()
+
+# Значение записи об отсутствующем пользователе (негативный кэш)
+MISSING = b"null"
+
+
+class UserCache:
+    """
+    Кэш пользователей по ID.
+
+    Найденные пользователи хранятся ttl секунд, отсутствующие ID - negative_ttl.
+    Попадания и промахи учитываются в счетчиках {name}.hits, {name}.misses и
+    {name}.negative_hits. Без бэкенда (backend=None) кэш ничего не хранит.
+    """
+
+    def __init__(
+        self,
+        backend: Optional[CacheBackend],
+        ttl: float,
+        negative_ttl: float,
+        name: str = "user_cache",
+    ) -> None:
+        self.backend = backend
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.name = name
+
+    @staticmethod
+    def _key(user_id: int) -> str:
+        return f"user:{user_id}"
+
+    async def get_many(
+        self, user_ids: Sequence[int]
+    ) -> Dict[int, Optional[UserSchema]]:
+        """
+        Возвращает закэшированные записи: пользователя или None для
+        отсутствующего ID. ID без записи в результат не попадают.
+        """
+        if self.backend is None or not user_ids:
+            return {}
+        values = await self.backend.get_many([self._key(i) for i in user_ids])
+        found: Dict[int, Optional[UserSchema]] = {}
+        for user_id in user_ids:
+            value = values.get(self._key(user_id))
+            if value is None:
+                continue
+            found[user_id] = (
+                None if value == MISSING else UserSchema.model_validate_json(value)
+            )
+        negative = sum(1 for user in found.values() if user is None)
+        metrics.inc(f"{self.name}.hits", len(found) - negative)
+        metrics.inc(f"{self.name}.negative_hits", negative)
+        metrics.inc(f"{self.name}.misses", len(user_ids) - len(found))
+        return found
+
+    async def set_many(
+        self, users: Sequence[UserSchema], missing_ids: Iterable[int] = ()
+    ) -> None:
+        """
+        Сохраняет загруженных пользователей и отсутствующие ID.
+        """
+        if self.backend is None:
+            return
+        await self.backend.set_many(
+            {
+                self._key(user.id): user.__pydantic_serializer__.to_json(user)
+                for user in users
+            },
+            self.ttl,
+        )
+        await self.backend.set_many(
+            {self._key(user_id): MISSING for user_id in missing_ids},
+            self.negative_ttl,
+        )
+
+    async def invalidate(self, user_ids: Iterable[int]) -> None:
+        """
+        Удаляет записи пользователей после изменения в базе.
+        """
+        keys = [self._key(user_id) for user_id in user_ids]
+        if self.backend is None or not keys:
+            return
+        await self.backend.delete_many(keys)
+        metrics.inc(f"{self.name}.invalidations", len(keys))
+
+    async def clear(self) -> None:
+        """
+        Очищает кэш.
+        """
+        if self.backend is not None:
+            await self.backend.clear()
+
+
+user_cache = UserCache(
+    create_cache(
+        settings.user_cache_backend, "users", max_size=settings.user_cache_max_size
+    ),
+    ttl=settings.user_cache_ttl,
+    negative_ttl=settings.user_cache_negative_ttl,
+)
@@ -0,0 +1,54 @@
+from typing import Dict, Iterable, Optional
+
+from fastapi import Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.schemas import User as UserSchema
+from app.core.database import get_async_session
+from app.services import user_service
+
+
+class UserLoader:
+    """
+    Пакетный загрузчик пользователей в рамках одного запроса.
+
+    Собирает запрошенные ID, загружает недостающих пользователей одним
+    запросом WHERE id IN (...) и запоминает результат, включая отсутствующие ID.
+    """
+
+    def __init__(self, session: AsyncSession) -> None:
+        self.session = session
+        self._cache: Dict[int, Optional[UserSchema]] = {}
+
+    async def load_many(
+        self, user_ids: Iterable[Optional[int]]
+    ) -> Dict[int, Optional[UserSchema]]:
+        """
+        Возвращает пользователей по списку ID, выполняя не более одного запроса.
+        """
+        ids = {user_id for user_id in user_ids if user_id is not None}
+        missing = [user_id for user_id in ids if user_id not in self._cache]
+        if missing:
+            users = await user_service.get_users(self.session, missing)
+            found = {user.id: user for user in users}
+            for user_id in missing:
+                self._cache[user_id] = found.get(user_id)
+        return {user_id: self._cache[user_id] for user_id in ids}
+
+    async def load(self, user_id: Optional[int]) -> Optional[UserSchema]:
+        """
+        Возвращает пользователя по ID или None.
+        """
+        if user_id is None:
+            return None
+        users = await self.load_many([user_id])
+        return users[user_id]
+
+
+async def get_user_loader(
+    session: AsyncSession = Depends(get_async_session),
+) -> UserLoader:
+    """
+    Зависимость FastAPI: загрузчик пользователей, общий для всего запроса.
+    """
+    return UserLoader(session)
@@ -1,20 +1,22 @@
-from typing import Optional
+from typing import Iterable, List, Optional, Sequence, Set, Tuple
 
-from sqlalchemy import select
+from sqlalchemy import or_, select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import IntegrityError
-from passlib.context import CryptContext
 
-from app.api.schemas import UserCreate, User as UserSchema
+from app.api.enums import UserImportStatus
+from app.api.schemas import UserCreate, UserImportResult, User as UserSchema
 from app.database.models import User
 from app.core.config import Settings
-from app.database.tools import map_db_model_to_dict
-
-# Контекст для хэширования паролей
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+from app.database.serializers import ModelSerializer
+from app.database.tools import dialect_insert
+from app.core.security import password_hasher
+from app.services.user_cache import user_cache
 
 settings = Settings()
 
+user_serializer = ModelSerializer(User, UserSchema)
+
 
 async def create_user(session: AsyncSession, user_data: UserCreate) -> UserSchema:
     """
@@ -23,7 +25,7 @@ async def create_user(session: AsyncSession, user_data: UserCreate) -> UserSchem
     try:
         if not user_data.email or not user_data.username:
             raise ValueError("Некорректные данные")
-        hashed_password = pwd_context.hash(user_data.password)
+        hashed_password = await password_hasher.hash(user_data.password)
         user = User(
             **user_data.model_dump(exclude={"password"}),
             hashed_password=hashed_password,
@@ -31,20 +33,134 @@ async def create_user(session: AsyncSession, user_data: UserCreate) -> UserSchem
         session.add(user)
         await session.commit()
         await session.refresh(user)
-        return UserSchema.model_validate(map_db_model_to_dict(user))
+        # ID мог быть закэширован как отсутствующий до создания пользователя
+        await user_cache.invalidate([user.id])
+        return user_serializer.serialize(user)
     except IntegrityError:
         raise ValueError("Почта с таким именем уже зарегистрирована")
 
 
+async def import_users(
+    session: AsyncSession, users_data: Sequence[UserCreate], chunk_size: int = 1000
+) -> List[UserImportResult]:
+    """
+    Массово создает пользователей.
+
+    Пароли хэшируются параллельно в пуле, записи вставляются одним
+    INSERT ... ON CONFLICT DO NOTHING на каждую часть. Дубликаты email или
+    логина отмечаются в результате и не прерывают импорт.
+    """
+    results = [
+        UserImportResult(
+            index=index,
+            email=user_data.email,
+            username=user_data.username,
+            status=UserImportStatus.CREATED,
+        )
+        for index, user_data in enumerate(users_data)
+    ]
+    pending: List[Tuple[UserImportResult, UserCreate]] = []
+    seen_emails: Set[str] = set()
+    seen_usernames: Set[str] = set()
+    for result, user_data in zip(results, users_data):
+        if not user_data.email or not user_data.username:
+            result.status = UserImportStatus.INVALID
+            result.detail = "Некорректные данные"
+        elif user_data.email in seen_emails or user_data.username in seen_usernames:
+            result.status = UserImportStatus.DUPLICATE
+            result.detail = "Повторная запись в запросе"
+        else:
+            seen_emails.add(user_data.email)
+            seen_usernames.add(user_data.username)
+            pending.append((result, user_data))
+
+    for start in range(0, len(pending), chunk_size):
+        chunk = pending[start : start + chunk_size]
+        hashed_passwords = await password_hasher.hash_many(
+            [user_data.password for _, user_data in chunk]
+        )
+        rows = [
+            {
+                **user_data.model_dump(exclude={"password"}),
+                "hashed_password": hashed_password,
+            }
+            for (_, user_data), hashed_password in zip(chunk, hashed_passwords)
+        ]
+        stmt = (
+            dialect_insert(session, User)
+            .values(rows)
+            .on_conflict_do_nothing()
+            .returning(User)
+        )
+        created = (await session.scalars(stmt)).all()
+        await session.commit()
+        await user_cache.invalidate([user.id for user in created])
+
+        created_by_email = {user.email: user for user in created}
+        for result, user_data in chunk:
+            user = created_by_email.get(user_data.email)
+            if user is None:
+                result.status = UserImportStatus.DUPLICATE
+                result.detail = "Почта или логин уже зарегистрированы"
+            else:
+                result.user = user_serializer.serialize(user)
+    return results
+
+
 async def get_user(
     session: AsyncSession, user_id: Optional[int]
 ) -> Optional[UserSchema]:
     """
-    Получает пользователя из базы данных по ID.
+    Получает пользователя по ID через кэш пользователей.
     """
-    stmt = select(User).where(User.id == user_id)
+    if user_id is None:
+        return None
+    users = await get_users(session, [user_id])
+    return users[0] if users else None
+
+
+async def get_users(session: AsyncSession, user_ids: Iterable[int]) -> List[UserSchema]:
+    """
+    Получает пользователей по списку ID.
+
+    Сначала читается кэш пользователей, недостающие ID загружаются из базы
+    одним запросом и сохраняются в кэш, включая отсутствующие.
+    """
+    ids = list(dict.fromkeys(user_ids))
+    if not ids:
+        return []
+    cached = await user_cache.get_many(ids)
+    users = [user for user in cached.values() if user is not None]
+    missing = [user_id for user_id in ids if user_id not in cached]
+    if missing:
+        stmt = select(User).where(User.id.in_(missing))
+        result = await session.execute(stmt)
+        loaded = user_serializer.serialize_many(result.scalars().all())
+        found = {user.id for user in loaded}
+        await user_cache.set_many(
+            loaded, [user_id for user_id in missing if user_id not in found]
+        )
+        users.extend(loaded)
+    return users
+
+
+async def authenticate_user(
+    session: AsyncSession, login: str, password: str
+) -> Optional[UserSchema]:
+    """
+    Проверяет пароль пользователя по логину или email.
+
+    Если стоимость bcrypt изменилась, сохраняет пересчитанный хэш.
+    """
+    stmt = select(User).where(or_(User.username == login, User.email == login))
     result = await session.execute(stmt)
     user = result.scalar_one_or_none()
-    if user:
-        return UserSchema.model_validate(map_db_model_to_dict(user))
-    return None
+    if not user:
+        return None
+    verified, new_hash = await password_hasher.verify(password, user.hashed_password)
+    if not verified:
+        return None
+    if new_hash:
+        user.hashed_password = new_hash
+        await session.commit()
+    return user_serializer.serialize(user)
@@ -1,8 +1,13 @@
+import smtplib
+import threading
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 from celery import Celery
+from celery.signals import worker_process_shutdown
 from app.core.config import Settings
 from app.mail.client import EmailClient
+from app.mail.errors import is_permanent_error
 from app.api.schemas import TicketCreate
-from app.services import ticket_service
+from app.services import mail_service, ticket_service
 from app.core.database import get_async_session
 
 settings = Settings()
@@ -16,27 +21,184 @@ celery: Celery = Celery(
 email_client = EmailClient()
 
 
-@celery.task
+@worker_process_shutdown.connect
+def close_email_client(**kwargs: Any) -> None:
+    """
+    Отправляет накопленные письма и закрывает соединения пула SMTP при
+    остановке процесса воркера.
+    """
+    email_batcher.flush()
+    email_client.close()
+
+
+@celery.task(
+    autoretry_for=(smtplib.SMTPException, OSError),
+    max_retries=settings.email_max_retries,
+    retry_backoff=int(settings.email_retry_delay),
+    retry_backoff_max=settings.email_retry_backoff_max,
+    retry_jitter=True,
+)
 def send_email_task(to_email: str, subject: str, message: str) -> None:
     """
     Асинхронная задача для отправки mail сообщений.
+
+    Временная ошибка (разрыв соединения, ответ 4xx) повторяется до
+    email_max_retries раз с растущей задержкой, после чего задача завершается
+    ошибкой. Отказ сервера (5xx) не повторяется.
     """
-    email_client.send_email(to_email, subject, message)
+    try:
+        email_client.send_email(to_email, subject, message, raise_errors=True)
+    except Exception as error:
+        if not is_permanent_error(error):
+            raise
+        print(f"Письмо на {to_email} отклонено сервером: {error}")
+
+
+@celery.task
+def send_emails_task(emails: Sequence[Sequence[str]]) -> Dict[str, Any]:
+    """
+    Отправка пачки писем (получатель, тема, текст) через одно SMTP соединение.
+
+    Возвращает отчет по получателям. Письмо с временной ошибкой повторяется
+    отдельной задачей send_email_task через email_retry_delay секунд (и далее
+    ее собственными повторами), письмо с отказом сервера (5xx) не повторяется.
+    """
+    triples = [(to_email, subject, message) for to_email, subject, message in emails]
+    failed = []
+    for (to_email, subject, message), error in zip(
+        triples, email_client.send_emails(triples)
+    ):
+        if error is None:
+            continue
+        retried = not is_permanent_error(error)
+        if retried:
+            send_email_task.apply_async(
+                (to_email, subject, message), countdown=settings.email_retry_delay
+            )
+        print(f"Ошибка при отправке mail на {to_email}: {error}")
+        failed.append({"to_email": to_email, "error": str(error), "retried": retried})
+    return {"sent": len(triples) - len(failed), "failed": failed}
+
+
+class EmailBatcher:
+    """
+    Накопитель писем для send_emails_task.
+
+    Письма, добавленные за window секунд после первого письма пачки, уходят
+    одной задачей; при max_size письмах пачка отправляется сразу. При
+    window = 0 каждое письмо уходит сразу пачкой из одного письма.
+    """
+
+    def __init__(self, window: float, max_size: int) -> None:
+        self.window = window
+        self.max_size = max_size
+        self._pending: List[Tuple[str, str, str]] = []
+        self._timer: Optional[threading.Timer] = None
+        self._lock = threading.Lock()
+
+    def add(self, to_email: str, subject: str, message: str) -> None:
+        """
+        Добавляет письмо в текущую пачку.
+        """
+        with self._lock:
+            self._pending.append((to_email, subject, message))
+            if self.window > 0 and len(self._pending) < self.max_size:
+                if self._timer is None:
+                    self._timer = threading.Timer(self.window, self.flush)
+                    self._timer.daemon = True
+                    self._timer.start()
+                return
+            batch = self._take()
+        send_emails_task.delay(batch)
+
+    def flush(self) -> None:
+        """
+        Отправляет накопленные письма, не дожидаясь окончания окна.
+        """
+        with self._lock:
+            batch = self._take()
+        if batch:
+            send_emails_task.delay(batch)
+
+    def _take(self) -> List[Tuple[str, str, str]]:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        return batch
+
+
+email_batcher = EmailBatcher(settings.email_batch_window, settings.email_batch_max_size)
 
 
 @celery.task
 async def fetch_emails_task() -> None:
-    """Асинхронная задача для получения mail сообщений"""
-    new_emails = email_client.fetch_emails()
-    if not new_emails:
-        return
+    """
+    Асинхронная задача для получения mail сообщений.
+
+    Ящик опрашивается с сохраненной позиции (UIDVALIDITY и последний
+    обработанный UID), новая позиция сохраняется после создания заявок.
+    Письмо с некорректными данными (ValueError, например пустой текст)
+    пропускается. Если создание прервалось другой ошибкой (базы данных,
+    временной), позиция останавливается перед письмом, на котором она
+    произошла; если письма выбраны по UNSEEN (первый опрос или смена
+    UIDVALIDITY), позиция не сохраняется вовсе. Обработанные письма
+    помечаются прочитанными одной командой.
+    """
+    replies = []
+    handled = []
     async for session in get_async_session():
-        for from_email, subject, body in new_emails:
-            ticket_data = TicketCreate(subject=subject, description=body)
-            await ticket_service.create_ticket(session, ticket_data)
-            send_email_task.delay(
-                from_email,
-                "Re: " + subject,
-                "Ваше обращение принято и будет обработано в ближайшее время",
-            )
-            print("Создана заявка по почте:", from_email)
+        checkpoint = await mail_service.get_mailbox_checkpoint(
+            session, email_client.mailbox
+        )
+        if checkpoint is None:
+            position = None
+            sync = email_client.fetch_emails()
+        else:
+            position = (checkpoint.uidvalidity, checkpoint.last_uid)
+            sync = email_client.fetch_emails(*position)
+        # Выборка по UNSEEN пропускает прочитанные письма, поэтому позиция
+        # внутри нее неверна: UID SEARCH с нее вернул бы и прочитанные письма
+        unseen = position is None or position[0] != sync.uidvalidity
+        processed: Optional[int] = sync.last_uid
+        try:
+            for incoming in sync.emails:
+                processed = int(incoming.uid) - 1
+                try:
+                    ticket_data = TicketCreate(
+                        subject=incoming.subject, description=incoming.body
+                    )
+                    await ticket_service.create_ticket(session, ticket_data)
+                except ValueError as e:
+                    print(f"Письмо {incoming.uid} пропущено: {e}")
+                    handled.append(incoming.uid)
+                    continue
+                handled.append(incoming.uid)
+                replies.append(
+                    (
+                        incoming.from_email,
+                        "Re: " + incoming.subject,
+                        "Ваше обращение принято и будет обработано в ближайшее время",
+                    )
+                )
+                print("Создана заявка по почте:", incoming.from_email)
+            processed = sync.last_uid
+        except Exception:
+            await session.rollback()
+            if unseen:
+                # Прежняя позиция остается, следующий опрос снова выберет
+                # непрочитанные, обработанные письма будут уже помечены
+                processed = None
+            raise
+        finally:
+            if (
+                sync.uidvalidity is not None
+                and processed is not None
+                and position != (sync.uidvalidity, processed)
+            ):
+                await mail_service.save_mailbox_checkpoint(
+                    session, email_client.mailbox, sync.uidvalidity, processed
+                )
+            email_client.mark_seen(handled)
+            if replies:
+                send_emails_task.delay(replies)
@@ -0,0 +1,263 @@
+"""
+Планы и время горячих запросов к обращениям и сообщениям до и после индексов.
+
+Заполняет пустую базу обращениями со статусами в пропорции рабочей базы
+(большинство закрыто) и сообщениями, удаляет индексы миграций e4b7c2a91d35,
+b81d6f0e3c27 и d3f8a1c6b920, снимает планы и медианное время запросов, затем создает индексы и повторяет
+замеры. По умолчанию используется временная SQLite база; для PostgreSQL
+передайте URL пустой базы, таблицы будут созданы в ней и удалены в конце.
+
+Запуск: python -m benchmarks.bench_indexes [--tickets N] [--repeat R]
+        [--database-url URL]
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import Index, Select, desc, func, inspect, insert, select, text
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+
+from app.api.enums import SortOrder, TicketStatus
+from app.database.models import Base, Message, Ticket, User
+from app.services.ticket_service import (
+    _messages_statement,
+    _tickets_state_statement,
+    _tickets_statement,
+)
+
+INDEX_NAMES = {
+    "ix_tickets_status_created_at_id",
+    "ix_tickets_created_at_id",
+    "ix_tickets_updated_at",
+    "ix_tickets_active_created_at_id",
+    "ix_tickets_creator_id",
+    "ix_tickets_operator_id",
+    "ix_messages_ticket_id_created_at_id",
+}
+INDEXES: List[Index] = [
+    index
+    for table in Base.metadata.sorted_tables
+    for index in table.indexes
+    if index.name in INDEX_NAMES
+]
+
+STATUS_WEIGHTS = {
+    TicketStatus.CLOSED: 0.85,
+    TicketStatus.OPEN: 0.10,
+    TicketStatus.IN_PROGRESS: 0.05,
+}
+USERS = 200
+OPERATORS = 20
+CHUNK = 5000
+
+
+def queries(
+    ticket_id: int, message_id: int, operator_id: int
+) -> List[Tuple[str, Select[Any]]]:
+    """
+    Запросы горячих путей в том виде, в каком их строит ticket_service.
+    """
+    return [
+        (
+            "GET /tickets?status=open",
+            _tickets_statement(TicketStatus.OPEN, SortOrder.CREATED_AT_DESC).limit(50),
+        ),
+        (
+            "GET /tickets?status=closed",
+            _tickets_statement(TicketStatus.CLOSED, SortOrder.CREATED_AT_DESC).limit(
+                50
+            ),
+        ),
+        (
+            "GET /tickets",
+            _tickets_statement(None, SortOrder.CREATED_AT_DESC).limit(50),
+        ),
+        (
+            "очередь open+in_progress",
+            select(Ticket)
+            .where(
+                Ticket.status.in_(
+                    [TicketStatus.OPEN.value, TicketStatus.IN_PROGRESS.value]
+                )
+            )
+            .order_by(desc(Ticket.created_at), desc(Ticket.id))
+            .limit(50),
+        ),
+        # Снимок один для любого фильтра, в том числе без фильтра и closed
+        ("ETag /tickets", _tickets_state_statement()),
+        ("GET /tickets/{id}/messages", _messages_statement(ticket_id)),
+        (
+            "GET /tickets/{id}/messages?after_id",
+            _messages_statement(ticket_id, after_id=message_id).limit(50),
+        ),
+        (
+            "PATCH /tickets operator_id+status",
+            select(Ticket.id).where(
+                Ticket.operator_id == operator_id,
+                Ticket.status == TicketStatus.IN_PROGRESS.value,
+            ),
+        ),
+    ]
+
+
+async def seed(engine: AsyncEngine, tickets: int, messages_per_ticket: int) -> None:
+    rng = random.Random(42)
+    now = datetime.utcnow()
+    statuses = list(STATUS_WEIGHTS)
+    weights = list(STATUS_WEIGHTS.values())
+    async with engine.begin() as conn:
+        await conn.execute(
+            insert(User),
+            [
+                {
+                    "email": f"user{i}@example.com",
+                    "username": f"user{i}",
+                    "hashed_password": "x",
+                }
+                for i in range(1, USERS + 1)
+            ],
+        )
+        for start in range(0, tickets, CHUNK):
+            rows = []
+            for i in range(start, min(start + CHUNK, tickets)):
+                status = rng.choices(statuses, weights)[0]
+                created_at = now - timedelta(minutes=tickets - i)
+                rows.append(
+                    {
+                        "subject": f"Обращение {i}",
+                        "description": "Описание проблемы",
+                        "status": status.value,
+                        "created_at": created_at,
+                        "updated_at": created_at,
+                        "creator_id": rng.randint(1, USERS),
+                        "operator_id": (
+                            None
+                            if status == TicketStatus.OPEN
+                            else rng.randint(1, OPERATORS)
+                        ),
+                    }
+                )
+            await conn.execute(insert(Ticket), rows)
+        message_rows = [
+            {
+                "text": "Сообщение",
+                "ticket_id": rng.randint(1, tickets),
+                "author_id": rng.randint(1, USERS),
+                "created_at": now,
+            }
+            for _ in range(tickets * messages_per_ticket)
+        ]
+        for start in range(0, len(message_rows), CHUNK):
+            await conn.execute(insert(Message), message_rows[start : start + CHUNK])
+
+
+async def explain(engine: AsyncEngine, stmt: Select[Any]) -> List[str]:
+    sql = str(
+        stmt.compile(dialect=engine.dialect, compile_kwargs={"literal_binds": True})
+    )
+    prefix = "EXPLAIN QUERY PLAN " if engine.dialect.name == "sqlite" else "EXPLAIN "
+    async with engine.connect() as conn:
+        rows = (await conn.execute(text(prefix + sql))).all()
+    # SQLite: (id, parent, notused, detail); PostgreSQL: одна строка плана
+    return [str(row[-1]) for row in rows]
+
+
+async def timing(engine: AsyncEngine, stmt: Select[Any], repeat: int) -> float:
+    samples = []
+    async with engine.connect() as conn:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            (await conn.execute(stmt)).all()
+            samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+async def measure(
+    engine: AsyncEngine, title: str, repeat: int, ticket_id: int, message_id: int
+) -> Dict[str, float]:
+    async with engine.begin() as conn:
+        await conn.execute(text("ANALYZE"))
+    print(f"\n=== {title} ===")
+    results = {}
+    for name, stmt in queries(ticket_id, message_id, operator_id=1):
+        print(f"\n{name}")
+        for line in await explain(engine, stmt):
+            print(f"    {line}")
+        results[name] = await timing(engine, stmt, repeat)
+        print(f"    медиана: {results[name]:.2f} мс")
+    return results
+
+
+async def run(
+    tickets: int, messages_per_ticket: int, repeat: int, database_url: Optional[str]
+) -> None:
+    if database_url is None:
+        directory = tempfile.mkdtemp(prefix="service-desk-bench-")
+        database_url = f"sqlite+aiosqlite:///{os.path.join(directory, 'bench.db')}"
+    engine = create_async_engine(database_url)
+
+    def existing_tables(sync_conn: Any) -> List[str]:
+        return list(inspect(sync_conn).get_table_names())
+
+    async with engine.connect() as conn:
+        if await conn.run_sync(existing_tables):
+            raise SystemExit("База не пуста: нужен URL пустой базы")
+    try:
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+            for index in INDEXES:
+                await conn.run_sync(index.drop)
+
+        start = time.perf_counter()
+        await seed(engine, tickets, messages_per_ticket)
+        print(
+            f"{engine.dialect.name}: обращений {tickets}, "
+            f"сообщений {tickets * messages_per_ticket}, "
+            f"заполнение {time.perf_counter() - start:.1f} с"
+        )
+
+        ticket_id = tickets // 2
+        async with engine.connect() as conn:
+            message_id = await conn.scalar(
+                select(func.min(Message.id)).where(Message.ticket_id == ticket_id)
+            )
+        position = (ticket_id, message_id or 0)
+        before = await measure(engine, "без индексов", repeat, *position)
+        async with engine.begin() as conn:
+            for index in INDEXES:
+                await conn.run_sync(index.create)
+        after = await measure(engine, "с индексами", repeat, *position)
+
+        print("\n=== итог, медиана мс ===")
+        for name in before:
+            print(
+                f"{name:<36} {before[name]:10.2f} -> {after[name]:8.2f}  "
+                f"x{before[name] / max(after[name], 1e-6):.1f}"
+            )
+    finally:
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.drop_all)
+        await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tickets", type=int, default=200_000)
+    parser.add_argument("--messages-per-ticket", type=int, default=3)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--database-url", default=None)
+    args = parser.parse_args()
+    asyncio.run(
+        run(args.tickets, args.messages_per_ticket, args.repeat, args.database_url)
+    )
+
+
+if __name__ == "__main__":
+    main()
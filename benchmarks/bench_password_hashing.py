@@ -0,0 +1,100 @@
+"""
+Бенчмарк задержки GET /api/tickets во время создания пользователей.
+
+Хэширование bcrypt в цикле событий блокирует все остальные запросы;
+в пуле потоков задержка чтения не зависит от нагрузки на регистрацию.
+
+Запуск: python -m benchmarks.bench_password_hashing [--creators N] [--seconds S]
+"""
+
+import argparse
+import asyncio
+import itertools
+import time
+
+from httpx import AsyncClient
+
+from app.core.config import Settings
+from app.core.security import PasswordHasher
+from app.database.models import Ticket, User
+from app.services import user_service
+from benchmarks.common import percentile, sqlite_app
+
+settings = Settings()
+counter = itertools.count()
+
+
+async def create_users(client: AsyncClient, deadline: float) -> None:
+    while time.perf_counter() < deadline:
+        number = next(counter)
+        await client.post(
+            "/api/users",
+            json={
+                "email": f"user{number}@example.com",
+                "username": f"user{number}",
+                "password": "password123",
+            },
+        )
+
+
+async def read_tickets(client: AsyncClient, deadline: float) -> list[float]:
+    latencies = []
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        response = await client.get("/api/tickets", params={"limit": 20})
+        response.raise_for_status()
+        latencies.append((time.perf_counter() - start) * 1000)
+        await asyncio.sleep(0.005)
+    return latencies
+
+
+async def run_mode(name: str, workers: int, creators: int, seconds: float) -> None:
+    user_service.password_hasher = PasswordHasher(
+        rounds=settings.bcrypt_rounds, workers=workers
+    )
+    async with sqlite_app() as (client, session_maker):
+        async with session_maker() as session:
+            user = User(email="seed@example.com", username="seed", hashed_password="x")
+            session.add(user)
+            await session.flush()
+            session.add_all(
+                Ticket(subject=f"S{i}", description="D", creator_id=user.id)
+                for i in range(100)
+            )
+            await session.commit()
+
+        deadline = time.perf_counter() + seconds
+        results = await asyncio.gather(
+            read_tickets(client, deadline),
+            *(create_users(client, deadline) for _ in range(creators)),
+        )
+    user_service.password_hasher.shutdown()
+    latencies = results[0]
+    print(
+        f"{name:<24} запросов: {len(latencies):5d}  "
+        f"p50: {percentile(latencies, 50):8.2f} мс  "
+        f"p99: {percentile(latencies, 99):8.2f} мс"
+    )
+
+
+async def run(creators: int, seconds: float) -> None:
+    print(f"bcrypt rounds={settings.bcrypt_rounds}, создающих клиентов: {creators}")
+    await run_mode("в цикле событий", 0, creators, seconds)
+    await run_mode(
+        f"пул потоков ({settings.password_hash_workers})",
+        settings.password_hash_workers,
+        creators,
+        seconds,
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--creators", type=int, default=4)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    args = parser.parse_args()
+    asyncio.run(run(args.creators, args.seconds))
+
+
+if __name__ == "__main__":
+    main()
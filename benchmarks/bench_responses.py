@@ -0,0 +1,117 @@
+"""
+Бенчмарк формирования JSON-ответа для списков обращений и сообщений.
+
+Сравнивает стандартный путь FastAPI (повторная валидация по response_model
+и jsonable_encoder) с PydanticJSONResponse на тех же данных, что отдают
+GET /tickets и GET /tickets/{id}/messages.
+
+Запуск: python -m benchmarks.bench_responses [--items N] [--requests R]
+"""
+
+import argparse
+import asyncio
+import time
+from datetime import datetime
+from typing import List
+
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+
+from app.api.responses import PydanticJSONResponse
+from app.api.schemas import BaseResponse, Message, PageResponse, Ticket, User
+
+
+def make_payloads(
+    count: int,
+) -> tuple[PageResponse[Ticket], BaseResponse[List[Message]]]:
+    now = datetime.utcnow()
+    users = [
+        User(
+            id=i,
+            email=f"user{i}@example.com",
+            username=f"user{i}",
+            is_active=True,
+            created_at=now,
+            updated_at=now,
+        )
+        for i in range(10)
+    ]
+    tickets = [
+        Ticket(
+            id=i,
+            subject=f"Subject {i}",
+            description="Description " * 20,
+            status="open",
+            created_at=now,
+            updated_at=now,
+            creator=users[i % 10],
+            operator=users[(i + 1) % 10],
+        )
+        for i in range(count)
+    ]
+    messages = [
+        Message(id=i, text="Text " * 20, created_at=now, author=users[i % 10])
+        for i in range(count)
+    ]
+    return (
+        PageResponse[Ticket](data=tickets, message="ok", next_cursor="cursor"),
+        BaseResponse[List[Message]](data=messages, message="ok"),
+    )
+
+
+def make_app(
+    tickets: PageResponse[Ticket], messages: BaseResponse[List[Message]]
+) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/default/tickets", response_model=PageResponse[Ticket])
+    async def default_tickets() -> PageResponse[Ticket]:
+        return tickets
+
+    @app.get("/default/messages", response_model=BaseResponse[List[Message]])
+    async def default_messages() -> BaseResponse[List[Message]]:
+        return messages
+
+    @app.get("/fast/tickets", response_model=PageResponse[Ticket])
+    async def fast_tickets() -> PydanticJSONResponse:
+        return PydanticJSONResponse(tickets)
+
+    @app.get("/fast/messages", response_model=BaseResponse[List[Message]])
+    async def fast_messages() -> PydanticJSONResponse:
+        return PydanticJSONResponse(messages)
+
+    return app
+
+
+async def measure(client: AsyncClient, url: str, requests: int) -> float:
+    await client.get(url)
+    start = time.perf_counter()
+    for _ in range(requests):
+        response = await client.get(url)
+        response.raise_for_status()
+    return (time.perf_counter() - start) / requests * 1000
+
+
+async def run(items: int, requests: int) -> None:
+    app = make_app(*make_payloads(items))
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://bench") as client:
+        for name in ("tickets", "messages"):
+            default = await measure(client, f"/default/{name}", requests)
+            fast = await measure(client, f"/fast/{name}", requests)
+            print(f"/{name} ({items} шт.)")
+            print(f"  response_model + jsonable_encoder: {default:8.2f} мс/запрос")
+            print(f"  PydanticJSONResponse:              {fast:8.2f} мс/запрос")
+            print(f"  ускорение x{default / fast:.2f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--items", type=int, default=500)
+    parser.add_argument("--requests", type=int, default=50)
+    args = parser.parse_args()
+    asyncio.run(run(args.items, args.requests))
+
+
+if __name__ == "__main__":
+    main()
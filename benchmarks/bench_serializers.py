@@ -0,0 +1,124 @@
+"""
+Микробенчмарк сериализации ORM-объектов в схемы API.
+
+Сравнивает map_db_model_to_dict + model_validate с ModelSerializer.
+
+Запуск: python -m benchmarks.bench_serializers [--objects N] [--repeat R]
+"""
+
+import argparse
+import timeit
+from datetime import datetime
+from typing import Callable, List
+
+from app.api.schemas import (
+    Message as MessageSchema,
+    Ticket as TicketSchema,
+    User as UserSchema,
+)
+from app.database.models import Message, Ticket, User
+from app.database.serializers import ModelSerializer
+from app.database.tools import map_db_model_to_dict
+
+
+def make_objects(count: int) -> tuple[List[User], List[Ticket], List[Message]]:
+    now = datetime.utcnow()
+    users = [
+        User(
+            id=i,
+            email=f"user{i}@example.com",
+            username=f"user{i}",
+            is_active=True,
+            hashed_password="hashed",
+            created_at=now,
+            updated_at=now,
+        )
+        for i in range(1, 11)
+    ]
+    tickets = [
+        Ticket(
+            id=i,
+            subject=f"Subject {i}",
+            description="Description " * 20,
+            status="open",
+            created_at=now,
+            updated_at=now,
+            creator_id=i % 10 + 1,
+            operator_id=(i + 1) % 10 + 1,
+        )
+        for i in range(count)
+    ]
+    messages = [
+        Message(
+            id=i, text="Text " * 20, created_at=now, ticket_id=1, author_id=i % 10 + 1
+        )
+        for i in range(count)
+    ]
+    return users, tickets, messages
+
+
+def report(name: str, count: int, repeat: int, func: Callable[[], object]) -> float:
+    best = min(timeit.repeat(func, number=1, repeat=repeat))
+    per_object = best / count * 1e6
+    print(f"{name:<45} {per_object:8.2f} мкс/объект")
+    return per_object
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--objects", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    users, tickets, messages = make_objects(args.objects)
+    user_serializer = ModelSerializer(User, UserSchema)
+    ticket_serializer = ModelSerializer(Ticket, TicketSchema)
+    message_serializer = ModelSerializer(Message, MessageSchema)
+    user_schemas = {user.id: user_serializer.serialize(user) for user in users}
+    user_list = users * (args.objects // len(users))
+
+    def legacy_users() -> None:
+        for user in user_list:
+            UserSchema.model_validate(map_db_model_to_dict(user))
+
+    def legacy_tickets() -> None:
+        for ticket in tickets:
+            ticket_dict = map_db_model_to_dict(ticket)
+            ticket_dict["creator"] = user_schemas[ticket.creator_id]
+            ticket_dict["operator"] = user_schemas[ticket.operator_id]
+            TicketSchema.model_validate(ticket_dict)
+
+    def legacy_messages() -> None:
+        for message in messages:
+            message_dict = map_db_model_to_dict(message)
+            message_dict["author"] = user_schemas[message.author_id]
+            MessageSchema.model_validate(message_dict)
+
+    cases = [
+        (
+            "User",
+            len(user_list),
+            legacy_users,
+            lambda: user_serializer.serialize_many(user_list),
+        ),
+        (
+            "Ticket",
+            len(tickets),
+            legacy_tickets,
+            lambda: ticket_serializer.serialize_many(tickets, user_schemas),
+        ),
+        (
+            "Message",
+            len(messages),
+            legacy_messages,
+            lambda: message_serializer.serialize_many(messages, user_schemas),
+        ),
+    ]
+    for name, count, legacy, compiled in cases:
+        before = report(f"{name}: map_db_model_to_dict", count, args.repeat, legacy)
+        after = report(f"{name}: ModelSerializer", count, args.repeat, compiled)
+        print(f"{name}: ускорение x{before / after:.2f}\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+Пропускная способность отправки писем EmailClient: без пула SMTP, с пулом
+и на asyncio (send_emails_async) с --concurrency соединениями.
+
+Письма отправляются в локальную заглушку SMTP сервера с задержкой ответа,
+имитирующей сеть (--latency), и стоимостью установки соединения (--handshake,
+TCP и TLS рукопожатие у реального провайдера).
+
+Запуск: python -m benchmarks.bench_smtp [--messages N] [--threads T]
+        [--concurrency C] [--latency MS] [--handshake MS]
+"""
+
+import argparse
+import asyncio
+import smtplib
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Tuple
+
+from app.mail.async_smtp import AsyncSMTPConnection, AsyncSMTPSender
+from app.mail.client import EmailClient
+from tests.smtp_stub import SMTPStub
+
+
+class StubEmailClient(EmailClient):
+    """
+    Клиент, подключающийся к заглушке без TLS.
+    """
+
+    def __init__(
+        self, address: Tuple[str, int], pool_size: int, concurrency: int = 1
+    ) -> None:
+        super().__init__()
+        self.smtp_host, self.smtp_port = address
+        self.smtp_pool.size = pool_size
+        self.async_sender = AsyncSMTPSender(
+            self._connect_async,
+            concurrency=concurrency,
+            max_messages=self.smtp_pool.max_messages,
+            max_age=self.smtp_pool.max_age,
+            check_after=self.smtp_pool.check_after,
+        )
+
+    def _connect(self) -> smtplib.SMTP:
+        server = smtplib.SMTP(self.smtp_host, self.smtp_port, timeout=30)
+        server.login(self.smtp_user, self.smtp_password)
+        return server
+
+    async def _connect_async(self) -> AsyncSMTPConnection:
+        return await AsyncSMTPConnection.open(
+            self.smtp_host,
+            self.smtp_port,
+            self.smtp_user,
+            self.smtp_password,
+            timeout=30,
+            tls=False,
+        )
+
+
+def report(
+    title: str,
+    stub: SMTPStub,
+    messages: int,
+    elapsed: float,
+    connections: int,
+    received: int,
+) -> None:
+    print(
+        f"{title:<12} {messages / elapsed:8.1f} писем/с  "
+        f"соединений {stub.connections - connections:5d}  "
+        f"доставлено {len(stub.messages) - received}"
+    )
+
+
+def run(
+    title: str, stub: SMTPStub, client: StubEmailClient, messages: int, threads: int
+) -> None:
+    connections = stub.connections
+    received = len(stub.messages)
+    start = time.perf_counter()
+    with ThreadPoolExecutor(threads) as executor:
+        for number in range(messages):
+            executor.submit(
+                client.send_email, f"user{number}@example.com", "Тема", "Текст письма"
+            )
+    elapsed = time.perf_counter() - start
+    client.close()
+    report(title, stub, messages, elapsed, connections, received)
+
+
+async def run_async(
+    title: str, stub: SMTPStub, client: StubEmailClient, messages: int
+) -> None:
+    connections = stub.connections
+    received = len(stub.messages)
+    start = time.perf_counter()
+    await client.send_emails_async(
+        [
+            (f"user{number}@example.com", "Тема", "Текст письма")
+            for number in range(messages)
+        ]
+    )
+    elapsed = time.perf_counter() - start
+    await client.close_async()
+    report(title, stub, messages, elapsed, connections, received)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--messages", type=int, default=500)
+    parser.add_argument("--threads", type=int, default=1)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--latency", type=float, default=2.0)
+    parser.add_argument("--handshake", type=float, default=30.0)
+    args = parser.parse_args()
+
+    stub = SMTPStub(latency=args.latency / 1000, handshake=args.handshake / 1000)
+    with stub.in_thread() as address:
+        for title, pool_size in (("без пула", 0), ("с пулом", max(args.threads, 1))):
+            client = StubEmailClient(address, pool_size)
+            run(title, stub, client, args.messages, args.threads)
+        client = StubEmailClient(address, 0, args.concurrency)
+        asyncio.run(run_async("asyncio", stub, client, args.messages))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+Общие помощники бенчмарков: приложение на временной SQLite базе.
+"""
+
+import os
+import tempfile
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Tuple
+
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.core.database import get_async_session, get_session_maker
+from app.database.models import Base
+from app.main import app
+
+
+@asynccontextmanager
+async def sqlite_app() -> (
+    AsyncIterator[Tuple[AsyncClient, async_sessionmaker[AsyncSession]]]
+):
+    """
+    Поднимает приложение поверх временной SQLite базы и возвращает клиент.
+    """
+    directory = tempfile.mkdtemp(prefix="service-desk-bench-")
+    engine = create_async_engine(
+        f"sqlite+aiosqlite:///{os.path.join(directory, 'bench.db')}"
+    )
+    session_maker = async_sessionmaker(
+        engine, class_=AsyncSession, expire_on_commit=False
+    )
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    async def override_session() -> AsyncIterator[AsyncSession]:
+        async with session_maker() as session:
+            yield session
+
+    app.dependency_overrides[get_async_session] = override_session
+    app.dependency_overrides[get_session_maker] = lambda: session_maker
+    try:
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://bench") as client:
+            yield client, session_maker
+    finally:
+        app.dependency_overrides.clear()
+        await engine.dispose()
+
+
+def percentile(values: list[float], percent: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(percent / 100 * (len(ordered) - 1))))
+    return ordered[index]
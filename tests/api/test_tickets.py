@@ -0,0 +1,471 @@
+import asyncio
+import os
+import tempfile
+import pytest
+import pytest_asyncio
+from httpx import AsyncClient
+from unittest.mock import AsyncMock, MagicMock, patch
+from fastapi import status
+from datetime import datetime
+from typing import Any, AsyncIterator, Iterator, List
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from app.api.endpoints import get_messages, get_ticket, get_tickets
+from app.api.enums import SortOrder
+from app.api.schemas import Ticket, User, Message
+from app.database.models import Base
+from app.services import ticket_service
+from app.services.exceptions import ConflictError
+from app.services.ticket_cache import CachedTicket, ticket_cache
+from app.services.ticket_service import TicketSearchPage
+
+
+@pytest.mark.asyncio
+class TestTicketEndpoints:
+    @pytest.fixture(autouse=True)
+    def setup(self, client: AsyncClient) -> Iterator[None]:
+        self.client = client
+        self.now = datetime.now()
+        self.user = User(
+            id=1,
+            email="test@example.com",
+            username="testuser",
+            is_active=True,
+            created_at=self.now,
+            updated_at=self.now,
+        )
+        self.ticket = Ticket(
+            id=1,
+            subject="Test Subject",
+            description="Test Description",
+            status="open",
+            created_at=self.now,
+            updated_at=self.now,
+            version=1,
+            creator=self.user,
+            operator=None,
+        )
+        self.message = Message(
+            id=1, text="Test Message", created_at=self.now, author=self.user
+        )
+        # Снимки состояния для ETag списков, без обращений к базе
+        with patch(
+            "app.services.ticket_service.get_tickets_state",
+            new_callable=AsyncMock,
+            return_value=(1, self.now),
+        ) as self.tickets_state, patch(
+            "app.services.ticket_service.get_messages_state",
+            new_callable=AsyncMock,
+            return_value=(1, 1),
+        ) as self.messages_state:
+            yield
+
+    async def test_get_ticket_json(self) -> None:
+        """
+        Тест ответа эндпоинта, сериализованного напрямую в JSON.
+        """
+        with patch(
+            "app.services.ticket_service.get_ticket",
+            new_callable=AsyncMock,
+            return_value=self.ticket,
+        ):
+            response = self.client.get("/api/tickets/1")
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["content-type"] == "application/json"
+        assert response.json() == {
+            "data": self.ticket.model_dump(mode="json"),
+            "message": "Обращение успешно получено",
+        }
+
+    async def test_get_tickets_by_ids(self) -> None:
+        """
+        Тест получения обращений по списку ID в порядке запроса.
+        """
+        second = self.ticket.model_copy(update={"id": 2})
+        with patch(
+            "app.services.ticket_service.get_tickets_by_ids",
+            new_callable=AsyncMock,
+            return_value=[self.ticket, second],
+        ) as mock_get:
+            response = self.client.get("/api/tickets?ids=2,7&ids=1,2")
+
+        assert response.status_code == status.HTTP_200_OK
+        assert mock_get.await_args.args[1] == [2, 7, 1]
+        body = response.json()
+        assert [ticket["id"] for ticket in body["data"]] == [2, 1]
+        assert body["missing_ids"] == [7]
+
+        for ids in ("1,abc", "²", "1,-2", "2147483648", "1" * 5000):
+            response = self.client.get("/api/tickets", params={"ids": ids})
+            assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    async def test_update_ticket_if_match(self) -> None:
+        """
+        Тест передачи версии из If-Match и ответа 409 при конфликте.
+        """
+        updated = self.ticket.model_copy(update={"version": 3})
+        with patch(
+            "app.services.ticket_service.update_ticket",
+            new_callable=AsyncMock,
+            return_value=updated,
+        ) as mock_update:
+            response = self.client.patch(
+                "/api/tickets/1", json={"status": "closed"}, headers={"If-Match": '"2"'}
+            )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["etag"] == '"3"'
+        assert mock_update.await_args.kwargs["expected_version"] == 2
+
+        with patch(
+            "app.services.ticket_service.update_ticket",
+            new_callable=AsyncMock,
+            side_effect=ConflictError("conflict"),
+        ):
+            response = self.client.patch(
+                "/api/tickets/1", json={"status": "closed"}, headers={"If-Match": "1"}
+            )
+
+        assert response.status_code == status.HTTP_409_CONFLICT
+        assert response.json() == {"detail": "conflict"}
+
+        response = self.client.patch(
+            "/api/tickets/1", json={"status": "closed"}, headers={"If-Match": "abc"}
+        )
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+        response = self.client.patch(
+            "/api/tickets/1", json={"status": "closed"}, headers={"If-Match": 'W/"2"'}
+        )
+        assert response.status_code == status.HTTP_412_PRECONDITION_FAILED
+
+    async def test_get_ticket_not_modified(self) -> None:
+        """
+        Тест ответа 304 на If-None-Match с текущим ETag обращения.
+        """
+        cached = CachedTicket(2, self.ticket.model_dump_json().encode())
+        with patch(
+            "app.services.ticket_service.load_ticket_cached",
+            new_callable=AsyncMock,
+            return_value=cached,
+        ):
+            response = self.client.get("/api/tickets/1")
+            assert response.status_code == status.HTTP_200_OK
+            assert response.headers["etag"] == '"2"'
+            assert response.json()["data"] == self.ticket.model_dump(mode="json")
+
+            response = self.client.get(
+                "/api/tickets/1", headers={"If-None-Match": 'W/"1", "2"'}
+            )
+            assert response.status_code == status.HTTP_304_NOT_MODIFIED
+            assert response.content == b""
+
+            response = self.client.get(
+                "/api/tickets/1", headers={"If-None-Match": '"1"'}
+            )
+            assert response.status_code == status.HTTP_200_OK
+
+    async def test_get_ticket_not_coalesced_across_write(self) -> None:
+        """
+        Тест чтения после записи: запрос не присоединяется к чтению обращения,
+        начатому до смены штампа в кэше.
+        """
+        body = self.ticket.model_dump_json().encode()
+        versions = iter([1, 2])
+        started, release = asyncio.Event(), asyncio.Event()
+
+        async def load(session: object, ticket_id: int, stamp: bytes) -> CachedTicket:
+            version = next(versions)
+            started.set()
+            await release.wait()
+            return CachedTicket(version, body)
+
+        def request() -> "asyncio.Task[object]":
+            return asyncio.create_task(
+                get_ticket(
+                    1,
+                    fieldset=None,
+                    if_none_match=None,
+                    session=MagicMock(),
+                    loader=MagicMock(),
+                    session_maker=MagicMock(),
+                )
+            )
+
+        with patch(
+            "app.services.ticket_service.load_ticket_cached", side_effect=load
+        ) as mock_load:
+            before = request()
+            await started.wait()
+            await ticket_cache.invalidate([1])
+            after = request()
+            await asyncio.sleep(0)
+            release.set()
+            responses = await asyncio.gather(before, after)
+
+        assert mock_load.call_count == 2
+        assert [r.headers["etag"] for r in responses] == ['"1"', '"2"']
+
+    async def test_get_tickets_not_modified(self) -> None:
+        """
+        Тест слабого ETag списка обращений: 304 без загрузки строк.
+        """
+        with patch(
+            "app.services.ticket_service.get_tickets",
+            new_callable=AsyncMock,
+            return_value=[self.ticket],
+        ) as mock_get:
+            response = self.client.get("/api/tickets", params={"status": "open"})
+            assert response.status_code == status.HTTP_200_OK
+            etag = response.headers["etag"]
+            assert etag.startswith('W/"')
+            assert self.tickets_state.await_args.args[1:] == (None,)
+
+            response = self.client.get(
+                "/api/tickets",
+                params={"status": "open"},
+                headers={"If-None-Match": etag},
+            )
+            assert response.status_code == status.HTTP_304_NOT_MODIFIED
+            assert response.headers["etag"] == etag
+            assert mock_get.await_count == 1
+
+            self.tickets_state.return_value = (2, self.now)
+            response = self.client.get(
+                "/api/tickets",
+                params={"status": "open"},
+                headers={"If-None-Match": etag},
+            )
+            assert response.status_code == status.HTTP_200_OK
+            assert response.headers["etag"] != etag
+
+        response = self.client.get(
+            "/api/tickets?ids=1,2", headers={"If-None-Match": "*"}
+        )
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+        assert self.tickets_state.await_args.args[1:] == ([1, 2],)
+
+    async def test_search_tickets(self) -> None:
+        """
+        Тест поиска: маршрут не перехватывается /tickets/{ticket_id}.
+        """
+        page = TicketSearchPage([self.ticket], "cursor")
+        with patch(
+            "app.services.ticket_service.search_tickets",
+            new_callable=AsyncMock,
+            return_value=page,
+        ) as mock_search:
+            response = self.client.get(
+                "/api/tickets/search", params={"q": "принтер", "status": "open"}
+            )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert mock_search.await_args.args[1:] == ("принтер", "open")
+        body = response.json()
+        assert body["data"] == [self.ticket.model_dump(mode="json")]
+        assert body["next_cursor"] == "cursor"
+
+        response = self.client.get("/api/tickets/search", params={"q": "!"})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    async def test_get_ticket_fields(self) -> None:
+        """
+        Тест передачи выборки полей в сервис и ответа с этими полями.
+        """
+        with patch(
+            "app.services.ticket_service.get_ticket",
+            new_callable=AsyncMock,
+            return_value={"id": 1, "subject": "Test Subject"},
+        ) as mock_get:
+            response = self.client.get("/api/tickets/1?fields=subject&expand=creator")
+
+        assert response.status_code == status.HTTP_200_OK
+        fieldset = mock_get.await_args.args[3]
+        assert fieldset.columns == ("id", "subject")
+        assert fieldset.relationships == (("creator", "creator_id"),)
+        assert response.json()["data"] == {"id": 1, "subject": "Test Subject"}
+        assert "etag" not in response.headers
+
+        response = self.client.get("/api/tickets/1?fields=password")
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    async def test_get_ticket_fields_not_modified(self) -> None:
+        """
+        Тест ответа 304 для выборки полей с версией обращения.
+        """
+        with patch(
+            "app.services.ticket_service.get_ticket",
+            new_callable=AsyncMock,
+            return_value={"id": 1, "subject": "Test Subject", "version": 2},
+        ):
+            url = "/api/tickets/1?fields=subject,version"
+            response = self.client.get(url)
+            assert response.status_code == status.HTTP_200_OK
+            assert response.headers["etag"] == '"2"'
+
+            response = self.client.get(url, headers={"If-None-Match": '"2"'})
+            assert response.status_code == status.HTTP_304_NOT_MODIFIED
+            assert response.headers["etag"] == '"2"'
+            assert response.content == b""
+
+            response = self.client.get(url, headers={"If-None-Match": '"1"'})
+            assert response.status_code == status.HTTP_200_OK
+
+    async def test_get_messages_json(self) -> None:
+        """
+        Тест ответа со списком сообщений.
+        """
+        with patch(
+            "app.services.ticket_service.get_messages",
+            new_callable=AsyncMock,
+            return_value=[self.message],
+        ):
+            response = self.client.get("/api/tickets/1/messages")
+            assert response.status_code == status.HTTP_200_OK
+            assert response.json()["data"] == [self.message.model_dump(mode="json")]
+
+            etag = response.headers["etag"]
+            response = self.client.get(
+                "/api/tickets/1/messages", headers={"If-None-Match": etag}
+            )
+            assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+            self.messages_state.return_value = (2, 2)
+            response = self.client.get(
+                "/api/tickets/1/messages", headers={"If-None-Match": etag}
+            )
+            assert response.status_code == status.HTTP_200_OK
+
+    async def test_get_messages_after_id(self) -> None:
+        """
+        Тест передачи after_id и limit в сервис.
+        """
+        with patch(
+            "app.services.ticket_service.get_messages",
+            new_callable=AsyncMock,
+            return_value=[self.message],
+        ) as mock_get:
+            response = self.client.get(
+                "/api/tickets/1/messages", params={"after_id": 7, "limit": 20}
+            )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert mock_get.await_args.kwargs == {"after_id": 7, "limit": 20}
+
+        response = self.client.get("/api/tickets/1/messages", params={"limit": 0})
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+    async def test_get_tickets_stream(self) -> None:
+        """
+        Тест потокового ответа со списком обращений.
+        """
+
+        async def stream_tickets(*args, **kwargs) -> AsyncIterator[List[Ticket]]:
+            yield [self.ticket]
+            yield []
+            yield [self.ticket.model_copy(update={"id": 2})]
+
+        with patch(
+            "app.services.ticket_service.stream_tickets", side_effect=stream_tickets
+        ):
+            response = self.client.get("/api/tickets", params={"stream": True})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["content-type"] == "application/json"
+        body = response.json()
+        assert [ticket["id"] for ticket in body["data"]] == [1, 2]
+        assert body["message"] == "Список обращений успешно получен"
+
+    async def test_openapi_response_schema(self) -> None:
+        """
+        Тест сохранения схемы ответа в OpenAPI.
+        """
+        schema = self.client.get("/openapi.json").json()
+        response = schema["paths"]["/api/tickets/{ticket_id}"]["get"]["responses"]
+        assert response["200"]["content"]["application/json"]["schema"] == {
+            "$ref": "#/components/schemas/BaseResponse_Ticket_"
+        }
+
+
+@pytest.mark.asyncio
+class TestListConnectionPool:
+    @pytest_asyncio.fixture(autouse=True)
+    async def setup(self) -> AsyncIterator[None]:
+        """
+        Файловая SQLite база с пулом на два соединения без переполнения.
+        """
+        directory = tempfile.mkdtemp(prefix="service-desk-test-")
+        self.engine = create_async_engine(
+            f"sqlite+aiosqlite:///{os.path.join(directory, 'pool.db')}",
+            poolclass=AsyncAdaptedQueuePool,
+            pool_size=2,
+            max_overflow=0,
+            pool_timeout=2,
+        )
+        async with self.engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        self.session_maker = async_sessionmaker(self.engine, expire_on_commit=False)
+        yield
+        await self.engine.dispose()
+
+    async def run_concurrently(self, target: str, *requests: Any) -> List[Any]:
+        """
+        Выполняет запросы одновременно; чтение строк начинается, только когда
+        все запросы прошли снимок ETag.
+        """
+        barrier = asyncio.Barrier(len(requests))
+        read = getattr(ticket_service, target)
+
+        async def after_barrier(*args: Any, **kwargs: Any) -> Any:
+            await barrier.wait()
+            return await read(*args, **kwargs)
+
+        async def call(request: Any) -> Any:
+            async with self.session_maker() as session:
+                return await request(session)
+
+        with patch(f"app.services.ticket_service.{target}", side_effect=after_barrier):
+            return await asyncio.wait_for(
+                asyncio.gather(*(call(request) for request in requests)), 10
+            )
+
+    async def test_list_requests_share_small_pool(self) -> None:
+        """
+        Тест всплеска запросов списков: соединение снимка возвращается в пул,
+        и одновременные запросы не ждут второго соединения до таймаута.
+        """
+
+        def tickets(limit: int) -> Any:
+            return lambda session: get_tickets(
+                None,
+                status=None,
+                sort_by=SortOrder.CREATED_AT_DESC,
+                limit=limit,
+                cursor=None,
+                stream=False,
+                fieldset=None,
+                if_none_match=None,
+                session=session,
+                session_maker=self.session_maker,
+            )
+
+        def messages(ticket_id: int) -> Any:
+            return lambda session: get_messages(
+                ticket_id,
+                after_id=None,
+                limit=None,
+                stream=False,
+                if_none_match=None,
+                session=session,
+                session_maker=self.session_maker,
+            )
+
+        responses = await self.run_concurrently("get_tickets", tickets(10), tickets(20))
+        assert [r.status_code for r in responses] == [200, 200]
+
+        responses = await self.run_concurrently(
+            "get_messages", messages(1), messages(2)
+        )
+        assert [r.status_code for r in responses] == [200, 200]
@@ -96,3 +96,73 @@ class TestUserCreation:
         }
         response = self.client.post("/api/users", json=bad_user_data)
         assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
+@pytest.mark.asyncio
+class TestUserBatch:
+    @pytest.fixture(autouse=True)
+    def setup(self, client: AsyncClient) -> None:
+        self.client = client
+        now = datetime.now()
+        self.users = [
+            User(
+                id=user_id,
+                email=f"user{user_id}@example.com",
+                username=f"user{user_id}",
+                is_active=True,
+                created_at=now,
+                updated_at=now,
+            )
+            for user_id in (1, 2)
+        ]
+
+    async def test_get_users_by_ids(self) -> None:
+        """
+        Тест получения пользователей по списку ID в порядке запроса.
+        """
+        with patch(
+            "app.services.user_service.get_users",
+            new_callable=AsyncMock,
+            return_value=self.users,
+        ) as mock_get_users:
+            response = self.client.get("/api/users?ids=2,3,1")
+
+        assert response.status_code == status.HTTP_200_OK
+        mock_get_users.assert_awaited_once()
+        body = response.json()
+        assert [user["id"] for user in body["data"]] == [2, 1]
+        assert body["missing_ids"] == [3]
+
+    async def test_get_user_not_modified(self) -> None:
+        """
+        Тест ответа 304 на If-None-Match с ETag пользователя.
+        """
+        with patch(
+            "app.services.user_service.get_user",
+            new_callable=AsyncMock,
+            return_value=self.users[0],
+        ):
+            response = self.client.get("/api/users/1")
+            assert response.status_code == status.HTTP_200_OK
+            etag = response.headers["etag"]
+
+            response = self.client.get("/api/users/1", headers={"If-None-Match": etag})
+            assert response.status_code == status.HTTP_304_NOT_MODIFIED
+            assert response.content == b""
+
+        updated = self.users[0].model_copy(update={"updated_at": datetime.now()})
+        with patch(
+            "app.services.user_service.get_user",
+            new_callable=AsyncMock,
+            return_value=updated,
+        ):
+            response = self.client.get("/api/users/1", headers={"If-None-Match": etag})
+        assert response.status_code == status.HTTP_200_OK
+
+    async def test_get_users_too_many_ids(self) -> None:
+        """
+        Тест ограничения числа запрашиваемых ID.
+        """
+        ids = ",".join(str(user_id) for user_id in range(1, 502))
+        response = self.client.get(f"/api/users?ids={ids}")
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
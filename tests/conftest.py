@@ -1,3 +1,4 @@
+import asyncio
 from typing import Any, AsyncGenerator
 
 import pytest
@@ -6,12 +7,24 @@ from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sess
 from app.main import app
 from app.core.config import Settings
 from app.database.models import Base
+from app.services.ticket_cache import ticket_cache
+from app.services.user_cache import user_cache
 
 settings = Settings()
 
 TEST_DATABASE_URL = "sqlite+aiosqlite:///:memory:"
 
 
+@pytest.fixture(autouse=True)
+def clear_caches() -> None:
+    """
+    Фикстура очистки кэшей пользователей и обращений: они общие для
+    процесса, а тесты создают записи с одинаковыми ID в разных базах.
+    """
+    asyncio.run(user_cache.clear())
+    asyncio.run(ticket_cache.clear())
+
+
 @pytest.fixture(scope="session")
 def client() -> TestClient:
     """
@@ -0,0 +1,155 @@
+"""
+Локальная заглушка SMTP сервера для тестов и бенчмарка bench_smtp.
+
+Принимает EHLO/HELO, AUTH PLAIN, MAIL, RCPT, DATA, RSET, NOOP и QUIT, хранит
+принятые письма в памяти и считает соединения и команды. Задержка ответа
+latency имитирует сетевой RTT, handshake - установку TCP и TLS соединения,
+которую заглушка без TLS иначе не воспроизводит.
+"""
+
+import asyncio
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator, List, Optional, Set, Tuple
+
+
+class SMTPStub:
+    """
+    SMTP сервер на asyncio, работающий в текущем цикле событий или в потоке.
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        handshake: float = 0.0,
+        reject: Optional[Set[str]] = None,
+    ) -> None:
+        self.latency = latency
+        self.handshake = handshake
+        self.reject = reject or set()
+        self.messages: List[Tuple[str, List[str], bytes]] = []
+        self.connections = 0
+        self.commands: Counter[str] = Counter()
+        self._server: Optional[asyncio.Server] = None
+        self._writers: Set[asyncio.StreamWriter] = set()
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> Tuple[str, int]:
+        """
+        Запускает сервер в текущем цикле событий и возвращает его адрес.
+        """
+        self._server = await asyncio.start_server(self._handle, host, port)
+        address: Tuple[str, int] = self._server.sockets[0].getsockname()[:2]
+        return address
+
+    async def stop(self) -> None:
+        if self._server is None:
+            return
+        self._server.close()
+        self.disconnect()
+        await self._server.wait_closed()
+        self._server = None
+
+    def disconnect(self) -> None:
+        """
+        Обрывает открытые соединения, как сервер, закрывший простаивающие сессии.
+        """
+        for writer in list(self._writers):
+            writer.close()
+
+    @contextmanager
+    def in_thread(self) -> Iterator[Tuple[str, int]]:
+        """
+        Запускает сервер в отдельном потоке для блокирующих клиентов.
+        """
+        loop = asyncio.new_event_loop()
+        thread = threading.Thread(target=loop.run_forever, daemon=True)
+        thread.start()
+        try:
+            yield asyncio.run_coroutine_threadsafe(self.start(), loop).result()
+        finally:
+            asyncio.run_coroutine_threadsafe(self.stop(), loop).result()
+            loop.call_soon_threadsafe(loop.stop)
+            thread.join()
+            loop.close()
+
+    def _later(self, callback: Callable[..., None], *args: Any) -> None:
+        """
+        Выполняет callback через latency секунд. Ответы на команды, пришедшие
+        одним пакетом (PIPELINING), уходят вместе, а не копят задержку.
+        """
+        if self.latency:
+            asyncio.get_running_loop().call_later(self.latency, callback, *args)
+        else:
+            callback(*args)
+
+    def _reply(self, writer: asyncio.StreamWriter, *lines: str) -> None:
+        data = "".join(f"{line}\r\n" for line in lines).encode()
+        self._later(self._write, writer, data)
+
+    @staticmethod
+    def _write(writer: asyncio.StreamWriter, data: bytes) -> None:
+        if not writer.is_closing():
+            writer.write(data)
+
+    async def _handle(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        self.connections += 1
+        self._writers.add(writer)
+        sender = ""
+        recipients: List[str] = []
+        try:
+            if self.handshake:
+                await asyncio.sleep(self.handshake)
+            self._reply(writer, "220 stub ESMTP")
+            while line := await reader.readline():
+                command, _, argument = line.decode().rstrip("\r\n").partition(" ")
+                command = command.upper()
+                self.commands[command] += 1
+                if command == "EHLO":
+                    self._reply(
+                        writer,
+                        "250-stub",
+                        "250-AUTH PLAIN",
+                        "250-PIPELINING",
+                        "250 8BITMIME",
+                    )
+                elif command in ("HELO", "NOOP"):
+                    self._reply(writer, "250 OK")
+                elif command == "AUTH":
+                    self._reply(writer, "235 Authentication successful")
+                elif command == "MAIL":
+                    sender = argument.split(":", 1)[1].split()[0].strip("<>")
+                    recipients = []
+                    self._reply(writer, "250 OK")
+                elif command == "RCPT":
+                    recipient = argument.split(":", 1)[1].split()[0].strip("<>")
+                    if recipient in self.reject:
+                        self._reply(writer, "550 No such user")
+                    else:
+                        recipients.append(recipient)
+                        self._reply(writer, "250 OK")
+                elif command == "DATA":
+                    if not recipients:
+                        self._reply(writer, "503 No valid recipients")
+                        continue
+                    self._reply(writer, "354 End data with <CR><LF>.<CR><LF>")
+                    body = bytearray()
+                    while (chunk := await reader.readline()) not in (b".\r\n", b""):
+                        body += chunk[1:] if chunk.startswith(b"..") else chunk
+                    self.messages.append((sender, recipients, bytes(body)))
+                    self._reply(writer, "250 OK")
+                elif command == "RSET":
+                    sender, recipients = "", []
+                    self._reply(writer, "250 OK")
+                elif command == "QUIT":
+                    self._reply(writer, "221 Bye")
+                    break
+                else:
+                    self._reply(writer, "500 Command not recognized")
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            self._writers.discard(writer)
+            self._later(writer.close)
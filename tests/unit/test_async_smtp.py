@@ -0,0 +1,107 @@
+import asyncio
+import time
+import unittest
+from smtplib import SMTPRecipientsRefused
+
+from app.mail.async_smtp import AsyncSMTPConnection, AsyncSMTPSender
+from app.mail.client import EmailClient
+from tests.smtp_stub import SMTPStub
+
+
+class TestAsyncSMTPSender(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        """
+        Настройка тестового окружения: заглушка SMTP в текущем цикле событий.
+        """
+        self.stub = SMTPStub(reject={"bad@example.com"})
+        self.host, self.port = await self.stub.start()
+        self.client = EmailClient()
+        self.sender = self.make_sender(concurrency=4)
+
+    async def asyncTearDown(self) -> None:
+        await self.sender.close()
+        await self.stub.stop()
+
+    def make_sender(self, concurrency: int, timeout: float = 5) -> AsyncSMTPSender:
+        async def connect() -> AsyncSMTPConnection:
+            return await AsyncSMTPConnection.open(
+                self.host, self.port, "user", "password", timeout=timeout, tls=False
+            )
+
+        return AsyncSMTPSender(
+            connect, concurrency, max_messages=100, max_age=300, check_after=5
+        )
+
+    def messages(self, count: int) -> list:
+        return [
+            self.client.build_message(f"user{n}@example.com", "Subject", "Text\n.dot")
+            for n in range(count)
+        ]
+
+    async def test_send_many_concurrently(self) -> None:
+        """
+        Тест одновременной отправки через ограниченное число соединений.
+        """
+        self.stub.latency = 0.02
+
+        start = time.perf_counter()
+        errors = await self.sender.send_many(self.messages(40))
+        elapsed = time.perf_counter() - start
+
+        self.assertEqual(errors, [None] * 40)
+        self.assertEqual(len(self.stub.messages), 40)
+        self.assertEqual(self.stub.connections, 4)
+        self.assertEqual(len(self.sender), 4)
+        # Последовательно: 40 писем по 2 ожидания ответа (пакет команд и DATA)
+        self.assertLess(elapsed, 40 * 2 * 0.02 / 2)
+        sender, recipients, body = self.stub.messages[0]
+        self.assertEqual(sender, self.client.smtp_from_email)
+        self.assertIn(b"Text\r\n.dot", body)
+
+    async def test_send_many_refused(self) -> None:
+        """
+        Тест ошибки по получателю без закрытия соединения.
+        """
+        sender = self.make_sender(concurrency=1)
+        messages = self.messages(2)
+        messages.insert(
+            1, self.client.build_message("bad@example.com", "Тема", "Текст")
+        )
+
+        errors = await sender.send_many(messages)
+        await sender.close()
+
+        self.assertIsNone(errors[0])
+        self.assertIsInstance(errors[1], SMTPRecipientsRefused)
+        self.assertIsNone(errors[2])
+        self.assertEqual(len(self.stub.messages), 2)
+        self.assertEqual(self.stub.connections, 1)
+        self.assertEqual(self.stub.commands["RSET"], 1)
+
+    async def test_reconnect_after_disconnect(self) -> None:
+        """
+        Тест повтора письма через новое соединение после разрыва сервером.
+        """
+        await self.sender.send(self.messages(1)[0])
+        self.stub.disconnect()
+        await asyncio.sleep(0)
+
+        await self.sender.send(self.messages(1)[0])
+
+        self.assertEqual(len(self.stub.messages), 2)
+        self.assertEqual(self.stub.connections, 2)
+
+    async def test_timeout(self) -> None:
+        """
+        Тест таймаута ответа: соединение не возвращается в пул.
+        """
+        sender = self.make_sender(concurrency=1, timeout=0.05)
+        self.stub.handshake = 0.2
+
+        with self.assertRaises(TimeoutError):
+            await sender.send(self.messages(1)[0])
+        self.assertEqual(len(sender), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+import unittest
+from unittest.mock import AsyncMock, MagicMock
+
+from redis.exceptions import ConnectionError as RedisConnectionError
+
+from app.core.cache import MemoryCache, RedisCache
+from app.core.metrics import metrics
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestMemoryCache(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        """
+        Настройка тестового окружения.
+        """
+        self.clock = FakeClock()
+        self.cache = MemoryCache(max_size=2, clock=self.clock)
+
+    async def test_ttl(self) -> None:
+        """
+        Тест истечения записей по TTL.
+        """
+        await self.cache.set_many({"a": b"1"}, ttl=10)
+        await self.cache.set_many({"b": b"2"}, ttl=5)
+
+        self.clock.now = 6
+        self.assertEqual(await self.cache.get_many(["a", "b", "c"]), {"a": b"1"})
+        self.assertEqual(len(self.cache), 1)
+
+    async def test_lru_eviction(self) -> None:
+        """
+        Тест вытеснения давно не использованной записи.
+        """
+        await self.cache.set_many({"a": b"1", "b": b"2"}, ttl=10)
+        await self.cache.get_many(["a"])
+        await self.cache.set_many({"c": b"3"}, ttl=10)
+
+        self.assertEqual(
+            await self.cache.get_many(["a", "b", "c"]), {"a": b"1", "c": b"3"}
+        )
+
+    async def test_delete_and_clear(self) -> None:
+        """
+        Тест удаления записей и очистки кэша.
+        """
+        await self.cache.set_many({"a": b"1", "b": b"2"}, ttl=10)
+        await self.cache.delete_many(["a", "missing"])
+        self.assertEqual(await self.cache.get_many(["a", "b"]), {"b": b"2"})
+
+        await self.cache.clear()
+        self.assertEqual(len(self.cache), 0)
+
+
+class TestRedisCache(unittest.IsolatedAsyncioTestCase):
+    async def test_get_many_prefix(self) -> None:
+        """
+        Тест чтения нескольких ключей одним MGET с префиксом.
+        """
+        client = MagicMock()
+        client.mget = AsyncMock(return_value=[b"1", None])
+        cache = RedisCache(client, prefix="test:")
+
+        self.assertEqual(await cache.get_many(["a", "b"]), {"a": b"1"})
+        client.mget.assert_awaited_once_with(["test:a", "test:b"])
+
+    async def test_errors_are_misses(self) -> None:
+        """
+        Тест: недоступный Redis не прерывает запрос и считается промахом.
+        """
+        client = MagicMock()
+        client.mget = AsyncMock(side_effect=RedisConnectionError())
+        client.delete = AsyncMock(side_effect=RedisConnectionError())
+        cache = RedisCache(client, prefix="test:")
+        metrics.reset()
+
+        self.assertEqual(await cache.get_many(["a"]), {})
+        await cache.delete_many(["a"])
+        self.assertEqual(metrics.snapshot(), {"cache.redis_errors": 2})
+
+
+if __name__ == "__main__":
+    unittest.main()
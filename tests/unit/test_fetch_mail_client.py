@@ -1,10 +1,11 @@
 import unittest
+from email.mime.text import MIMEText
 from typing import AsyncGenerator
-from unittest.mock import patch, AsyncMock, MagicMock
+from unittest.mock import call, patch, AsyncMock, MagicMock
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.tasks.email_tasks import fetch_emails_task
 from app.api.schemas import TicketCreate
-from app.mail.client import EmailClient
+from app.mail.client import EmailClient, IncomingEmail, MailboxSync, message_set
 from app.services import ticket_service
 from app.tasks.email_tasks import send_email_task
 
@@ -25,24 +26,35 @@ class TestFetchEmailsTask(unittest.IsolatedAsyncioTestCase):
         """
         yield session
 
+    @patch("app.tasks.email_tasks.mail_service", new_callable=AsyncMock)
     @patch("app.tasks.email_tasks.email_client", new_callable=MagicMock)
     @patch("app.tasks.email_tasks.get_async_session", new_callable=MagicMock)
     @patch("app.tasks.email_tasks.ticket_service", new_callable=AsyncMock)
-    @patch("app.tasks.email_tasks.send_email_task.delay", new_callable=MagicMock)
+    @patch("app.tasks.email_tasks.send_emails_task.delay", new_callable=MagicMock)
     async def test_fetch_emails_task_with_new_emails(
         self,
         mock_send_email_task: MagicMock,
         mock_ticket_service: AsyncMock,
         mock_get_async_session: MagicMock,
         mock_email_client: MagicMock,
+        mock_mail_service: AsyncMock,
     ) -> None:
         """
         Тест успешного выполнения задачи с новыми письмами.
         """
-        mock_email_client.fetch_emails.return_value = [
-            ("test1@example.com", "Test Subject 1", "Test Body 1"),
-            ("test2@example.com", "Test Subject 2", "Test Body 2"),
-        ]
+        mock_mail_service.get_mailbox_checkpoint.return_value = None
+        mock_email_client.fetch_emails.return_value = MailboxSync(
+            7,
+            13,
+            [
+                IncomingEmail(
+                    "11", "test1@example.com", "Test Subject 1", "Test Body 1"
+                ),
+                IncomingEmail(
+                    "12", "test2@example.com", "Test Subject 2", "Test Body 2"
+                ),
+            ],
+        )
 
         mock_get_async_session.return_value = self.mock_async_generator(
             self.mock_session
@@ -50,7 +62,11 @@ class TestFetchEmailsTask(unittest.IsolatedAsyncioTestCase):
 
         await fetch_emails_task()
 
-        mock_email_client.fetch_emails.assert_called_once()
+        mock_email_client.fetch_emails.assert_called_once_with()
+        mock_email_client.mark_seen.assert_called_once_with(["11", "12"])
+        mock_mail_service.save_mailbox_checkpoint.assert_called_once_with(
+            self.mock_session, mock_email_client.mailbox, 7, 13
+        )
 
         self.assertEqual(mock_ticket_service.create_ticket.call_count, 2)
         mock_ticket_service.create_ticket.assert_any_call(
@@ -62,42 +78,346 @@ class TestFetchEmailsTask(unittest.IsolatedAsyncioTestCase):
             TicketCreate(subject="Test Subject 2", description="Test Body 2"),
         )
 
-        self.assertEqual(mock_send_email_task.call_count, 2)
-        mock_send_email_task.assert_any_call(
-            "test1@example.com",
-            "Re: Test Subject 1",
-            "Ваше обращение принято и будет обработано в ближайшее время",
-        )
-        mock_send_email_task.assert_any_call(
-            "test2@example.com",
-            "Re: Test Subject 2",
-            "Ваше обращение принято и будет обработано в ближайшее время",
+        mock_send_email_task.assert_called_once_with(
+            [
+                (
+                    "test1@example.com",
+                    "Re: Test Subject 1",
+                    "Ваше обращение принято и будет обработано в ближайшее время",
+                ),
+                (
+                    "test2@example.com",
+                    "Re: Test Subject 2",
+                    "Ваше обращение принято и будет обработано в ближайшее время",
+                ),
+            ]
         )
 
+    @patch("app.tasks.email_tasks.mail_service", new_callable=AsyncMock)
     @patch("app.tasks.email_tasks.email_client", new_callable=MagicMock)  # Используем MagicMock
     @patch("app.tasks.email_tasks.get_async_session", new_callable=MagicMock)
     @patch("app.tasks.email_tasks.ticket_service", new_callable=AsyncMock)
-    @patch("app.tasks.email_tasks.send_email_task.delay", new_callable=MagicMock)
+    @patch("app.tasks.email_tasks.send_emails_task.delay", new_callable=MagicMock)
     async def test_fetch_emails_task_with_no_new_emails(
             self,
             mock_send_email_task: MagicMock,
             mock_ticket_service: AsyncMock,
             mock_get_async_session: MagicMock,
             mock_email_client: MagicMock,
+            mock_mail_service: AsyncMock,
     ) -> None:
         """
         Тест выполнения задачи без новых писем.
         """
-        mock_email_client.fetch_emails.return_value = []
+        mock_mail_service.get_mailbox_checkpoint.return_value = MagicMock(
+            uidvalidity=7, last_uid=13
+        )
+        mock_email_client.fetch_emails.return_value = MailboxSync(7, 13, [])
         mock_get_async_session.return_value = self.mock_async_generator(
             self.mock_session
         )
 
         await fetch_emails_task()
 
-        mock_email_client.fetch_emails.assert_called_once()
+        mock_email_client.fetch_emails.assert_called_once_with(7, 13)
         mock_ticket_service.create_ticket.assert_not_called()
         mock_send_email_task.assert_not_called()
+        mock_mail_service.save_mailbox_checkpoint.assert_not_called()
+
+    @patch("app.tasks.email_tasks.mail_service", new_callable=AsyncMock)
+    @patch("app.tasks.email_tasks.email_client", new_callable=MagicMock)
+    @patch("app.tasks.email_tasks.get_async_session", new_callable=MagicMock)
+    @patch("app.tasks.email_tasks.ticket_service", new_callable=AsyncMock)
+    @patch("app.tasks.email_tasks.send_emails_task.delay", new_callable=MagicMock)
+    async def test_fetch_emails_task_marks_only_saved(
+        self,
+        mock_send_email_task: MagicMock,
+        mock_ticket_service: AsyncMock,
+        mock_get_async_session: MagicMock,
+        mock_email_client: MagicMock,
+        mock_mail_service: AsyncMock,
+    ) -> None:
+        """
+        Тест ошибки сохранения: прочитанными помечаются только сохраненные
+        письма, позиция останавливается перед письмом с ошибкой.
+        """
+        mock_mail_service.get_mailbox_checkpoint.return_value = MagicMock(
+            uidvalidity=7, last_uid=10
+        )
+        mock_email_client.fetch_emails.return_value = MailboxSync(
+            7,
+            13,
+            [
+                IncomingEmail(
+                    "11", "test1@example.com", "Test Subject 1", "Test Body 1"
+                ),
+                IncomingEmail(
+                    "12", "test2@example.com", "Test Subject 2", "Test Body 2"
+                ),
+            ],
+        )
+        mock_get_async_session.return_value = self.mock_async_generator(
+            self.mock_session
+        )
+        mock_ticket_service.create_ticket.side_effect = [None, RuntimeError("DB")]
+
+        with self.assertRaises(RuntimeError):
+            await fetch_emails_task()
+
+        mock_email_client.mark_seen.assert_called_once_with(["11"])
+        mock_send_email_task.assert_called_once()
+        self.mock_session.rollback.assert_awaited_once()
+        mock_mail_service.save_mailbox_checkpoint.assert_called_once_with(
+            self.mock_session, mock_email_client.mailbox, 7, 11
+        )
+
+    @patch("app.tasks.email_tasks.mail_service", new_callable=AsyncMock)
+    @patch("app.tasks.email_tasks.email_client", new_callable=MagicMock)
+    @patch("app.tasks.email_tasks.get_async_session", new_callable=MagicMock)
+    @patch("app.tasks.email_tasks.ticket_service", new_callable=AsyncMock)
+    @patch("app.tasks.email_tasks.send_emails_task.delay", new_callable=MagicMock)
+    async def test_fetch_emails_task_unseen_error_keeps_checkpoint(
+        self,
+        mock_send_email_task: MagicMock,
+        mock_ticket_service: AsyncMock,
+        mock_get_async_session: MagicMock,
+        mock_email_client: MagicMock,
+        mock_mail_service: AsyncMock,
+    ) -> None:
+        """
+        Тест ошибки сохранения после выборки по UNSEEN (смена UIDVALIDITY):
+        позиция внутри выборки не сохраняется, иначе следующий опрос по UID
+        вернул бы прочитанные письма.
+        """
+        mock_mail_service.get_mailbox_checkpoint.return_value = MagicMock(
+            uidvalidity=6, last_uid=20
+        )
+        mock_email_client.fetch_emails.return_value = MailboxSync(
+            7,
+            13,
+            [
+                IncomingEmail(
+                    "11", "test1@example.com", "Test Subject 1", "Test Body 1"
+                ),
+                IncomingEmail(
+                    "12", "test2@example.com", "Test Subject 2", "Test Body 2"
+                ),
+            ],
+        )
+        mock_get_async_session.return_value = self.mock_async_generator(
+            self.mock_session
+        )
+        mock_ticket_service.create_ticket.side_effect = [None, RuntimeError("DB")]
+
+        with self.assertRaises(RuntimeError):
+            await fetch_emails_task()
+
+        mock_email_client.mark_seen.assert_called_once_with(["11"])
+        self.mock_session.rollback.assert_awaited_once()
+        mock_mail_service.save_mailbox_checkpoint.assert_not_called()
+
+    @patch("app.tasks.email_tasks.mail_service", new_callable=AsyncMock)
+    @patch("app.tasks.email_tasks.email_client", new_callable=MagicMock)
+    @patch("app.tasks.email_tasks.get_async_session", new_callable=MagicMock)
+    @patch("app.tasks.email_tasks.ticket_service", new_callable=AsyncMock)
+    @patch("app.tasks.email_tasks.send_emails_task.delay", new_callable=MagicMock)
+    async def test_fetch_emails_task_skips_invalid(
+        self,
+        mock_send_email_task: MagicMock,
+        mock_ticket_service: AsyncMock,
+        mock_get_async_session: MagicMock,
+        mock_email_client: MagicMock,
+        mock_mail_service: AsyncMock,
+    ) -> None:
+        """
+        Тест письма без текста: оно пропускается, позиция проходит дальше.
+        """
+        mock_mail_service.get_mailbox_checkpoint.return_value = MagicMock(
+            uidvalidity=7, last_uid=10
+        )
+        mock_email_client.fetch_emails.return_value = MailboxSync(
+            7,
+            13,
+            [
+                IncomingEmail("11", "test1@example.com", "Вложение", ""),
+                IncomingEmail(
+                    "12", "test2@example.com", "Test Subject 2", "Test Body 2"
+                ),
+            ],
+        )
+        mock_get_async_session.return_value = self.mock_async_generator(
+            self.mock_session
+        )
+
+        async def create_ticket(
+            session: AsyncSession, ticket_data: TicketCreate
+        ) -> None:
+            if not ticket_data.description:
+                # Проверка данных до обращения к базе
+                await ticket_service.create_ticket(session, ticket_data)
+
+        mock_ticket_service.create_ticket.side_effect = create_ticket
+
+        await fetch_emails_task()
+
+        self.assertEqual(mock_ticket_service.create_ticket.await_count, 2)
+        mock_email_client.mark_seen.assert_called_once_with(["11", "12"])
+        mock_send_email_task.assert_called_once_with(
+            [
+                (
+                    "test2@example.com",
+                    "Re: Test Subject 2",
+                    "Ваше обращение принято и будет обработано в ближайшее время",
+                )
+            ]
+        )
+        self.mock_session.rollback.assert_not_awaited()
+        mock_mail_service.save_mailbox_checkpoint.assert_called_once_with(
+            self.mock_session, mock_email_client.mailbox, 7, 13
+        )
+
+
+class TestFetchEmailsClient(unittest.TestCase):
+    def setUp(self) -> None:
+        """
+        Настройка тестового окружения.
+        """
+        self.email_client = EmailClient()
+
+    def mock_mailbox(
+        self, mock_imap_ssl: MagicMock, uidvalidity: bytes, uidnext: bytes
+    ) -> MagicMock:
+        mock_mail = mock_imap_ssl.return_value.__enter__.return_value
+        responses = {"UIDVALIDITY": [uidvalidity], "UIDNEXT": [uidnext]}
+        mock_mail.response.side_effect = lambda code: (code, responses[code])
+        return mock_mail
+
+    def raw_email(self, number: int) -> bytes:
+        msg = MIMEText(f"Body {number}", "plain")
+        msg["From"] = f"User <user{number}@example.com>"
+        msg["Subject"] = f"Subject {number}"
+        return msg.as_bytes()
+
+    @patch("app.mail.client.settings.imap_fetch_chunk_size", 2)
+    @patch("imaplib.IMAP4_SSL")
+    def test_fetch_emails_chunked(self, mock_imap_ssl: MagicMock) -> None:
+        """
+        Тест получения писем пачками UID FETCH без пометки прочитанными.
+        """
+        mock_mail = self.mock_mailbox(mock_imap_ssl, uidvalidity=b"7", uidnext=b"6")
+
+        def uid(command: str, *args: str) -> tuple:
+            if command == "SEARCH":
+                return "OK", [b"1 2 3 4 5"]
+            first, _, last = args[0].partition(":")
+            data: list = []
+            for n in range(int(first), int(last or first) + 1):
+                header = f"{n} (UID {n} BODY[] {{100}}".encode()
+                if n == 5:
+                    # UID после литерала
+                    data += [(b"5 (BODY[] {100}", self.raw_email(n)), b" UID 5)"]
+                else:
+                    data += [(header, self.raw_email(n)), b")"]
+            return "OK", data
+
+        mock_mail.uid.side_effect = uid
+
+        sync = self.email_client.fetch_emails()
+
+        self.assertEqual(sync.uidvalidity, 7)
+        self.assertEqual(sync.last_uid, 5)
+        self.assertEqual(
+            sync.emails,
+            [
+                IncomingEmail(
+                    str(n), f"user{n}@example.com", f"Subject {n}", f"Body {n}"
+                )
+                for n in range(1, 6)
+            ],
+        )
+        self.assertEqual(
+            mock_mail.uid.call_args_list,
+            [
+                call("SEARCH", "UNSEEN"),
+                call("FETCH", "1:2", "(BODY.PEEK[])"),
+                call("FETCH", "3:4", "(BODY.PEEK[])"),
+                call("FETCH", "5", "(BODY.PEEK[])"),
+            ],
+        )
+        mock_mail.store.assert_not_called()
+
+    @patch("imaplib.IMAP4_SSL")
+    def test_fetch_emails_incremental(self, mock_imap_ssl: MagicMock) -> None:
+        """
+        Тест опроса с позиции: запрашиваются только UID больше последнего.
+        """
+        mock_mail = self.mock_mailbox(mock_imap_ssl, uidvalidity=b"7", uidnext=b"21")
+        mock_mail.uid.side_effect = [
+            ("OK", [b"12 15"]),
+            ("OK", [(b"1 (UID 15 BODY[] {100}", self.raw_email(15)), b")"]),
+        ]
+
+        sync = self.email_client.fetch_emails(7, 12)
+
+        self.assertEqual(sync.last_uid, 20)
+        self.assertEqual([incoming.uid for incoming in sync.emails], ["15"])
+        self.assertEqual(
+            mock_mail.uid.call_args_list,
+            [call("SEARCH", "UID", "13:*"), call("FETCH", "15", "(BODY.PEEK[])")],
+        )
+
+    @patch("imaplib.IMAP4_SSL")
+    def test_fetch_emails_nothing_new(self, mock_imap_ssl: MagicMock) -> None:
+        """
+        Тест опроса без новых писем: по UIDNEXT, без SEARCH и FETCH.
+        """
+        mock_mail = self.mock_mailbox(mock_imap_ssl, uidvalidity=b"7", uidnext=b"13")
+
+        self.assertEqual(self.email_client.fetch_emails(7, 12), MailboxSync(7, 12, []))
+        mock_mail.uid.assert_not_called()
+
+    @patch("imaplib.IMAP4_SSL")
+    def test_fetch_emails_uidvalidity_changed(self, mock_imap_ssl: MagicMock) -> None:
+        """
+        Тест смены UIDVALIDITY: позиция сбрасывается, берутся непрочитанные.
+        """
+        mock_mail = self.mock_mailbox(mock_imap_ssl, uidvalidity=b"8", uidnext=b"3")
+        mock_mail.uid.return_value = ("OK", [b""])
+
+        self.assertEqual(self.email_client.fetch_emails(7, 12), MailboxSync(8, 2, []))
+        mock_mail.uid.assert_called_once_with("SEARCH", "UNSEEN")
+
+    @patch("imaplib.IMAP4_SSL")
+    def test_fetch_emails_error_keeps_position(self, mock_imap_ssl: MagicMock) -> None:
+        """
+        Тест ошибки IMAP после смены UIDVALIDITY: возвращается переданная
+        позиция, новый UIDVALIDITY с нулевым UID не принимается.
+        """
+        mock_mail = self.mock_mailbox(mock_imap_ssl, uidvalidity=b"8", uidnext=b"5001")
+        mock_mail.uid.side_effect = OSError("connection reset")
+
+        self.assertEqual(self.email_client.fetch_emails(7, 12), MailboxSync(7, 12, []))
+        self.assertEqual(self.email_client.fetch_emails(), MailboxSync(None, 0, []))
+
+    @patch("imaplib.IMAP4_SSL")
+    def test_mark_seen_single_store(self, mock_imap_ssl: MagicMock) -> None:
+        """
+        Тест пометки прочитанными одной командой UID STORE.
+        """
+        mock_mail = mock_imap_ssl.return_value.__enter__.return_value
+
+        self.email_client.mark_seen(["3", "1", "2", "7", "9", "10"])
+
+        mock_mail.uid.assert_called_once_with(
+            "STORE", "1:3,7,9:10", "+FLAGS.SILENT", r"(\Seen)"
+        )
+
+    def test_message_set(self) -> None:
+        """
+        Тест сжатия номеров в диапазоны.
+        """
+        self.assertEqual(message_set([b"5"]), "5")
+        self.assertEqual(message_set(["1", "2", "4", "5", "6", "8"]), "1:2,4:6,8")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,39 @@
+import unittest
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from app.database.models import Base
+from app.services.mail_service import get_mailbox_checkpoint, save_mailbox_checkpoint
+
+
+class TestMailboxCheckpoint(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        """
+        Создает in-memory SQLite базу.
+        """
+        self.engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+        async with self.engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        self.session = async_sessionmaker(self.engine, expire_on_commit=False)()
+
+    async def asyncTearDown(self) -> None:
+        await self.session.close()
+        await self.engine.dispose()
+
+    async def test_save_and_update(self) -> None:
+        """
+        Тест сохранения и обновления позиции ящика.
+        """
+        mailbox = "imap://user@imap.example.com/INBOX"
+        self.assertIsNone(await get_mailbox_checkpoint(self.session, mailbox))
+
+        await save_mailbox_checkpoint(self.session, mailbox, 7, 12)
+        await save_mailbox_checkpoint(self.session, mailbox, 7, 20)
+        await save_mailbox_checkpoint(self.session, "imap://other/INBOX", 1, 5)
+        self.session.expire_all()
+
+        checkpoint = await get_mailbox_checkpoint(self.session, mailbox)
+        assert checkpoint is not None
+        self.assertEqual((checkpoint.uidvalidity, checkpoint.last_uid), (7, 20))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,94 @@
+import asyncio
+import time
+import unittest
+from unittest.mock import patch
+
+from app.core.security import PasswordHasher
+
+
+class TestPasswordHasher(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        """
+        Настройка тестового окружения.
+        """
+        self.hasher = PasswordHasher(rounds=4, workers=2)
+
+    async def asyncTearDown(self) -> None:
+        self.hasher.shutdown()
+
+    async def test_hash_and_verify(self) -> None:
+        """
+        Тест хэширования и проверки пароля в пуле потоков.
+        """
+        hashed = await self.hasher.hash("password123")
+
+        self.assertTrue(hashed.startswith("$2b$04$"))
+        self.assertEqual(await self.hasher.verify("password123", hashed), (True, None))
+        self.assertEqual(await self.hasher.verify("wrong", hashed), (False, None))
+
+    async def test_rehash_on_cost_change(self) -> None:
+        """
+        Тест перехэширования при изменении стоимости bcrypt.
+        """
+        hashed = await self.hasher.hash("password123")
+        new_hasher = PasswordHasher(rounds=5, workers=0)
+
+        verified, new_hash = await new_hasher.verify("password123", hashed)
+
+        self.assertTrue(verified)
+        self.assertTrue(new_hash.startswith("$2b$05$"))
+
+    async def test_hash_does_not_block_event_loop(self) -> None:
+        """
+        Тест того, что цикл событий продолжает работу во время хэширования.
+        """
+        hasher = PasswordHasher(rounds=10, workers=1)
+        ticks = 0
+
+        async def ticker() -> None:
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.001)
+
+        task = asyncio.create_task(ticker())
+        await hasher.hash("password123")
+        task.cancel()
+        hasher.shutdown()
+
+        self.assertGreater(ticks, 5)
+
+    async def test_hash_many_interleaves_with_hash(self) -> None:
+        """
+        Тест того, что одиночный хэш не ждет всех паролей массовой операции.
+        """
+        hasher = PasswordHasher(rounds=4, workers=1)
+        finished = []
+
+        def slow_hash(password: str, rounds: int) -> str:
+            time.sleep(0.02)
+            finished.append(password)
+            return password
+
+        with patch("app.core.security.hash_password", slow_hash):
+            bulk = asyncio.create_task(
+                hasher.hash_many([f"bulk-{i}" for i in range(10)])
+            )
+            await asyncio.sleep(0.005)
+            await hasher.hash("login")
+            hashed = await bulk
+        hasher.shutdown()
+
+        self.assertEqual(hashed, [f"bulk-{i}" for i in range(10)])
+        self.assertLess(finished.index("login"), 3)
+
+    async def test_unknown_executor(self) -> None:
+        """
+        Тест ошибки при неизвестном типе пула.
+        """
+        with self.assertRaises(ValueError):
+            PasswordHasher(rounds=4, workers=1, executor="fiber")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,147 @@
+import smtplib
+import unittest
+from unittest.mock import patch, MagicMock
+from app.tasks.email_tasks import EmailBatcher, send_email_task, send_emails_task
+
+
+class TestSendEmailsTask(unittest.TestCase):
+    @patch("app.tasks.email_tasks.send_email_task.apply_async", new_callable=MagicMock)
+    @patch("app.tasks.email_tasks.email_client", new_callable=MagicMock)
+    def test_send_emails_task_reports_failures(
+        self, mock_email_client: MagicMock, mock_apply_async: MagicMock
+    ) -> None:
+        """
+        Тест отчета по получателям и повтора только временных ошибок.
+        """
+        mock_email_client.send_emails.return_value = [
+            None,
+            smtplib.SMTPRecipientsRefused({"bad@example.com": (550, b"No")}),
+            smtplib.SMTPServerDisconnected("Connection closed"),
+        ]
+
+        report = send_emails_task(
+            [
+                ["one@example.com", "Subject", "Message"],
+                ["bad@example.com", "Subject", "Message"],
+                ["two@example.com", "Subject", "Message"],
+            ]
+        )
+
+        self.assertEqual(report["sent"], 1)
+        self.assertEqual(
+            [(item["to_email"], item["retried"]) for item in report["failed"]],
+            [("bad@example.com", False), ("two@example.com", True)],
+        )
+        mock_apply_async.assert_called_once()
+        self.assertEqual(
+            mock_apply_async.call_args.args[0],
+            ("two@example.com", "Subject", "Message"),
+        )
+
+
+class TestSendEmailTask(unittest.TestCase):
+    @patch("app.tasks.email_tasks.email_client", new_callable=MagicMock)
+    def test_transient_error_retried(self, mock_email_client: MagicMock) -> None:
+        """
+        Тест повтора временной ошибки до max_retries, затем задача с ошибкой.
+        """
+        mock_email_client.send_email.side_effect = smtplib.SMTPServerDisconnected(
+            "Connection closed"
+        )
+
+        result = send_email_task.apply(("two@example.com", "Subject", "Message"))
+
+        self.assertTrue(result.failed())
+        self.assertIsInstance(result.result, smtplib.SMTPServerDisconnected)
+        self.assertEqual(
+            mock_email_client.send_email.call_count, send_email_task.max_retries + 1
+        )
+        mock_email_client.send_email.assert_called_with(
+            "two@example.com", "Subject", "Message", raise_errors=True
+        )
+
+    @patch("app.tasks.email_tasks.email_client", new_callable=MagicMock)
+    def test_success_after_retry(self, mock_email_client: MagicMock) -> None:
+        """
+        Тест отправки со второй попытки.
+        """
+        mock_email_client.send_email.side_effect = [
+            smtplib.SMTPServerDisconnected("Connection closed"),
+            None,
+        ]
+
+        result = send_email_task.apply(("two@example.com", "Subject", "Message"))
+
+        self.assertTrue(result.successful())
+        self.assertEqual(mock_email_client.send_email.call_count, 2)
+
+    @patch("app.tasks.email_tasks.email_client", new_callable=MagicMock)
+    def test_permanent_error_not_retried(self, mock_email_client: MagicMock) -> None:
+        """
+        Тест отказа сервера 5xx: без повторов.
+        """
+        mock_email_client.send_email.side_effect = smtplib.SMTPRecipientsRefused(
+            {"bad@example.com": (550, b"No")}
+        )
+
+        result = send_email_task.apply(("bad@example.com", "Subject", "Message"))
+
+        self.assertTrue(result.successful())
+        mock_email_client.send_email.assert_called_once()
+
+
+class TestEmailBatcher(unittest.TestCase):
+    @patch("app.tasks.email_tasks.send_emails_task.delay", new_callable=MagicMock)
+    def test_flush_on_max_size(self, mock_delay: MagicMock) -> None:
+        """
+        Тест отправки пачки при достижении max_size.
+        """
+        batcher = EmailBatcher(window=60, max_size=2)
+
+        batcher.add("one@example.com", "Subject", "Message")
+        mock_delay.assert_not_called()
+        batcher.add("two@example.com", "Subject", "Message")
+
+        mock_delay.assert_called_once_with(
+            [
+                ("one@example.com", "Subject", "Message"),
+                ("two@example.com", "Subject", "Message"),
+            ]
+        )
+        batcher.flush()
+        mock_delay.assert_called_once()
+
+    @patch("app.tasks.email_tasks.send_emails_task.delay", new_callable=MagicMock)
+    def test_flush_after_window(self, mock_delay: MagicMock) -> None:
+        """
+        Тест отправки накопленных писем по окончании окна.
+        """
+        batcher = EmailBatcher(window=0.01, max_size=100)
+
+        batcher.add("one@example.com", "Subject", "Message")
+        batcher.add("two@example.com", "Subject", "Message")
+        timer = batcher._timer
+        assert timer is not None
+        timer.join(1)
+
+        mock_delay.assert_called_once_with(
+            [
+                ("one@example.com", "Subject", "Message"),
+                ("two@example.com", "Subject", "Message"),
+            ]
+        )
+
+    @patch("app.tasks.email_tasks.send_emails_task.delay", new_callable=MagicMock)
+    def test_without_window(self, mock_delay: MagicMock) -> None:
+        """
+        Тест window = 0: каждое письмо отправляется сразу.
+        """
+        batcher = EmailBatcher(window=0, max_size=100)
+
+        batcher.add("one@example.com", "Subject", "Message")
+
+        mock_delay.assert_called_once_with([("one@example.com", "Subject", "Message")])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -18,8 +18,7 @@ class TestEmailClient(unittest.TestCase):
         """
         Тест успешной отправки письма.
         """
-        mock_server = MagicMock()
-        mock_smtp_ssl.return_value.__enter__.return_value = mock_server
+        mock_server = mock_smtp_ssl.return_value
 
         self.email_client.send_email("test@example.com", "Test Subject", "Test Message")
 
@@ -45,6 +44,185 @@ class TestEmailClient(unittest.TestCase):
             self.settings.smtp_host, self.settings.smtp_port, timeout=30
         )
 
+        with self.assertRaises(smtplib.SMTPException):
+            self.email_client.send_email(
+                "test@example.com", "Test Subject", "Test Message", raise_errors=True
+            )
+
+    @patch("smtplib.SMTP_SSL")
+    def test_send_email_reuses_connection(self, mock_smtp_ssl: MagicMock) -> None:
+        """
+        Тест отправки нескольких писем через одно соединение пула.
+        """
+        mock_server = mock_smtp_ssl.return_value
+
+        for _ in range(3):
+            self.email_client.send_email("test@example.com", "Subject", "Message")
+
+        mock_smtp_ssl.assert_called_once()
+        mock_server.login.assert_called_once()
+        self.assertEqual(mock_server.send_message.call_count, 3)
+        mock_server.quit.assert_not_called()
+
+        self.email_client.close()
+        mock_server.quit.assert_called_once()
+        self.assertEqual(len(self.email_client.smtp_pool), 0)
+
+    @patch("smtplib.SMTP_SSL")
+    def test_send_email_recycles_connection(self, mock_smtp_ssl: MagicMock) -> None:
+        """
+        Тест закрытия соединения после max_messages писем и по возрасту.
+        """
+        first, second, third = MagicMock(), MagicMock(), MagicMock()
+        mock_smtp_ssl.side_effect = [first, second, third]
+        pool = self.email_client.smtp_pool
+        pool.max_messages = 2
+
+        for _ in range(3):
+            self.email_client.send_email("test@example.com", "Subject", "Message")
+
+        self.assertEqual(first.send_message.call_count, 2)
+        first.quit.assert_called_once()
+        self.assertEqual(second.send_message.call_count, 1)
+
+        pool.max_age = 0
+        self.email_client.send_email("test@example.com", "Subject", "Message")
+        second.quit.assert_called_once()
+        third.send_message.assert_called_once()
+
+    @patch("smtplib.SMTP_SSL")
+    def test_send_email_reconnects_after_failed_noop(
+        self, mock_smtp_ssl: MagicMock
+    ) -> None:
+        """
+        Тест проверки простаивающего соединения NOOP и переподключения.
+        """
+        stale, fresh = MagicMock(), MagicMock()
+        mock_smtp_ssl.side_effect = [stale, fresh]
+        stale.noop.side_effect = smtplib.SMTPServerDisconnected("Connection closed")
+        self.email_client.smtp_pool.check_after = 0
+
+        self.email_client.send_email("test@example.com", "Subject", "Message")
+        self.email_client.send_email("test@example.com", "Subject", "Message")
+
+        stale.noop.assert_called_once()
+        stale.quit.assert_called_once()
+        self.assertEqual(stale.send_message.call_count, 1)
+        fresh.send_message.assert_called_once()
+
+    @patch("smtplib.SMTP_SSL")
+    def test_send_email_retries_on_disconnect(self, mock_smtp_ssl: MagicMock) -> None:
+        """
+        Тест повтора письма через новое соединение, если старое закрыто сервером.
+        """
+        stale, fresh = MagicMock(), MagicMock()
+        mock_smtp_ssl.side_effect = [stale, fresh]
+        stale.send_message.side_effect = [
+            None,
+            smtplib.SMTPServerDisconnected("Connection closed"),
+        ]
+
+        self.email_client.send_email("test@example.com", "Subject", "Message")
+        self.email_client.send_email("test@example.com", "Subject", "Message")
+
+        self.assertEqual(stale.send_message.call_count, 2)
+        fresh.send_message.assert_called_once()
+        self.assertEqual(len(self.email_client.smtp_pool), 1)
+
+    @patch("smtplib.SMTP_SSL")
+    def test_send_email_keeps_connection_on_refused(
+        self, mock_smtp_ssl: MagicMock
+    ) -> None:
+        """
+        Тест: отказ в получателе не закрывает соединение.
+        """
+        mock_server = mock_smtp_ssl.return_value
+        mock_server.send_message.side_effect = [
+            smtplib.SMTPRecipientsRefused({"bad@example.com": (550, b"No such user")}),
+            None,
+        ]
+
+        self.email_client.send_email("bad@example.com", "Subject", "Message")
+        self.email_client.send_email("test@example.com", "Subject", "Message")
+
+        mock_smtp_ssl.assert_called_once()
+        mock_server.quit.assert_not_called()
+
+    @patch("smtplib.SMTP_SSL")
+    def test_send_email_without_pool(self, mock_smtp_ssl: MagicMock) -> None:
+        """
+        Тест отключенного пула: соединение закрывается после каждого письма.
+        """
+        self.email_client.smtp_pool.size = 0
+
+        self.email_client.send_email("test@example.com", "Subject", "Message")
+        self.email_client.send_email("test@example.com", "Subject", "Message")
+
+        self.assertEqual(mock_smtp_ssl.call_count, 2)
+        self.assertEqual(mock_smtp_ssl.return_value.quit.call_count, 2)
+
+    @patch("smtplib.SMTP_SSL")
+    def test_send_emails_one_connection(self, mock_smtp_ssl: MagicMock) -> None:
+        """
+        Тест пачки писем: одно соединение, ошибки по каждому получателю.
+        """
+        first, second = MagicMock(), MagicMock()
+        mock_smtp_ssl.side_effect = [first, second]
+        refused = smtplib.SMTPRecipientsRefused({"bad@example.com": (550, b"No")})
+        first.send_message.side_effect = [None, refused, None]
+        self.email_client.smtp_pool.max_messages = 2
+
+        errors = self.email_client.send_emails(
+            [
+                ("one@example.com", "Subject", "Message"),
+                ("bad@example.com", "Subject", "Message"),
+                ("two@example.com", "Subject", "Message"),
+                ("three@example.com", "Subject", "Message"),
+            ]
+        )
+
+        self.assertEqual(errors, [None, refused, None, None])
+        first.login.assert_called_once()
+        self.assertEqual(first.send_message.call_count, 3)
+        first.quit.assert_called_once()
+        second.send_message.assert_called_once()
+        self.assertEqual(len(self.email_client.smtp_pool), 1)
+
+    @patch("smtplib.SMTP_SSL")
+    def test_send_emails_connect_failure(self, mock_smtp_ssl: MagicMock) -> None:
+        """
+        Тест пачки без соединения: ошибка возвращается для всех писем.
+        """
+        error = OSError("Connection refused")
+        mock_smtp_ssl.side_effect = error
+
+        errors = self.email_client.send_emails(
+            [("one@example.com", "Subject", "Message")] * 3
+        )
+
+        self.assertEqual(errors, [error] * 3)
+        mock_smtp_ssl.assert_called_once()
+
+    @patch("os.getpid")
+    @patch("smtplib.SMTP_SSL")
+    def test_send_email_after_fork(
+        self, mock_smtp_ssl: MagicMock, mock_getpid: MagicMock
+    ) -> None:
+        """
+        Тест: дочерний процесс не использует соединения родителя.
+        """
+        parent, child = MagicMock(), MagicMock()
+        mock_smtp_ssl.side_effect = [parent, child]
+        mock_getpid.return_value = 100
+        self.email_client.smtp_pool._pid = 100
+        self.email_client.send_email("test@example.com", "Subject", "Message")
+
+        mock_getpid.return_value = 101
+        self.email_client.send_email("test@example.com", "Subject", "Message")
+
+        parent.quit.assert_not_called()
+        child.send_message.assert_called_once()
+
 
 if __name__ == "__main__":
     unittest.main()
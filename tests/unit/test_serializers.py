@@ -0,0 +1,115 @@
+import unittest
+from datetime import datetime
+
+from app.api.schemas import Ticket as TicketSchema, User as UserSchema
+from app.database.models import Ticket, User
+from app.database.serializers import ModelSerializer
+from app.database.tools import map_db_model_to_dict
+
+
+class TestModelSerializer(unittest.TestCase):
+    def setUp(self) -> None:
+        """
+        Настройка тестового окружения.
+        """
+        now = datetime.utcnow()
+        self.user = User(
+            id=1,
+            email="test@example.com",
+            username="testuser",
+            is_active=True,
+            hashed_password="hashed",
+            created_at=now,
+            updated_at=now,
+        )
+        self.ticket = Ticket(
+            id=1,
+            subject="Test Subject",
+            description="Test Description",
+            status="open",
+            created_at=now,
+            updated_at=now,
+            version=1,
+            creator_id=1,
+            operator_id=None,
+        )
+
+    def test_plan(self) -> None:
+        """
+        Тест вычисления плана колонок и связей по схеме.
+        """
+        serializer = ModelSerializer(Ticket, TicketSchema)
+
+        self.assertNotIn("creator_id", serializer.columns)
+        self.assertIn("subject", serializer.columns)
+        self.assertEqual(
+            dict(serializer.relationships),
+            {"creator": "creator_id", "operator": "operator_id"},
+        )
+
+    def test_serialize_matches_map_db_model_to_dict(self) -> None:
+        """
+        Тест совпадения результата с прежним map_db_model_to_dict.
+        """
+        user_serializer = ModelSerializer(User, UserSchema)
+        ticket_serializer = ModelSerializer(Ticket, TicketSchema)
+        user = user_serializer.serialize(self.user)
+
+        expected_dict = map_db_model_to_dict(self.ticket)
+        expected_dict["creator"] = user
+        expected = TicketSchema.model_validate(expected_dict)
+
+        self.assertEqual(
+            user, UserSchema.model_validate(map_db_model_to_dict(self.user))
+        )
+        self.assertEqual(ticket_serializer.serialize(self.ticket, {1: user}), expected)
+        self.assertEqual(
+            ticket_serializer.serialize_many([self.ticket], {1: user}), [expected]
+        )
+        self.assertEqual(user_serializer.serialize_many([self.user]), [user])
+
+    def test_fieldset(self) -> None:
+        """
+        Тест разбора выборки полей и колонок, читаемых из базы.
+        """
+        serializer = ModelSerializer(Ticket, TicketSchema)
+
+        fieldset = serializer.fieldset(["subject", "status"], ["operator"])
+
+        self.assertEqual(fieldset.columns, ("id", "subject", "status"))
+        self.assertEqual(fieldset.relationships, (("operator", "operator_id"),))
+        self.assertEqual(
+            fieldset.load_columns, ("id", "subject", "status", "operator_id")
+        )
+        self.assertEqual(serializer.fieldset().columns, serializer.columns)
+        with self.assertRaises(ValueError) as context:
+            serializer.fieldset(["subject", "hashed_password"], ["messages"])
+        self.assertEqual(
+            str(context.exception), "Неизвестные поля: hashed_password, messages"
+        )
+
+    def test_serialize_fields(self) -> None:
+        """
+        Тест сериализации только выбранных полей.
+        """
+        serializer = ModelSerializer(Ticket, TicketSchema)
+        user = ModelSerializer(User, UserSchema).serialize(self.user)
+
+        self.assertEqual(
+            serializer.serialize_fields(
+                [self.ticket], serializer.fieldset(["subject", "creator_id"])
+            ),
+            [{"id": 1, "subject": "Test Subject", "creator_id": 1}],
+        )
+        self.assertEqual(
+            serializer.serialize_fields(
+                [self.ticket],
+                serializer.fieldset(["status"], ["creator", "operator"]),
+                {1: user},
+            ),
+            [{"id": 1, "status": "open", "creator": user, "operator": None}],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,97 @@
+import asyncio
+import unittest
+
+from app.core.metrics import metrics
+from app.core.singleflight import SingleFlight
+
+
+class TestSingleFlight(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        """
+        Настройка тестового окружения.
+        """
+        metrics.reset()
+        self.flight = SingleFlight("flight")
+        self.calls = 0
+        self.release = asyncio.Event()
+
+    async def compute(self) -> bytes:
+        self.calls += 1
+        await self.release.wait()
+        return b"result"
+
+    async def test_coalesce_identical(self) -> None:
+        """
+        Тест одного вычисления на одинаковые одновременные вызовы.
+        """
+        same = [
+            asyncio.create_task(self.flight.run("tickets", ("open", 50), self.compute))
+            for _ in range(3)
+        ]
+        other = asyncio.create_task(
+            self.flight.run("tickets", ("closed", 50), self.compute)
+        )
+        await asyncio.sleep(0)
+        self.release.set()
+
+        self.assertEqual(await asyncio.gather(*same, other), [b"result"] * 4)
+        self.assertEqual(self.calls, 2)
+        self.assertEqual(len(self.flight), 0)
+        self.assertEqual(
+            metrics.snapshot(),
+            {
+                "flight.coalesced": 2,
+                "flight.coalesced.tickets": 2,
+                "flight.executed": 2,
+            },
+        )
+
+        # Завершенное вычисление не переиспользуется
+        await self.flight.run("tickets", ("open", 50), self.compute)
+        self.assertEqual(self.calls, 3)
+
+    async def test_error_shared(self) -> None:
+        """
+        Тест передачи ошибки вычисления всем ожидающим.
+        """
+
+        async def fail() -> bytes:
+            await self.release.wait()
+            raise ValueError("Некорректный курсор")
+
+        tasks = [
+            asyncio.create_task(self.flight.run("tickets", "bad", fail))
+            for _ in range(2)
+        ]
+        await asyncio.sleep(0)
+        self.release.set()
+
+        for result in await asyncio.gather(*tasks, return_exceptions=True):
+            self.assertIsInstance(result, ValueError)
+
+    async def test_cancel_waiter(self) -> None:
+        """
+        Тест отмены первого вызова: остальные получают результат.
+        """
+        first = asyncio.create_task(self.flight.run("ticket", 1, self.compute))
+        second = asyncio.create_task(self.flight.run("ticket", 1, self.compute))
+        await asyncio.sleep(0)
+        first.cancel()
+        self.release.set()
+
+        self.assertEqual(await second, b"result")
+        self.assertTrue(first.cancelled())
+        self.assertEqual(self.calls, 1)
+
+    async def test_disabled(self) -> None:
+        """
+        Тест выключенного объединения: каждый вызов вычисляет сам.
+        """
+        self.flight.enabled = False
+        self.release.set()
+        await asyncio.gather(
+            self.flight.run("ticket", 1, self.compute),
+            self.flight.run("ticket", 1, self.compute),
+        )
+        self.assertEqual(self.calls, 2)
+        self.assertEqual(metrics.snapshot(), {})
@@ -0,0 +1,62 @@
+import unittest
+
+from app.core.cache import MemoryCache
+from app.services.ticket_cache import CachedTicket, TicketCache
+
+
+class TestTicketCache(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        """
+        Настройка тестового окружения.
+        """
+        self.cache = TicketCache(MemoryCache(max_size=100), ttl=60)
+        self.ticket = CachedTicket(1, b'{"id":1}')
+
+    async def test_hit_after_set(self) -> None:
+        """
+        Тест чтения сохраненной записи.
+        """
+        cached, stamp = await self.cache.get(1)
+        self.assertIsNone(cached)
+
+        await self.cache.set(1, stamp, self.ticket)
+
+        self.assertEqual((await self.cache.get(1))[0], self.ticket)
+        self.assertIsNone((await self.cache.get(2))[0])
+
+    async def test_invalidate(self) -> None:
+        """
+        Тест: после записи в обращение старая запись не отдается.
+        """
+        _, stamp = await self.cache.get(1)
+        await self.cache.set(1, stamp, self.ticket)
+
+        await self.cache.invalidate([1])
+
+        cached, new_stamp = await self.cache.get(1)
+        self.assertIsNone(cached)
+        self.assertNotEqual(new_stamp, stamp)
+
+    async def test_late_reader(self) -> None:
+        """
+        Тест: запись, прочитанная из базы до изменения, не отдается после него.
+        """
+        _, stamp = await self.cache.get(1)
+        await self.cache.invalidate([1])
+        await self.cache.set(1, stamp, self.ticket)
+
+        self.assertIsNone((await self.cache.get(1))[0])
+
+    async def test_disabled(self) -> None:
+        """
+        Тест кэша без бэкенда.
+        """
+        cache = TicketCache(None, ttl=60)
+        await cache.set(1, b"", self.ticket)
+        await cache.invalidate([1])
+
+        self.assertEqual(await cache.get(1), (None, b""))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,9 @@
-from datetime import datetime
+import json
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable
 from unittest.mock import AsyncMock, patch, MagicMock
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from app.api.schemas import (
     TicketCreate,
     Ticket as TicketSchema,
@@ -12,16 +15,43 @@ from app.api.schemas import (
 from app.api.enums import TicketStatus, SortOrder
 import unittest
 from sqlalchemy.exc import IntegrityError
+from app.database.models import Base, Message, Ticket, User
+from app.database.tools import encode_cursor
+from app.services.exceptions import ConflictError
+from app.services.ticket_cache import ticket_cache
+from app.services.user_loader import UserLoader
 from app.services.ticket_service import (
     create_ticket,
+    create_tickets,
     get_tickets,
     get_ticket,
+    load_ticket_cached,
+    get_tickets_by_ids,
+    get_tickets_state,
+    get_messages_state,
+    search_tickets,
     update_ticket,
+    bulk_update_tickets,
     create_message,
     get_messages,
+    stream_tickets,
+    ticket_serializer,
+    _tickets_statement,
 )
 
 
+def refresh_from(source: MagicMock) -> Callable[[Any], Awaitable[None]]:
+    """
+    Имитирует session.refresh: заполняет объект значениями, выставленными базой.
+    """
+
+    async def refresh(obj: Any) -> None:
+        for key in ("id", "status", "created_at", "updated_at", "version"):
+            setattr(obj, key, getattr(source, key))
+
+    return refresh
+
+
 class TestTicketService(unittest.IsolatedAsyncioTestCase):
     async def asyncSetUp(self) -> None:
         self.mock_session = AsyncMock(spec=AsyncSession)
@@ -41,17 +71,19 @@ class TestTicketService(unittest.IsolatedAsyncioTestCase):
         Тест успешного создания тикета.
         """
         with patch(
-            "app.services.user_service.get_user", new_callable=AsyncMock
-        ) as mock_get_user:
-            # Мок пользователя как объекта UserSchema
-            mock_get_user.return_value = UserSchema(
-                id=1,
-                username="testuser",
-                email="test@example.com",
-                is_active=True,
-                created_at=datetime.utcnow(),
-                updated_at=datetime.utcnow(),
-            )
+            "app.services.user_service.get_users", new_callable=AsyncMock
+        ) as mock_get_users:
+            # Мок списка пользователей из объектов UserSchema
+            mock_get_users.return_value = [
+                UserSchema(
+                    id=1,
+                    username="testuser",
+                    email="test@example.com",
+                    is_active=True,
+                    created_at=datetime.utcnow(),
+                    updated_at=datetime.utcnow(),
+                )
+            ]
 
             # Мок объекта Ticket
             mock_ticket = MagicMock()
@@ -61,36 +93,26 @@ class TestTicketService(unittest.IsolatedAsyncioTestCase):
             mock_ticket.status = TicketStatus.OPEN.value
             mock_ticket.created_at = datetime.utcnow()
             mock_ticket.updated_at = datetime.utcnow()
+            mock_ticket.version = 1
             mock_ticket.creator_id = 1
 
-            # Мок функции map_db_model_to_dict
-            with patch(
-                "app.services.ticket_service.map_db_model_to_dict"
-            ) as mock_map_db_model_to_dict:
-                mock_map_db_model_to_dict.return_value = {
-                    "id": mock_ticket.id,
-                    "subject": mock_ticket.subject,
-                    "description": mock_ticket.description,
-                    "status": mock_ticket.status,
-                    "created_at": mock_ticket.created_at.isoformat(),
-                    "updated_at": mock_ticket.updated_at.isoformat(),
-                    "creator_id": mock_ticket.creator_id,
-                }
-
-                result = await create_ticket(
-                    self.mock_session, self.mock_ticket_data, creator_id=1
-                )
+            # Мок обновления объекта из базы данных
+            self.mock_session.refresh.side_effect = refresh_from(mock_ticket)
 
-                self.mock_session.add.assert_called_once()
-                self.mock_session.commit.assert_called_once()
-                self.mock_session.refresh.assert_called_once()
+            result = await create_ticket(
+                self.mock_session, self.mock_ticket_data, creator_id=1
+            )
 
-                self.assertIsInstance(result, TicketSchema)
-                self.assertEqual(result.subject, "Test Subject")
-                self.assertEqual(result.description, "Test Description")
-                self.assertEqual(result.status, TicketStatus.OPEN.value)
-                self.assertEqual(result.creator.id, 1)
-                self.assertEqual(result.creator.username, "testuser")
+            self.mock_session.add.assert_called_once()
+            self.mock_session.commit.assert_called_once()
+            self.mock_session.refresh.assert_called_once()
+
+            self.assertIsInstance(result, TicketSchema)
+            self.assertEqual(result.subject, "Test Subject")
+            self.assertEqual(result.description, "Test Description")
+            self.assertEqual(result.status, TicketStatus.OPEN.value)
+            self.assertEqual(result.creator.id, 1)
+            self.assertEqual(result.creator.username, "testuser")
 
     async def test_create_ticket_invalid_data(self) -> None:
         """
@@ -99,16 +121,18 @@ class TestTicketService(unittest.IsolatedAsyncioTestCase):
         invalid_ticket_data = TicketCreate(subject="", description="Test Description")
 
         with patch(
-            "app.services.user_service.get_user", new_callable=AsyncMock
-        ) as mock_get_user:
-            mock_get_user.return_value = UserSchema(
-                id=1,
-                username="testuser",
-                email="test@example.com",
-                is_active=True,
-                created_at=datetime.utcnow(),
-                updated_at=datetime.utcnow(),
-            )
+            "app.services.user_service.get_users", new_callable=AsyncMock
+        ) as mock_get_users:
+            mock_get_users.return_value = [
+                UserSchema(
+                    id=1,
+                    username="testuser",
+                    email="test@example.com",
+                    is_active=True,
+                    created_at=datetime.utcnow(),
+                    updated_at=datetime.utcnow(),
+                )
+            ]
 
             with self.assertRaises(ValueError) as context:
                 await create_ticket(
@@ -122,9 +146,9 @@ class TestTicketService(unittest.IsolatedAsyncioTestCase):
         Тест создания тикета с несуществующим пользователем.
         """
         with patch(
-            "app.services.user_service.get_user", new_callable=AsyncMock
-        ) as mock_get_user:
-            mock_get_user.return_value = None
+            "app.services.user_service.get_users", new_callable=AsyncMock
+        ) as mock_get_users:
+            mock_get_users.return_value = []
 
             with self.assertRaises(ValueError) as context:
                 await create_ticket(
@@ -138,16 +162,18 @@ class TestTicketService(unittest.IsolatedAsyncioTestCase):
         Тест создания тикета с ошибкой при сохранении в базу данных.
         """
         with patch(
-            "app.services.user_service.get_user", new_callable=AsyncMock
-        ) as mock_get_user:
-            mock_get_user.return_value = UserSchema(
-                id=1,
-                username="testuser",
-                email="test@example.com",
-                is_active=True,
-                created_at=datetime.utcnow(),
-                updated_at=datetime.utcnow(),
-            )
+            "app.services.user_service.get_users", new_callable=AsyncMock
+        ) as mock_get_users:
+            mock_get_users.return_value = [
+                UserSchema(
+                    id=1,
+                    username="testuser",
+                    email="test@example.com",
+                    is_active=True,
+                    created_at=datetime.utcnow(),
+                    updated_at=datetime.utcnow(),
+                )
+            ]
 
             # Мок ошибки при сохранении в базу данных
             self.mock_session.commit.side_effect = IntegrityError(
@@ -167,16 +193,18 @@ class TestTicketService(unittest.IsolatedAsyncioTestCase):
         Тест создания тикета с использованием значения по умолчанию для creator_id.
         """
         with patch(
-            "app.services.user_service.get_user", new_callable=AsyncMock
-        ) as mock_get_user:
-            mock_get_user.return_value = UserSchema(
-                id=1,
-                username="testuser",
-                email="test@example.com",
-                is_active=True,
-                created_at=datetime.utcnow(),
-                updated_at=datetime.utcnow(),
-            )
+            "app.services.user_service.get_users", new_callable=AsyncMock
+        ) as mock_get_users:
+            mock_get_users.return_value = [
+                UserSchema(
+                    id=1,
+                    username="testuser",
+                    email="test@example.com",
+                    is_active=True,
+                    created_at=datetime.utcnow(),
+                    updated_at=datetime.utcnow(),
+                )
+            ]
 
             mock_ticket = MagicMock()
             mock_ticket.id = 1
@@ -185,26 +213,16 @@ class TestTicketService(unittest.IsolatedAsyncioTestCase):
             mock_ticket.status = TicketStatus.OPEN.value
             mock_ticket.created_at = datetime.utcnow()
             mock_ticket.updated_at = datetime.utcnow()
+            mock_ticket.version = 1
             mock_ticket.creator_id = 1
 
-            with patch(
-                "app.services.ticket_service.map_db_model_to_dict"
-            ) as mock_map_db_model_to_dict:
-                mock_map_db_model_to_dict.return_value = {
-                    "id": mock_ticket.id,
-                    "subject": mock_ticket.subject,
-                    "description": mock_ticket.description,
-                    "status": mock_ticket.status,
-                    "created_at": mock_ticket.created_at.isoformat(),
-                    "updated_at": mock_ticket.updated_at.isoformat(),
-                    "creator_id": mock_ticket.creator_id,
-                }
-
-                result = await create_ticket(self.mock_session, self.mock_ticket_data)
-
-                self.assertIsInstance(result, TicketSchema)
-                self.assertEqual(result.subject, "Test Subject")
-                self.assertEqual(result.creator.id, 1)
+            self.mock_session.refresh.side_effect = refresh_from(mock_ticket)
+
+            result = await create_ticket(self.mock_session, self.mock_ticket_data)
+
+            self.assertIsInstance(result, TicketSchema)
+            self.assertEqual(result.subject, "Test Subject")
+            self.assertEqual(result.creator.id, 1)
 
     async def test_create_ticket_empty_subject_or_description(self) -> None:
         """
@@ -216,16 +234,18 @@ class TestTicketService(unittest.IsolatedAsyncioTestCase):
         )
 
         with patch(
-            "app.services.user_service.get_user", new_callable=AsyncMock
-        ) as mock_get_user:
-            mock_get_user.return_value = UserSchema(
-                id=1,
-                username="testuser",
-                email="test@example.com",
-                is_active=True,
-                created_at=datetime.utcnow(),
-                updated_at=datetime.utcnow(),
-            )
+            "app.services.user_service.get_users", new_callable=AsyncMock
+        ) as mock_get_users:
+            mock_get_users.return_value = [
+                UserSchema(
+                    id=1,
+                    username="testuser",
+                    email="test@example.com",
+                    is_active=True,
+                    created_at=datetime.utcnow(),
+                    updated_at=datetime.utcnow(),
+                )
+            ]
 
             with self.assertRaises(ValueError) as context:
                 await create_ticket(
@@ -240,16 +260,18 @@ class TestTicketService(unittest.IsolatedAsyncioTestCase):
         )
 
         with patch(
-            "app.services.user_service.get_user", new_callable=AsyncMock
-        ) as mock_get_user:
-            mock_get_user.return_value = UserSchema(
-                id=1,
-                username="testuser",
-                email="test@example.com",
-                is_active=True,
-                created_at=datetime.utcnow(),
-                updated_at=datetime.utcnow(),
-            )
+            "app.services.user_service.get_users", new_callable=AsyncMock
+        ) as mock_get_users:
+            mock_get_users.return_value = [
+                UserSchema(
+                    id=1,
+                    username="testuser",
+                    email="test@example.com",
+                    is_active=True,
+                    created_at=datetime.utcnow(),
+                    updated_at=datetime.utcnow(),
+                )
+            ]
 
             with self.assertRaises(ValueError) as context:
                 await create_ticket(
@@ -269,6 +291,7 @@ class TestTicketService(unittest.IsolatedAsyncioTestCase):
         mock_ticket.status = TicketStatus.OPEN.value
         mock_ticket.created_at = datetime.utcnow()
         mock_ticket.updated_at = datetime.utcnow()
+        mock_ticket.version = 1
         mock_ticket.creator_id = 1
         mock_ticket.operator_id = None
 
@@ -285,9 +308,9 @@ class TestTicketService(unittest.IsolatedAsyncioTestCase):
         mock_result.scalars.return_value.all.return_value = [mock_ticket]
 
         with patch(
-            "app.services.user_service.get_user", new_callable=AsyncMock
-        ) as mock_get_user:
-            mock_get_user.return_value = mock_user
+            "app.services.user_service.get_users", new_callable=AsyncMock
+        ) as mock_get_users:
+            mock_get_users.return_value = [mock_user]
 
             self.mock_session.execute.return_value = mock_result
 
@@ -316,6 +339,7 @@ class TestTicketService(unittest.IsolatedAsyncioTestCase):
         mock_ticket.status = TicketStatus.OPEN.value
         mock_ticket.created_at = datetime.utcnow()
         mock_ticket.updated_at = datetime.utcnow()
+        mock_ticket.version = 1
         mock_ticket.creator_id = 1
         mock_ticket.operator_id = None
 
@@ -332,9 +356,9 @@ class TestTicketService(unittest.IsolatedAsyncioTestCase):
         mock_result.scalar_one_or_none.return_value = mock_ticket
 
         with patch(
-            "app.services.user_service.get_user", new_callable=AsyncMock
-        ) as mock_get_user:
-            mock_get_user.return_value = mock_user
+            "app.services.user_service.get_users", new_callable=AsyncMock
+        ) as mock_get_users:
+            mock_get_users.return_value = [mock_user]
 
             self.mock_session.execute.return_value = mock_result
 
@@ -364,9 +388,10 @@ class TestTicketService(unittest.IsolatedAsyncioTestCase):
         mock_ticket.id = 1
         mock_ticket.subject = "Old Subject"
         mock_ticket.description = "Old Description"
-        mock_ticket.status = TicketStatus.OPEN.value
+        mock_ticket.status = TicketStatus.CLOSED.value
         mock_ticket.created_at = datetime.utcnow()
         mock_ticket.updated_at = datetime.utcnow()
+        mock_ticket.version = 2
         mock_ticket.creator_id = 1
         mock_ticket.operator_id = None
 
@@ -383,9 +408,9 @@ class TestTicketService(unittest.IsolatedAsyncioTestCase):
         mock_result.scalar_one_or_none.return_value = mock_ticket
 
         with patch(
-            "app.services.user_service.get_user", new_callable=AsyncMock
-        ) as mock_get_user:
-            mock_get_user.return_value = mock_user
+            "app.services.user_service.get_users", new_callable=AsyncMock
+        ) as mock_get_users:
+            mock_get_users.return_value = [mock_user]
 
             self.mock_session.execute.return_value = mock_result
 
@@ -418,22 +443,11 @@ class TestTicketService(unittest.IsolatedAsyncioTestCase):
         """
         Тест успешного создания сообщения.
         """
-        mock_ticket = MagicMock()
-        mock_ticket.id = 1
-        mock_ticket.subject = "Test Subject"
-        mock_ticket.description = "Test Description"
-        mock_ticket.status = TicketStatus.OPEN.value
-        mock_ticket.created_at = datetime.utcnow()
-        mock_ticket.updated_at = datetime.utcnow()
-        mock_ticket.creator_id = 1
-        mock_ticket.operator_id = None
-
-        mock_message = MagicMock()
-        mock_message.id = 1
-        mock_message.text = "Test Message"
-        mock_message.ticket_id = 1
-        mock_message.author_id = 1
-        mock_message.created_at = datetime.utcnow()
+        mock_row = MagicMock()
+        mock_row.id = 1
+        mock_row.created_at = datetime.utcnow()
+        mock_row.ticket_subject = "Test Subject"
+        mock_row.creator_email = "creator@example.com"
 
         mock_user = UserSchema(
             id=1,
@@ -444,24 +458,16 @@ class TestTicketService(unittest.IsolatedAsyncioTestCase):
             updated_at=datetime.utcnow(),
         )
 
-        mock_ticket_result = MagicMock()
-        mock_ticket_result.scalar_one_or_none.return_value = mock_ticket
-
-        mock_message_result = MagicMock()
-        mock_message_result.scalar_one.return_value = mock_message
+        mock_result = MagicMock()
+        mock_result.one_or_none.return_value = mock_row
 
         with patch(
-            "app.services.user_service.get_user", new_callable=AsyncMock
-        ) as mock_get_user:
-            mock_get_user.return_value = mock_user
-
-            self.mock_session.execute.side_effect = [
-                mock_ticket_result,
-                mock_message_result,
-            ]
+            "app.services.user_service.get_users", new_callable=AsyncMock
+        ) as mock_get_users:
+            mock_get_users.return_value = [mock_user]
 
+            self.mock_session.execute.return_value = mock_result
             self.mock_session.commit.return_value = None
-            self.mock_session.refresh.return_value = None
 
             message_data = MessageCreate(text="Test Message")
 
@@ -469,27 +475,40 @@ class TestTicketService(unittest.IsolatedAsyncioTestCase):
                 self.mock_session, ticket_id=1, message_data=message_data, author_id=1
             )
 
-            self.assertIsInstance(result, MessageSchema)
-            self.assertEqual(result.text, "Test Message")
-            self.assertEqual(result.author.id, 1)
-            self.assertEqual(result.author.username, "testuser")
+            self.assertIsInstance(result.message, MessageSchema)
+            self.assertEqual(result.message.text, "Test Message")
+            self.assertEqual(result.message.author.id, 1)
+            self.assertEqual(result.message.author.username, "testuser")
+            self.assertEqual(result.ticket_subject, "Test Subject")
+            self.assertEqual(result.creator_email, "creator@example.com")
+            self.mock_session.execute.assert_awaited_once()
+            self.mock_session.refresh.assert_not_called()
 
     async def test_create_message_ticket_not_found(self) -> None:
         """
         Тест создания сообщения, если тикет не найден.
         """
-        mock_ticket_result = MagicMock()
-        mock_ticket_result.scalar_one_or_none.return_value = None
+        mock_result = MagicMock()
+        mock_result.one_or_none.return_value = None
 
-        self.mock_session.execute.return_value = mock_ticket_result
+        self.mock_session.execute.return_value = mock_result
         message_data = MessageCreate(text="Test Message")
 
-        with self.assertRaises(ValueError) as context:
-            await create_message(
-                self.mock_session, ticket_id=1, message_data=message_data, author_id=1
-            )
+        with patch(
+            "app.services.user_service.get_users", new_callable=AsyncMock
+        ) as mock_get_users:
+            mock_get_users.return_value = [MagicMock(id=1)]
+
+            with self.assertRaises(ValueError) as context:
+                await create_message(
+                    self.mock_session,
+                    ticket_id=1,
+                    message_data=message_data,
+                    author_id=1,
+                )
 
         self.assertEqual(str(context.exception), "Тикет с 1 не найден")
+        self.mock_session.commit.assert_not_called()
 
     async def test_get_messages(self) -> None:
         """
@@ -515,9 +534,9 @@ class TestTicketService(unittest.IsolatedAsyncioTestCase):
         mock_result.scalars.return_value.all.return_value = [mock_message]
 
         with patch(
-            "app.services.user_service.get_user", new_callable=AsyncMock
-        ) as mock_get_user:
-            mock_get_user.return_value = mock_user
+            "app.services.user_service.get_users", new_callable=AsyncMock
+        ) as mock_get_users:
+            mock_get_users.return_value = [mock_user]
 
             self.mock_session.execute.return_value = mock_result
             result = await get_messages(self.mock_session, ticket_id=1)
@@ -530,5 +549,457 @@ class TestTicketService(unittest.IsolatedAsyncioTestCase):
             self.assertEqual(result[0].author.username, "testuser")
 
 
+class TestTicketServiceDatabase(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        """
+        Создает in-memory SQLite базу с набором обращений.
+        """
+        self.engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+        async with self.engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        self.session = async_sessionmaker(self.engine, expire_on_commit=False)()
+
+        user = User(email="test@example.com", username="testuser", hashed_password="x")
+        self.session.add(user)
+        await self.session.flush()
+        base = datetime(2025, 1, 1)
+        # Два обращения с одинаковым created_at проверяют разрешение по id
+        for i, minutes in enumerate([0, 1, 1, 2, 3]):
+            self.session.add(
+                Ticket(
+                    subject=f"Subject {i}",
+                    description="Description",
+                    status=TicketStatus.CLOSED.value if i == 4 else "open",
+                    created_at=base + timedelta(minutes=minutes),
+                    creator_id=user.id,
+                )
+            )
+        await self.session.commit()
+
+    async def asyncTearDown(self) -> None:
+        await self.session.close()
+        await self.engine.dispose()
+
+    async def _collect(self, sort_by: SortOrder, **kwargs) -> list:
+        pages, cursor = [], None
+        while True:
+            page = await get_tickets(
+                self.session, sort_by=sort_by, limit=2, cursor=cursor, **kwargs
+            )
+            pages.append([ticket.id for ticket in page])
+            if len(page) < 2:
+                return pages
+            cursor = encode_cursor(page[-1].created_at, page[-1].id)
+
+    async def test_get_tickets_sort_order(self) -> None:
+        """
+        Тест соответствия SortOrder направлению ORDER BY.
+        """
+        asc_result = await get_tickets(self.session, sort_by=SortOrder.CREATED_AT_ASC)
+        desc_result = await get_tickets(self.session, sort_by=SortOrder.CREATED_AT_DESC)
+
+        self.assertEqual([t.id for t in asc_result], [1, 2, 3, 4, 5])
+        self.assertEqual([t.id for t in desc_result], [5, 4, 3, 2, 1])
+
+    async def test_get_tickets_keyset_pagination(self) -> None:
+        """
+        Тест курсорной пагинации в обоих направлениях сортировки.
+        """
+        self.assertEqual(
+            await self._collect(SortOrder.CREATED_AT_ASC), [[1, 2], [3, 4], [5]]
+        )
+        self.assertEqual(
+            await self._collect(SortOrder.CREATED_AT_DESC), [[5, 4], [3, 2], [1]]
+        )
+        self.assertEqual(
+            await self._collect(SortOrder.CREATED_AT_DESC, status=TicketStatus.OPEN),
+            [[4, 3], [2, 1], []],
+        )
+
+    async def test_stream_tickets_chunks(self) -> None:
+        """
+        Тест потокового чтения обращений частями.
+        """
+        chunks = [
+            [ticket.id for ticket in chunk]
+            async for chunk in stream_tickets(
+                self.session, sort_by=SortOrder.CREATED_AT_ASC, chunk_size=2
+            )
+        ]
+
+        self.assertEqual(chunks, [[1, 2], [3, 4], [5]])
+
+    async def test_get_tickets_invalid_cursor(self) -> None:
+        """
+        Тест ошибки при передаче некорректного курсора.
+        """
+        with self.assertRaises(ValueError) as context:
+            await get_tickets(self.session, limit=2, cursor="not-a-cursor")
+
+        self.assertEqual(str(context.exception), "Некорректный курсор")
+
+    async def test_create_message_round_trips(self) -> None:
+        """
+        Тест числа запросов при создании сообщения: автор и один INSERT.
+        """
+        statements: list = []
+        event.listen(
+            self.engine.sync_engine,
+            "before_cursor_execute",
+            lambda *args: statements.append(args[2]),
+        )
+        loader = UserLoader(self.session)
+
+        created = await create_message(
+            self.session, 2, MessageCreate(text="Hello"), author_id=1, loader=loader
+        )
+        self.assertEqual(len(statements), 2)
+        self.assertTrue(statements[1].startswith("INSERT INTO messages"))
+        self.assertEqual(created.message.text, "Hello")
+        self.assertEqual(created.message.author.username, "testuser")
+        self.assertEqual(created.ticket_subject, "Subject 1")
+        self.assertEqual(created.creator_email, "test@example.com")
+
+        # Автор уже загружен: остается только INSERT ... RETURNING
+        statements.clear()
+        await create_message(
+            self.session, 2, MessageCreate(text="Again"), author_id=1, loader=loader
+        )
+        self.assertEqual(len(statements), 1)
+
+        messages = await get_messages(self.session, 2)
+        self.assertEqual([m.text for m in messages], ["Hello", "Again"])
+
+    async def test_update_ticket_optimistic_lock(self) -> None:
+        """
+        Тест условного обновления по версии одним UPDATE ... RETURNING.
+        """
+        loader = UserLoader(self.session)
+        await loader.load(1)
+        statements: list = []
+        event.listen(
+            self.engine.sync_engine,
+            "before_cursor_execute",
+            lambda *args: statements.append(args[2]),
+        )
+
+        claimed = await update_ticket(
+            self.session,
+            1,
+            TicketUpdate(status="in_progress", operator_id=1),
+            loader,
+            expected_version=1,
+        )
+        self.assertEqual(len(statements), 1)
+        self.assertTrue(statements[0].startswith("UPDATE tickets"))
+        self.assertEqual(claimed.version, 2)
+        self.assertEqual(claimed.operator.id, 1)
+
+        # Второй оператор со старой версией получает конфликт
+        with self.assertRaises(ConflictError):
+            await update_ticket(
+                self.session, 1, TicketUpdate(operator_id=None, version=1), loader
+            )
+        with self.assertRaises(ConflictError) as context:
+            await update_ticket(
+                self.session, 1, TicketUpdate(status="closed"), expected_version=1
+            )
+        self.assertIsInstance(context.exception, ValueError)
+
+        ticket = await get_ticket(self.session, 1)
+        self.assertEqual((ticket.status, ticket.version), ("in_progress", 2))
+        self.assertEqual(ticket.operator.id, 1)
+
+        # Без версии обновление безусловное, версия все равно растет
+        updated = await update_ticket(self.session, 1, TicketUpdate(status="closed"))
+        self.assertEqual((updated.status, updated.version), ("closed", 3))
+
+        with self.assertRaises(ValueError) as context:
+            await update_ticket(
+                self.session, 100, TicketUpdate(status="closed"), expected_version=1
+            )
+        self.assertEqual(str(context.exception), "Тикет с id 100 не найден")
+
+    async def test_get_tickets_fieldset(self) -> None:
+        """
+        Тест чтения из базы только выбранных колонок и развернутых связей.
+        """
+        statements: list = []
+        event.listen(
+            self.engine.sync_engine,
+            "before_cursor_execute",
+            lambda *args: statements.append(args[2]),
+        )
+        fieldset = ticket_serializer.fieldset(["subject"])
+
+        tickets = await get_tickets(
+            self.session, sort_by=SortOrder.CREATED_AT_ASC, limit=2, fieldset=fieldset
+        )
+
+        self.assertEqual(
+            tickets,
+            [{"id": 1, "subject": "Subject 0"}, {"id": 2, "subject": "Subject 1"}],
+        )
+        self.assertEqual(len(statements), 1)
+        self.assertNotIn("description", statements[0])
+
+        statements.clear()
+        ticket = await get_ticket(
+            self.session,
+            3,
+            fieldset=ticket_serializer.fieldset(["status"], ["creator"]),
+        )
+        self.assertEqual(ticket["creator"].username, "testuser")
+        self.assertEqual(len(statements), 2)
+        self.assertIn("creator_id", statements[0])
+        self.assertNotIn("description", statements[0])
+
+    async def test_load_ticket_cached(self) -> None:
+        """
+        Тест кэша обращений: попадание без запросов и сброс при обновлении.
+        """
+
+        async def get_ticket_cached(ticket_id: int) -> Any:
+            cached, stamp = await ticket_cache.get(ticket_id)
+            if cached is not None:
+                return cached
+            return await load_ticket_cached(self.session, ticket_id, stamp)
+
+        first = await get_ticket_cached(1)
+        statements: list = []
+        event.listen(
+            self.engine.sync_engine,
+            "before_cursor_execute",
+            lambda *args: statements.append(args[2]),
+        )
+
+        self.assertEqual(await get_ticket_cached(1), first)
+        self.assertEqual(statements, [])
+        self.assertEqual(json.loads(first.body)["subject"], "Subject 0")
+
+        await update_ticket(self.session, 1, TicketUpdate(status="closed"))
+        updated = await get_ticket_cached(1)
+        self.assertEqual(updated.version, 2)
+        self.assertEqual(json.loads(updated.body)["status"], "closed")
+
+        await bulk_update_tickets(self.session, TicketUpdate(status="open"), ids=[1])
+        self.assertEqual((await get_ticket_cached(1)).version, 3)
+        self.assertIsNone(await get_ticket_cached(100))
+
+    async def test_list_states(self) -> None:
+        """
+        Тест снимков состояния списков для ETag: меняются при записи.
+        """
+        last_id, updated_at = await get_tickets_state(self.session)
+        self.assertEqual(last_id, 5)
+        self.assertIsInstance(updated_at, datetime)
+        self.assertEqual(
+            (await get_tickets_state(self.session, ticket_ids=[1, 9]))[0], 1
+        )
+
+        before = await get_tickets_state(self.session, ticket_ids=[1])
+        listed = await get_tickets_state(self.session)
+        await update_ticket(self.session, 1, TicketUpdate(status="in_progress"))
+        self.assertNotEqual(
+            await get_tickets_state(self.session, ticket_ids=[1]), before
+        )
+        # Обращение 1 не последнее ни по ID, ни по updated_at до записи
+        self.assertNotEqual(await get_tickets_state(self.session), listed)
+
+        listed = await get_tickets_state(self.session)
+        await create_ticket(
+            self.session, TicketCreate(subject="Новое", description="Текст")
+        )
+        self.assertEqual((await get_tickets_state(self.session))[0], 6)
+
+        self.assertEqual(await get_messages_state(self.session, 2), (0, None))
+        await create_message(self.session, 2, MessageCreate(text="Hi"), author_id=1)
+        self.assertEqual(await get_messages_state(self.session, 2), (1, 1))
+
+    async def test_search_tickets(self) -> None:
+        """
+        Тест поиска FTS5: ранжирование, совпадения в сообщениях, статус и курсор.
+        """
+        await create_message(
+            self.session, 2, MessageCreate(text="Принтер не печатает"), author_id=1
+        )
+        await create_message(
+            self.session,
+            3,
+            MessageCreate(text="Проверьте принтер и кабель"),
+            author_id=1,
+        )
+        await create_message(
+            self.session, 5, MessageCreate(text="ПРИНТЕР заменен"), author_id=1
+        )
+
+        page = await search_tickets(self.session, "принтер")
+        self.assertIsNone(page.next_cursor)
+        # При одном совпадении короткое сообщение релевантнее длинного
+        self.assertEqual([ticket.id for ticket in page.tickets], [5, 2, 3])
+
+        page = await search_tickets(self.session, "принтер", TicketStatus.CLOSED)
+        self.assertEqual([ticket.id for ticket in page.tickets], [5])
+
+        ids, cursor = [], None
+        while True:
+            page = await search_tickets(self.session, "принтер", limit=2, cursor=cursor)
+            ids.extend(ticket.id for ticket in page.tickets)
+            if page.next_cursor is None:
+                break
+            cursor = page.next_cursor
+        self.assertEqual(sorted(ids), [2, 3, 5])
+
+        page = await search_tickets(self.session, "subject 4 OR")
+        self.assertEqual(page.tickets, [])
+        page = await search_tickets(self.session, 'subject "4')
+        self.assertEqual([ticket.id for ticket in page.tickets], [5])
+        with self.assertRaises(ValueError):
+            await search_tickets(self.session, "?!")
+
+    async def test_list_query_plans_use_indexes(self) -> None:
+        """
+        Тест планов списка обращений: индекс вместо полного просмотра и сортировки.
+        """
+        for status in (TicketStatus.OPEN, None):
+            stmt = _tickets_statement(status, SortOrder.CREATED_AT_DESC).limit(50)
+            sql = str(
+                stmt.compile(
+                    dialect=self.engine.dialect,
+                    compile_kwargs={"literal_binds": True},
+                )
+            )
+            rows = await self.session.execute(text("EXPLAIN QUERY PLAN " + sql))
+            plan = " ".join(row[-1] for row in rows)
+            self.assertIn("USING INDEX ix_tickets_", plan)
+            self.assertNotIn("TEMP B-TREE", plan)
+
+    async def test_get_messages_after_id(self) -> None:
+        """
+        Тест порядка (created_at, id) и получения только новых сообщений.
+        """
+        base = datetime(2025, 1, 2)
+        # ID не монотонны по времени: третье сообщение создано раньше второго
+        for body, minutes in [("a", 0), ("c", 2), ("b", 1), ("d", 2)]:
+            self.session.add(
+                Message(
+                    text=body,
+                    ticket_id=1,
+                    author_id=1,
+                    created_at=base + timedelta(minutes=minutes),
+                )
+            )
+        self.session.add(Message(text="other", ticket_id=2, author_id=1))
+        await self.session.commit()
+
+        messages = await get_messages(self.session, 1)
+        self.assertEqual([m.text for m in messages], ["a", "b", "c", "d"])
+
+        page = await get_messages(self.session, 1, after_id=1, limit=2)
+        self.assertEqual([m.text for m in page], ["b", "c"])
+        page = await get_messages(self.session, 1, after_id=page[-1].id, limit=2)
+        self.assertEqual([m.text for m in page], ["d"])
+        self.assertEqual(await get_messages(self.session, 1, after_id=4), [])
+        # Сообщение другого обращения не задает позицию
+        self.assertEqual(await get_messages(self.session, 1, after_id=5), [])
+
+    async def test_get_tickets_by_ids(self) -> None:
+        """
+        Тест получения обращений по списку ID одним запросом.
+        """
+        tickets = await get_tickets_by_ids(self.session, [4, 2, 100])
+
+        self.assertEqual(sorted(t.id for t in tickets), [2, 4])
+        self.assertEqual(await get_tickets_by_ids(self.session, []), [])
+
+    async def test_create_tickets_chunks(self) -> None:
+        """
+        Тест массового создания: один запрос создателя и INSERT на часть.
+        """
+        statements: list = []
+        event.listen(
+            self.engine.sync_engine,
+            "before_cursor_execute",
+            lambda *args: statements.append(args[2]),
+        )
+        tickets_data = [
+            TicketCreate(subject=f"Bulk {i}", description="Description")
+            for i in range(3)
+        ]
+
+        tickets = await create_tickets(self.session, tickets_data, chunk_size=2)
+
+        self.assertEqual([t.id for t in tickets], [6, 7, 8])
+        self.assertEqual([t.subject for t in tickets], ["Bulk 0", "Bulk 1", "Bulk 2"])
+        self.assertEqual({t.creator.username for t in tickets}, {"testuser"})
+        self.assertEqual(len(statements), 3)
+        self.assertTrue(statements[1].startswith("INSERT INTO tickets"))
+
+        with self.assertRaises(ValueError) as context:
+            await create_tickets(
+                self.session, [TicketCreate(subject="", description="Description")]
+            )
+        self.assertEqual(str(context.exception), "Некорректные данные в записи 0")
+        with self.assertRaises(ValueError):
+            await create_tickets(self.session, tickets_data, creator_id=100)
+
+    async def test_bulk_update_tickets_by_filter(self) -> None:
+        """
+        Тест массового обновления по фильтру частями, по UPDATE на часть.
+        """
+        statements: list = []
+        event.listen(
+            self.engine.sync_engine,
+            "before_cursor_execute",
+            lambda *args: statements.append(args[2]),
+        )
+
+        ids = await bulk_update_tickets(
+            self.session,
+            TicketUpdate(status="closed"),
+            status=TicketStatus.OPEN,
+            chunk_size=3,
+        )
+
+        self.assertEqual(ids, [1, 2, 3, 4])
+        self.assertEqual(len(statements), 2)
+        self.assertTrue(all(s.startswith("UPDATE tickets") for s in statements))
+        tickets = await get_tickets(self.session, sort_by=SortOrder.CREATED_AT_ASC)
+        self.assertEqual({t.status for t in tickets}, {"closed"})
+        self.assertEqual([t.version for t in tickets], [2, 2, 2, 2, 1])
+
+    async def test_bulk_update_tickets_by_ids(self) -> None:
+        """
+        Тест массового назначения оператора по списку ID.
+        """
+        ids = await bulk_update_tickets(
+            self.session,
+            TicketUpdate(operator_id=1),
+            ids=[5, 2, 100, 2],
+            status=TicketStatus.OPEN,
+        )
+
+        self.assertEqual(ids, [2])
+        ticket = await get_ticket(self.session, 2)
+        self.assertEqual(ticket.operator.id, 1)
+
+        with self.assertRaises(ValueError):
+            await bulk_update_tickets(self.session, TicketUpdate(status="closed"))
+        with self.assertRaises(ValueError):
+            await bulk_update_tickets(self.session, TicketUpdate(), ids=[1])
+
+    async def test_create_message_missing_ticket(self) -> None:
+        """
+        Тест создания сообщения в несуществующем обращении.
+        """
+        with self.assertRaises(ValueError) as context:
+            await create_message(
+                self.session, 100, MessageCreate(text="Hello"), author_id=1
+            )
+
+        self.assertEqual(str(context.exception), "Тикет с 100 не найден")
+        self.assertEqual(await get_messages(self.session, 100), [])
+
+
 if __name__ == "__main__":
     unittest.main()
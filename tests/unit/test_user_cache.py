@@ -0,0 +1,87 @@
+import unittest
+from unittest.mock import patch
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.api.schemas import UserCreate
+from app.core.cache import MemoryCache
+from app.core.metrics import metrics
+from app.core.security import PasswordHasher
+from app.database.models import Base, User
+from app.services.user_cache import UserCache
+from app.services.user_service import create_user, get_user, get_users
+
+
+class TestUserCache(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        """
+        Создает in-memory SQLite базу с пользователем и пустой кэш.
+        """
+        self.engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+        async with self.engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        self.session = async_sessionmaker(self.engine, expire_on_commit=False)()
+        self.session.add(
+            User(email="test@example.com", username="testuser", hashed_password="x")
+        )
+        await self.session.commit()
+
+        self.statements: list = []
+        event.listen(
+            self.engine.sync_engine,
+            "before_cursor_execute",
+            lambda *args: self.statements.append(args[2]),
+        )
+        cache = UserCache(MemoryCache(max_size=100), ttl=60, negative_ttl=60)
+        patcher = patch("app.services.user_service.user_cache", cache)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        metrics.reset()
+
+    async def asyncTearDown(self) -> None:
+        await self.session.close()
+        await self.engine.dispose()
+
+    async def test_read_through(self) -> None:
+        """
+        Тест: повторные запросы пользователей, включая отсутствующих, идут в кэш.
+        """
+        users = await get_users(self.session, [1, 2])
+        self.assertEqual([user.username for user in users], ["testuser"])
+        self.assertEqual(len(self.statements), 1)
+
+        self.assertEqual((await get_user(self.session, 1)).username, "testuser")
+        self.assertIsNone(await get_user(self.session, 2))
+        self.assertEqual(len(self.statements), 1)
+        self.assertEqual(
+            metrics.snapshot(),
+            {
+                "user_cache.hits": 1,
+                "user_cache.misses": 2,
+                "user_cache.negative_hits": 1,
+            },
+        )
+
+    async def test_create_user_invalidates(self) -> None:
+        """
+        Тест сброса негативной записи при создании пользователя с этим ID.
+        """
+        self.assertIsNone(await get_user(self.session, 2))
+
+        with patch(
+            "app.services.user_service.password_hasher",
+            PasswordHasher(rounds=4, workers=0),
+        ):
+            created = await create_user(
+                self.session,
+                UserCreate(email="new@example.com", username="new", password="p"),
+            )
+
+        self.assertEqual(created.id, 2)
+        self.assertEqual((await get_user(self.session, 2)).username, "new")
+        self.assertEqual(metrics.snapshot()["user_cache.invalidations"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
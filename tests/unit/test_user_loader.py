@@ -0,0 +1,101 @@
+import unittest
+from datetime import datetime
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.schemas import User as UserSchema
+from app.services.ticket_service import get_tickets
+from app.services.user_loader import UserLoader
+
+
+def make_user(user_id: int) -> UserSchema:
+    return UserSchema(
+        id=user_id,
+        username=f"user{user_id}",
+        email=f"user{user_id}@example.com",
+        is_active=True,
+        created_at=datetime.utcnow(),
+        updated_at=datetime.utcnow(),
+    )
+
+
+class TestUserLoader(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        """
+        Настройка тестового окружения.
+        """
+        self.mock_session = AsyncMock(spec=AsyncSession)
+        self.loader = UserLoader(self.mock_session)
+
+    async def test_load_many_single_query(self) -> None:
+        """
+        Тест загрузки нескольких пользователей одним запросом.
+        """
+        with patch(
+            "app.services.user_service.get_users", new_callable=AsyncMock
+        ) as mock_get_users:
+            mock_get_users.return_value = [make_user(1), make_user(2)]
+
+            result = await self.loader.load_many([1, 2, 2, None, 3])
+
+            mock_get_users.assert_awaited_once()
+            self.assertEqual(sorted(mock_get_users.call_args.args[1]), [1, 2, 3])
+            self.assertEqual(result[1].username, "user1")
+            self.assertEqual(result[2].username, "user2")
+            self.assertIsNone(result[3])
+
+    async def test_load_memoized(self) -> None:
+        """
+        Тест повторной загрузки без обращения к базе данных.
+        """
+        with patch(
+            "app.services.user_service.get_users", new_callable=AsyncMock
+        ) as mock_get_users:
+            mock_get_users.return_value = [make_user(1)]
+
+            first = await self.loader.load(1)
+            second = await self.loader.load(1)
+            missing = await self.loader.load(None)
+
+            mock_get_users.assert_awaited_once()
+            self.assertIs(first, second)
+            self.assertIsNone(missing)
+
+    async def test_get_tickets_batches_users(self) -> None:
+        """
+        Тест загрузки создателей и операторов списка тикетов одним запросом.
+        """
+        tickets = []
+        for ticket_id in range(1, 4):
+            mock_ticket = MagicMock()
+            mock_ticket.id = ticket_id
+            mock_ticket.subject = "Test Subject"
+            mock_ticket.description = "Test Description"
+            mock_ticket.status = "open"
+            mock_ticket.created_at = datetime.utcnow()
+            mock_ticket.updated_at = datetime.utcnow()
+            mock_ticket.creator_id = 1
+            mock_ticket.operator_id = 2 if ticket_id % 2 else None
+            tickets.append(mock_ticket)
+
+        mock_result = MagicMock()
+        mock_result.scalars.return_value.all.return_value = tickets
+        self.mock_session.execute.return_value = mock_result
+
+        with patch(
+            "app.services.user_service.get_users", new_callable=AsyncMock
+        ) as mock_get_users:
+            mock_get_users.return_value = [make_user(1), make_user(2)]
+
+            result = await get_tickets(self.mock_session, loader=self.loader)
+
+            mock_get_users.assert_awaited_once()
+            self.mock_session.execute.assert_awaited_once()
+            self.assertEqual([t.creator.id for t in result], [1, 1, 1])
+            self.assertEqual(result[0].operator.id, 2)
+            self.assertIsNone(result[1].operator)
+
+
+if __name__ == "__main__":
+    unittest.main()
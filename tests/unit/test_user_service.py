@@ -5,7 +5,12 @@ from sqlalchemy.exc import IntegrityError
 from datetime import datetime
 from app.api.schemas import UserCreate, User as UserSchema
 from app.database.models import User
-from app.services.user_service import create_user
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from app.api.enums import UserImportStatus
+from app.core.security import PasswordHasher, hash_password, verify_password
+from app.database.models import Base
+from app.services.user_service import authenticate_user, create_user, import_users
 
 
 class TestUserService(unittest.IsolatedAsyncioTestCase):
@@ -35,28 +40,23 @@ class TestUserService(unittest.IsolatedAsyncioTestCase):
 
         self.mock_session.add.return_value = None
         self.mock_session.commit.return_value = None
-        self.mock_session.refresh.return_value = mock_user
 
-        with patch("app.services.user_service.map_db_model_to_dict") as mock_map:
-            mock_map.return_value = {
-                "id": 1,
-                "email": "test@example.com",
-                "username": "testuser",
-                "is_active": True,
-                "created_at": datetime.utcnow(),
-                "updated_at": datetime.utcnow(),
-            }
+        async def refresh(user: User) -> None:
+            for key in ("id", "is_active", "created_at", "updated_at"):
+                setattr(user, key, getattr(mock_user, key))
 
-            result = await create_user(self.mock_session, self.mock_user_data)
+        self.mock_session.refresh.side_effect = refresh
 
-            self.mock_session.add.assert_called_once()
-            self.mock_session.commit.assert_called_once()
-            self.mock_session.refresh.assert_called_once()
+        result = await create_user(self.mock_session, self.mock_user_data)
 
-            self.assertIsInstance(result, UserSchema)
-            self.assertEqual(result.email, "test@example.com")
-            self.assertEqual(result.username, "testuser")
-            self.assertEqual(result.is_active, True)
+        self.mock_session.add.assert_called_once()
+        self.mock_session.commit.assert_called_once()
+        self.mock_session.refresh.assert_called_once()
+
+        self.assertIsInstance(result, UserSchema)
+        self.assertEqual(result.email, "test@example.com")
+        self.assertEqual(result.username, "testuser")
+        self.assertEqual(result.is_active, True)
 
     async def test_create_user_duplicate_email(self) -> None:
         """
@@ -96,6 +96,94 @@ class TestUserService(unittest.IsolatedAsyncioTestCase):
 
         self.assertEqual(str(context.exception), "SQL Error")
 
+    async def test_authenticate_user_rehash(self) -> None:
+        """
+        Тест перехэширования пароля при изменении стоимости bcrypt.
+        """
+        old_hash = hash_password("password123", rounds=4)
+        mock_user = MagicMock(spec=User)
+        mock_user.id = 1
+        mock_user.email = "test@example.com"
+        mock_user.username = "testuser"
+        mock_user.is_active = True
+        mock_user.created_at = datetime.utcnow()
+        mock_user.updated_at = datetime.utcnow()
+        mock_user.hashed_password = old_hash
+
+        mock_result = MagicMock()
+        mock_result.scalar_one_or_none.return_value = mock_user
+        self.mock_session.execute.return_value = mock_result
+
+        with patch(
+            "app.services.user_service.password_hasher",
+            PasswordHasher(rounds=5, workers=0),
+        ):
+            result = await authenticate_user(
+                self.mock_session, "testuser", "password123"
+            )
+            wrong = await authenticate_user(self.mock_session, "testuser", "wrong")
+
+        self.assertEqual(result.username, "testuser")
+        self.assertIsNone(wrong)
+        self.assertTrue(mock_user.hashed_password.startswith("$2b$05$"))
+        self.mock_session.commit.assert_called_once()
+
+
+class TestImportUsers(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        """
+        Создает in-memory SQLite базу с одним пользователем.
+        """
+        self.engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+        async with self.engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        self.session = async_sessionmaker(self.engine, expire_on_commit=False)()
+        self.session.add(
+            User(email="taken@example.com", username="taken", hashed_password="x")
+        )
+        await self.session.commit()
+
+    async def asyncTearDown(self) -> None:
+        await self.session.close()
+        await self.engine.dispose()
+
+    async def test_import_users(self) -> None:
+        """
+        Тест массового импорта с дубликатами и некорректными записями.
+        """
+        users_data = [
+            UserCreate(email="a@example.com", username="a", password="pass-a"),
+            UserCreate(email="taken@example.com", username="b", password="pass-b"),
+            UserCreate(email="c@example.com", username="a", password="pass-c"),
+            UserCreate(email="", username="d", password="pass-d"),
+            UserCreate(email="e@example.com", username="e", password="pass-e"),
+        ]
+
+        with patch(
+            "app.services.user_service.password_hasher",
+            PasswordHasher(rounds=4, workers=2),
+        ):
+            results = await import_users(self.session, users_data, chunk_size=2)
+
+        self.assertEqual(
+            [result.status for result in results],
+            [
+                UserImportStatus.CREATED,
+                UserImportStatus.DUPLICATE,
+                UserImportStatus.DUPLICATE,
+                UserImportStatus.INVALID,
+                UserImportStatus.CREATED,
+            ],
+        )
+        self.assertEqual(results[0].user.username, "a")
+        self.assertIsNone(results[1].user)
+        users = (await self.session.scalars(select(User.username))).all()
+        self.assertEqual(sorted(users), ["a", "e", "taken"])
+        hashed = await self.session.scalar(
+            select(User.hashed_password).where(User.username == "e")
+        )
+        self.assertTrue(verify_password("pass-e", hashed, rounds=4)[0])
+
 
 if __name__ == "__main__":
     unittest.main()